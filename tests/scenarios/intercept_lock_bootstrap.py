@@ -8,31 +8,20 @@ import json
 import os
 import sys
 import time
+from pathlib import Path
 
 from pymavlink import mavutil
 
+SCRIPT_DIR = Path(__file__).resolve().parent
+TOOLS_DIR = SCRIPT_DIR.parent.parent / "tools"
+if str(TOOLS_DIR) not in sys.path:
+    sys.path.insert(0, str(TOOLS_DIR))
+from periodic_scheduler import PeriodicScheduler, heartbeat_stream, system_time_stream  # noqa: E402
+
 MAV_COMP_AUTOPILOT = mavutil.mavlink.MAV_COMP_ID_AUTOPILOT1
-HB_TYPE = mavutil.mavlink.MAV_TYPE_GCS
-HB_AUTOPILOT = mavutil.mavlink.MAV_AUTOPILOT_INVALID
-HB_STATE = mavutil.mavlink.MAV_STATE_ACTIVE
 SUMMARY_PATH = os.getenv("SIMTEST_SCENARIO_RESULT")
 
 
-class HeartbeatMaintainer:
-    def __init__(self, master: mavutil.mavfile, rate_hz: float) -> None:
-        self.master = master
-        self.interval = 1.0 / max(rate_hz, 0.2)
-        self._next_send = 0.0
-
-    def tick(self) -> bool:
-        now = time.time()
-        if now >= self._next_send:
-            self.master.mav.heartbeat_send(HB_TYPE, HB_AUTOPILOT, 0, 0, HB_STATE)
-            self._next_send = now + self.interval
-            return True
-        return False
-
-
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="PX4 intercept lock bootstrap scenario")
     parser.add_argument(
@@ -46,6 +35,12 @@ def parse_args() -> argparse.Namespace:
         default=2.0,
         help="Heartbeat frequency in Hz",
     )
+    parser.add_argument(
+        "--system-time-rate",
+        type=float,
+        default=0.0,
+        help="Also stream SYSTEM_TIME at this rate in Hz (0 disables)",
+    )
     parser.add_argument(
         "--bootstrap-seconds",
         type=float,
@@ -87,14 +82,16 @@ def wait_for_px4_heartbeat(master: mavutil.mavfile, timeout: float) -> tuple[int
     raise TimeoutError("heartbeat timeout")
 
 
-def run_bootstrap(heartbeat: HeartbeatMaintainer, seconds: float) -> int:
-    sent = 0
-    deadline = time.time() + max(0.0, seconds)
-    while time.time() < deadline:
-        if heartbeat.tick():
-            sent += 1
-        time.sleep(0.1)
-    return sent
+def run_bootstrap(master: mavutil.mavfile, args: argparse.Namespace) -> PeriodicScheduler:
+    scheduler = PeriodicScheduler(
+        [
+            heartbeat_stream(master, max(args.heartbeat_rate, 0.2)),
+            system_time_stream(master, args.system_time_rate),
+        ]
+    )
+    with scheduler:
+        time.sleep(max(0.0, args.bootstrap_seconds))
+    return scheduler
 
 
 def main() -> int:
@@ -111,13 +108,15 @@ def main() -> int:
     system_id, component_id = wait_for_px4_heartbeat(master, timeout=args.timeout)
     print(f"[scenario] PX4 heartbeat detected from sys={system_id} comp={component_id}")
 
-    heartbeat = HeartbeatMaintainer(master, rate_hz=args.heartbeat_rate)
-    sent = run_bootstrap(heartbeat, args.bootstrap_seconds)
+    scheduler = run_bootstrap(master, args)
+    stream_stats = scheduler.stats()
+    sent = stream_stats["heartbeat"]["sent"]
 
     elapsed = time.time() - started
     print(
         f"[scenario] Bootstrap complete; sent {sent} heartbeats in {elapsed:.1f}s (no motion commands issued)"
     )
+    print(f"[scenario] Stream timing: {scheduler.format_stats()}")
 
     write_summary(
         "success",
@@ -127,6 +126,8 @@ def main() -> int:
         heartbeat_rate_hz=round(args.heartbeat_rate, 2),
         bootstrap_seconds=round(args.bootstrap_seconds, 2),
         heartbeats_sent=sent,
+        heartbeat_late_p99_ms=stream_stats["heartbeat"]["late_p99_ms"],
+        heartbeat_late_max_ms=stream_stats["heartbeat"]["late_max_ms"],
         elapsed_s=round(elapsed, 2),
     )
 
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""Asyncio runtime shared by the MAVLink scenarios.
+
+The blocking scenarios alternated a heartbeat tick with
+``recv_match(type=..., blocking=True, timeout=0.5)``: heartbeats could be up
+to 0.5 s late, and every message of another type that arrived during a wait
+was thrown away. ``ScenarioRuntime`` instead runs:
+
+- one reader that drains the link as soon as it is readable and feeds every
+  message to a ``MavlinkSession`` (dispatch table, latest-message cache and
+  per-command ACK queues; nothing is filtered out)
+- a ``PeriodicScheduler`` task (``tools/periodic_scheduler.py``) sending the
+  heartbeat, plus any extra periodic streams, on drift-free deadlines
+- awaitable helpers (``wait_heartbeat``, ``command``, ``wait_altitude``,
+  ``param_set``, ``hold``) that first check the session cache or ACK queue
+  and otherwise resolve on the first matching message
+"""
+
+from __future__ import annotations
+
+import asyncio
+import socket
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple
+
+from pymavlink import mavutil
+
+from mavlink_session import MavlinkSession
+
+TOOLS_DIR = Path(__file__).resolve().parent.parent.parent / "tools"
+if str(TOOLS_DIR) not in sys.path:
+    sys.path.insert(0, str(TOOLS_DIR))
+from periodic_scheduler import PeriodicScheduler, PeriodicStream, heartbeat_stream  # noqa: E402
+
+MAV_COMP_AUTOPILOT = mavutil.mavlink.MAV_COMP_ID_AUTOPILOT1
+TEMPORARILY_REJECTED_RETRY_S = 0.5
+THREAD_READER_POLL_S = 0.2
+# Cached telemetry older than this does not satisfy a wait on its own.
+TELEMETRY_MAX_AGE_S = 1.0
+
+
+class ScenarioRuntime:
+    """Event-driven MAVLink session for one scenario; use as ``async with``."""
+
+    def __init__(
+        self, master: mavutil.mavfile, *, heartbeat_rate: float = 1.0, streams: Iterable[PeriodicStream] = ()
+    ) -> None:
+        self.master = master
+        self.session = MavlinkSession()
+        self.scheduler = PeriodicScheduler([heartbeat_stream(master, max(heartbeat_rate, 0.2)), *streams])
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._scheduler_task: Optional[asyncio.Task[None]] = None
+        self._reader_fd: Optional[int] = None
+        self._reader_thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    async def __aenter__(self) -> "ScenarioRuntime":
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.stop()
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        port = getattr(self.master, "port", None)
+        if isinstance(port, socket.socket):
+            # UDP/TCP links are non-blocking sockets: read them from the loop.
+            self._reader_fd = port.fileno()
+            self._loop.add_reader(self._reader_fd, self._drain)
+        else:
+            self._reader_thread = threading.Thread(target=self._thread_reader, name="mavlink-reader", daemon=True)
+            self._reader_thread.start()
+        self._scheduler_task = self._loop.create_task(self.scheduler.run_async())
+
+    async def stop(self) -> None:
+        if self._scheduler_task is not None:
+            self._scheduler_task.cancel()
+            try:
+                await self._scheduler_task
+            except asyncio.CancelledError:
+                pass
+            self._scheduler_task = None
+        if self._reader_fd is not None and self._loop is not None:
+            self._loop.remove_reader(self._reader_fd)
+            self._reader_fd = None
+        if self._reader_thread is not None:
+            self._stopping.set()
+            self._reader_thread.join(timeout=1.0)
+            self._reader_thread = None
+
+    # -- reading and dispatch -------------------------------------------------
+
+    def _drain(self) -> None:
+        while True:
+            message = self.master.recv_msg()
+            if message is None:
+                return
+            self.session.dispatch(message)
+
+    def _thread_reader(self) -> None:
+        assert self._loop is not None
+        while not self._stopping.is_set():
+            message = self.master.recv_match(blocking=True, timeout=THREAD_READER_POLL_S)
+            if message is not None:
+                self._loop.call_soon_threadsafe(self.session.dispatch, message)
+
+    async def _wait_for(self, msg_type: str, check: Callable[[Any], Any], timeout: float, description: str) -> Any:
+        """Resolve with the first non-``None`` ``check(message)`` over incoming ``msg_type`` messages."""
+        assert self._loop is not None, "runtime not started"
+        future: asyncio.Future[Any] = self._loop.create_future()
+
+        def on_message(message: Any) -> None:
+            if not future.done():
+                value = check(message)
+                if value is not None:
+                    future.set_result(value)
+
+        unsubscribe = self.session.subscribe(msg_type, on_message)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(description) from None
+        finally:
+            unsubscribe()
+
+    async def wait_message(
+        self,
+        msg_type: str,
+        predicate: Optional[Callable[[Any], bool]] = None,
+        *,
+        timeout: float,
+        max_age: Optional[float] = None,
+        description: Optional[str] = None,
+    ) -> Any:
+        """Return a ``msg_type`` message matching ``predicate`` or raise ``TimeoutError``.
+
+        A cached message no older than ``max_age`` seconds (any age if
+        ``None``) that already matches is returned without waiting.
+        """
+        def check(message: Any) -> Any:
+            return message if predicate is None or predicate(message) else None
+
+        cached = self.session.cached(msg_type, max_age)
+        if cached is not None and check(cached) is not None:
+            return cached
+        return await self._wait_for(msg_type, check, timeout, description or f"{msg_type} timeout")
+
+    # -- scenario helpers -----------------------------------------------------
+
+    async def hold(self, duration: float) -> None:
+        await asyncio.sleep(max(0.0, duration))
+
+    async def wait_heartbeat(self, timeout: float) -> Tuple[int, int]:
+        message = await self.wait_message("HEARTBEAT", timeout=timeout, description="heartbeat timeout")
+        self.master.target_system = message.get_srcSystem() or 1
+        self.master.target_component = message.get_srcComponent() or MAV_COMP_AUTOPILOT
+        return self.master.target_system, self.master.target_component
+
+    async def param_set(self, name: bytes, value: float, param_type: int, *, repeats: int = 3, spacing: float = 0.2) -> None:
+        target_system = self.master.target_system or 1
+        target_component = self.master.target_component or MAV_COMP_AUTOPILOT
+        for attempt in range(repeats):
+            self.master.mav.param_set_send(target_system, target_component, name, float(value), param_type)
+            if attempt + 1 < repeats:
+                await asyncio.sleep(spacing)
+
+    async def command(
+        self,
+        command: int,
+        params: Tuple[float, ...],
+        *,
+        timeout: float = 8.0,
+        expect_ack: bool = True,
+    ) -> Optional[int]:
+        """Send ``COMMAND_LONG`` and wait for its ``COMMAND_ACK``.
+
+        Returns the final result, or ``None`` when no ACK arrived and
+        ``expect_ack`` is false. ``IN_PROGRESS`` keeps waiting,
+        ``TEMPORARILY_REJECTED`` resends after a short pause, any other
+        non-accepted result raises ``RuntimeError``.
+        """
+        assert self._loop is not None, "runtime not started"
+        deadline = self._loop.time() + timeout
+        confirmation = 0
+        # ACKs queued by earlier sends of this command must not answer this one.
+        self.session.clear_acks(command)
+        self._send_command(command, params, confirmation)
+        while True:
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                break
+            ack = self.session.pop_ack(command)
+            if ack is None:
+                try:
+                    ack = await self._wait_for(
+                        "COMMAND_ACK", lambda _: self.session.pop_ack(command), remaining, f"No COMMAND_ACK for {command}"
+                    )
+                except TimeoutError:
+                    break
+            if ack.result == mavutil.mavlink.MAV_RESULT_ACCEPTED:
+                return ack.result
+            if ack.result == mavutil.mavlink.MAV_RESULT_IN_PROGRESS:
+                continue
+            if ack.result == mavutil.mavlink.MAV_RESULT_TEMPORARILY_REJECTED:
+                await asyncio.sleep(min(TEMPORARILY_REJECTED_RETRY_S, max(0.0, deadline - self._loop.time())))
+                confirmation = min(confirmation + 1, 255)
+                self.session.clear_acks(command)
+                self._send_command(command, params, confirmation)
+                continue
+            raise RuntimeError(f"command {command} rejected with result {ack.result}")
+        if expect_ack:
+            raise TimeoutError(f"No COMMAND_ACK for {command}")
+        return None
+
+    def _send_command(self, command: int, params: Tuple[float, ...], confirmation: int) -> None:
+        self.master.mav.command_long_send(
+            self.master.target_system,
+            self.master.target_component,
+            command,
+            confirmation,
+            *params,
+        )
+
+    async def wait_altitude(
+        self,
+        target_alt: float,
+        comparator: Callable[[float, float], bool],
+        timeout: float,
+    ) -> float:
+        """Wait for ``GLOBAL_POSITION_INT`` relative altitude (m) satisfying ``comparator(alt, target_alt)``.
+
+        Returns at once when the cached position (at most
+        ``TELEMETRY_MAX_AGE_S`` old) already satisfies it.
+        """
+        message = await self.wait_message(
+            "GLOBAL_POSITION_INT",
+            lambda msg: comparator(msg.relative_alt / 1000.0, target_alt),
+            timeout=timeout,
+            max_age=TELEMETRY_MAX_AGE_S,
+            description="altitude check timed out",
+        )
+        return message.relative_alt / 1000.0
+
+    def stats(self) -> dict[str, Any]:
+        heartbeat = self.scheduler.stats().get("heartbeat", {})
+        return {
+            "heartbeats_sent": heartbeat.get("sent", 0),
+            "heartbeat_max_late_s": round(heartbeat.get("late_max_ms", 0.0) / 1000.0, 4),
+            "heartbeat_late_p99_ms": heartbeat.get("late_p99_ms", 0.0),
+            "messages_received": sum(self.session.messages_by_type.values()),
+        }
+
+
+class PhaseTimer:
+    """Wall-clock seconds spent in each named scenario phase (``with timer.phase("arm"): ...``)."""
+
+    def __init__(self) -> None:
+        self.durations: dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.durations[name] = round(time.monotonic() - started, 3)
+
+
+def connect(link: str, *, sysid: int, compid: int) -> mavutil.mavfile:
+    return mavutil.mavlink_connection(link, autoreconnect=True, source_system=sysid, source_component=compid)
+
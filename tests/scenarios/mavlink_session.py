@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""MAVLink session state shared by the scenario helpers.
+
+``recv_match(type=...)`` throws away every message that does not match, so a
+``COMMAND_ACK`` that arrives while a scenario waits on
+``GLOBAL_POSITION_INT`` used to be lost and cost a full retry timeout.
+``MavlinkSession`` sees every message once and keeps:
+
+- a dispatch table: per message type, the handlers to call
+- a telemetry cache: the latest message of each type and when it arrived
+- ACK queues: every ``COMMAND_ACK``, queued by command id until a waiter
+  takes it
+
+It does not read the link itself; ``mavlink_runtime.ScenarioRuntime`` feeds it
+and builds the awaitable waits on top of it.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import Counter, deque
+from typing import Any, Callable, Optional
+
+Handler = Callable[[Any], None]
+
+
+class MavlinkSession:
+    def __init__(self, *, monotonic: Callable[[], float] = time.monotonic) -> None:
+        self.latest: dict[str, Any] = {}
+        self.received_at: dict[str, float] = {}
+        self.messages_by_type: Counter[str] = Counter()
+        self._handlers: dict[str, list[Handler]] = {}
+        self._acks: dict[int, deque[Any]] = {}
+        self._monotonic = monotonic
+
+    def dispatch(self, message: Any) -> None:
+        msg_type = message.get_type()
+        if msg_type == "BAD_DATA":
+            return
+        self.messages_by_type[msg_type] += 1
+        self.latest[msg_type] = message
+        self.received_at[msg_type] = self._monotonic()
+        if msg_type == "COMMAND_ACK":
+            self._acks.setdefault(message.command, deque()).append(message)
+        for handler in tuple(self._handlers.get(msg_type, ())):
+            handler(message)
+
+    def subscribe(self, msg_type: str, handler: Handler) -> Callable[[], None]:
+        """Call ``handler(message)`` for every ``msg_type`` message; returns an unsubscribe function."""
+        self._handlers.setdefault(msg_type, []).append(handler)
+
+        def unsubscribe() -> None:
+            handlers = self._handlers.get(msg_type, [])
+            if handler in handlers:
+                handlers.remove(handler)
+
+        return unsubscribe
+
+    def cached(self, msg_type: str, max_age: Optional[float] = None) -> Any:
+        """Latest ``msg_type`` message, or ``None`` if none arrived or it is older than ``max_age`` seconds."""
+        message = self.latest.get(msg_type)
+        if message is None:
+            return None
+        if max_age is not None and self._monotonic() - self.received_at[msg_type] > max_age:
+            return None
+        return message
+
+    def pop_ack(self, command: int) -> Any:
+        """Oldest queued ``COMMAND_ACK`` for ``command``, or ``None``."""
+        queued = self._acks.get(command)
+        return queued.popleft() if queued else None
+
+    def clear_acks(self, command: int) -> None:
+        self._acks.pop(command, None)
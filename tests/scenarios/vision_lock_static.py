@@ -10,6 +10,7 @@ TOOLS_DIR = REPO_ROOT / "tools"
 if str(TOOLS_DIR) not in sys.path:
     sys.path.insert(0, str(TOOLS_DIR))
 from intercept_tracker import Detection, InterceptTracker  # noqa: E402
+from vision_clock import add_clock_arguments, build_clock  # noqa: E402
 
 def parse_args() -> argparse.Namespace:
     p = argparse.ArgumentParser()
@@ -23,6 +24,7 @@ def parse_args() -> argparse.Namespace:
     p.add_argument("--dropout-every-s", type=float, default=5.5)
     p.add_argument("--dropout-duration-s", type=float, default=0.5)
     p.add_argument("--realtime", action="store_true", help="Pace scenario to wall-clock.")
+    add_clock_arguments(p)
     return p.parse_args()
 
 def write_summary(status: str, **fields):
@@ -39,7 +41,8 @@ def should_dropout(t_s: float, every_s: float, duration_s: float) -> bool:
 def main() -> int:
     a = parse_args(); duration_s=max(1.0,a.duration_s); fps=max(1.0,a.fps); dt=1.0/fps; frames=max(1,int(math.ceil(duration_s*fps)))
     tracker = InterceptTracker(lock_threshold=float(a.lock_threshold), iou_match_threshold=0.5, min_hits_for_lock=max(1, int(a.min_hits)))
-    started=time.time(); mono_start=time.monotonic(); first_track_s=None; first_lock_s=None
+    clock = build_clock(a)
+    started=clock.now(); mono_start=time.monotonic(); first_track_s=None; first_lock_s=None
     mode = "realtime" if a.realtime else "fast"
     print(f"[scenario] Starting static lock test mode={mode} duration={duration_s:.1f}s fps={fps:.1f}")
     for step in range(frames):
@@ -47,7 +50,7 @@ def main() -> int:
         if a.realtime:
             rem = rel_t - (time.monotonic()-mono_start)
             if rem>0: time.sleep(rem)
-        ts=started+rel_t
+        ts=started+rel_t; clock.observe(ts)
         in_warmup = rel_t < max(0.0, a.warmup_s)
         warmup_ratio = 0.0 if a.warmup_s <= 0 else min(1.0, rel_t / a.warmup_s)
         conf = 0.35 + 0.55 * warmup_ratio
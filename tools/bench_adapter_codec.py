@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Benchmark the adapter JSON codec backends on synthetic frame lines.
+
+For every installed backend (``msgspec``, ``orjson``, stdlib ``json``) this
+times, in frames per second:
+
+- ``encode``: adapter-side ``codec.dumps`` of frame dicts
+- ``generic``: ``codec.loads`` + ``normalize_adapter_frame`` + tracker
+  detection parsing (the historical double pass)
+- ``typed``: ``decode_tracker_frame`` straight to typed detections
+- ``batch``: ``codec.loads`` + ``normalize_adapter_batch`` (columnar arrays)
+
+``typed_vs_json`` compares each typed rate with the stdlib generic path. All
+backends and paths must yield identical frames and detections.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from typing import Any, Callable
+
+from intercept_adapter_contract import (
+    available_codecs,
+    decode_tracker_frame,
+    get_codec,
+    normalize_adapter_batch,
+    normalize_adapter_frame,
+)
+from intercept_tracker import _frame_to_detections
+
+
+def _frames(count: int, cameras: int, max_detections: int, seed: int) -> list[dict[str, Any]]:
+    rng = random.Random(seed)
+    frames = []
+    for step in range(count):
+        detections = []
+        for index in range(rng.randint(1, max_detections)):
+            cx, cy = rng.uniform(0, 640), rng.uniform(0, 480)
+            half = rng.uniform(8, 32)
+            detections.append(
+                {
+                    "bbox": [round(cx - half, 4), round(cy - half, 4), round(cx + half, 4), round(cy + half, 4)],
+                    "confidence": round(rng.random(), 4),
+                    "target_signature": f"target_{index}",
+                }
+            )
+        frames.append({"timestamp": 1.7e9 + step / 30.0, "camera_id": f"cam_{step % cameras}", "detections": detections})
+    return frames
+
+
+def _rate(count: int, fn: Callable[[], Any], repeat: int) -> tuple[float, Any]:
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return count / max(best, 1e-9), result
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=20000, help="Frames per timed pass.")
+    parser.add_argument("--cameras", type=int, default=3)
+    parser.add_argument("--max-detections", type=int, default=3, help="Detections per frame are 1..N.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed passes per measurement (best is reported).")
+    parser.add_argument("--seed", type=int, default=7)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv or sys.argv[1:])
+    frames = _frames(args.frames, args.cameras, args.max_detections, args.seed)
+    reference_dumps = get_codec("json").dumps
+    lines = [reference_dumps(frame) for frame in frames]
+
+    def generic(codec):
+        out = []
+        for line in lines:
+            frame = normalize_adapter_frame(codec.loads(line))
+            frame["detections"] = _frame_to_detections(frame)
+            out.append(frame)
+        return out
+
+    print(f"{'codec':>8} {'encode_fps':>12} {'generic_fps':>12} {'typed_fps':>12} {'batch_fps':>12} {'typed_vs_json':>14}")
+    reference = None
+    baseline_fps = None
+    for name in reversed(available_codecs()):
+        codec = get_codec(name)
+        encode_fps, _ = _rate(len(frames), lambda: [codec.dumps(frame) for frame in frames], args.repeat)
+        generic_fps, generic_out = _rate(len(lines), lambda: generic(codec), args.repeat)
+        typed_fps, typed_out = _rate(len(lines), lambda: [decode_tracker_frame(line, codec=codec) for line in lines], args.repeat)
+        batch_fps, batch = _rate(len(lines), lambda: normalize_adapter_batch([codec.loads(line) for line in lines]), args.repeat)
+        if reference is None:
+            reference = generic_out
+            baseline_fps = generic_fps
+        if generic_out != reference or typed_out != reference or list(batch.frames()) != reference:
+            print(f"[bench] decoded frame mismatch for codec {name}", file=sys.stderr)
+            return 1
+        print(f"{name:>8} {encode_fps:>12.0f} {generic_fps:>12.0f} {typed_fps:>12.0f} {batch_fps:>12.0f} {typed_fps / baseline_fps:>13.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
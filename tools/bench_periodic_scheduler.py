@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Compare ``PeriodicScheduler`` timing with the legacy heartbeat tick loop.
+
+The legacy loop (the old ``HeartbeatMaintainer``) checked ``now >= next``
+every ``--legacy-poll-s`` and then set ``next = now + interval``, so each
+send inherits the previous one's lateness. For each stream rate the bench
+reports the achieved rate and lateness against ideal deadlines
+``start + k / rate`` for both, with a no-op send so only scheduling is timed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+
+from periodic_scheduler import JitterStats, PeriodicScheduler, PeriodicStream
+
+
+def _legacy(rates: list[float], seconds: float, poll_s: float) -> dict[str, dict[str, float]]:
+    started = time.monotonic()
+    next_send = [started] * len(rates)
+    sends: list[list[float]] = [[] for _ in rates]
+    while time.monotonic() - started < seconds:
+        for index, rate in enumerate(rates):
+            now = time.monotonic()
+            if now >= next_send[index]:
+                sends[index].append(now)
+                next_send[index] = now + 1.0 / rate
+        time.sleep(poll_s)
+    report = {}
+    for rate, times in zip(rates, sends):
+        stats = JitterStats(rate)
+        for index, sent_at in enumerate(times):
+            stats.record(sent_at, max(0.0, sent_at - (started + index / rate)))
+        report[f"{rate:g}Hz"] = stats.as_dict()
+    return report
+
+
+def _scheduled(rates: list[float], seconds: float) -> dict[str, dict[str, float]]:
+    scheduler = PeriodicScheduler([PeriodicStream(f"{rate:g}Hz", rate, lambda: None) for rate in rates])
+    with scheduler:
+        time.sleep(seconds)
+    return scheduler.stats()
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rates", default="1,10,30,50", help="Comma-separated stream rates in Hz.")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--legacy-poll-s", type=float, default=0.1, help="Legacy loop sleep between ticks.")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv or sys.argv[1:])
+    rates = [float(value) for value in args.rates.split(",") if value.strip()]
+    print(f"{'mode':>10} {'stream':>8} {'achieved_hz':>12} {'sent':>6} {'missed':>7} {'p50_ms':>9} {'p99_ms':>9} {'max_ms':>9}")
+    for mode, report in (("legacy", _legacy(rates, args.seconds, args.legacy_poll_s)), ("scheduler", _scheduled(rates, args.seconds))):
+        for name, entry in report.items():
+            print(
+                f"{mode:>10} {name:>8} {entry['achieved_hz']:>12.2f} {entry['sent']:>6} {entry['missed']:>7} "
+                f"{entry['late_p50_ms']:>9.2f} {entry['late_p99_ms']:>9.2f} {entry['late_max_ms']:>9.2f}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
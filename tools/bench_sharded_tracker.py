@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Benchmark sharded (per-camera worker process) tracking against the serial tracker.
+
+Builds an in-memory multi-camera, multi-target adapter JSONL stream, runs it
+through ``_iter_tracking_outputs`` over ``_iter_decoded_lines`` (what
+``intercept_tracker.py --input-jsonl`` does) and through
+``ShardedTracking.run_lines`` for each requested shard count, and reports
+frames/s and speedup over serial. Every sharded run must reproduce the serial
+track and event stream exactly. Speedup is bounded by the cores available
+(``os.cpu_count()`` is printed) and by the coordinator: ``coordinator_fps`` is
+frames per second of coordinator CPU time (line keying, pickling and merge),
+i.e. the sharded ceiling given enough cores; ``ticks_per_frame`` is the TTL
+expiry ticks sent per frame.
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from typing import Any
+
+from intercept_adapter_contract import get_codec
+from intercept_tracker import InterceptTracker, _iter_decoded_lines, _iter_tracking_outputs
+from sharded_tracker import ShardedTracking
+
+
+def _lines(args: argparse.Namespace) -> list[str]:
+    rng = random.Random(args.seed)
+    codec = get_codec()
+    cameras = [f"cam_{index}" for index in range(args.cameras)]
+    lines = []
+    for step in range(args.frames_per_camera):
+        timestamp = 1000.0 + step / 30.0
+        for cam_index, camera_id in enumerate(cameras):
+            detections = []
+            for target in range(args.targets):
+                cx = 320 + 200 * math.sin(step / 40.0 + target * 1.3) + rng.uniform(-2, 2)
+                cy = 240 + 150 * math.cos(step / 55.0 + target * 0.7) + rng.uniform(-2, 2)
+                signature = f"tgt_{(target + step // 150 + cam_index) % (args.targets + 2)}"
+                detections.append(
+                    {"bbox": [cx - 18, cy - 18, cx + 18, cy + 18], "confidence": rng.uniform(0.4, 1.0), "target_signature": signature}
+                )
+            lines.append(codec.dumps({"timestamp": timestamp, "camera_id": camera_id, "detections": detections}))
+    return lines
+
+
+def _options(args: argparse.Namespace) -> dict[str, Any]:
+    return {
+        "lock_threshold": 0.72,
+        "iou_match_threshold": 0.25,
+        "min_hits_for_lock": 3,
+        "multi_target": True,
+        "track_ttl_s": 2.0,
+        "max_tracks_per_camera": 64,
+    }
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cameras", type=int, default=6)
+    parser.add_argument("--frames-per-camera", type=int, default=3000)
+    parser.add_argument("--targets", type=int, default=8, help="Detections per frame.")
+    parser.add_argument("--shard-counts", default="1,2,4,6", help="Comma-separated shard counts to time.")
+    parser.add_argument("--batch-frames", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=7)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv or sys.argv[1:])
+    lines = _lines(args)
+    counts = [int(v) for v in args.shard_counts.split(",") if v.strip()]
+    print(f"[bench] {len(lines)} frames, {args.cameras} cameras, {args.targets} targets/frame, cpu_count={os.cpu_count()}")
+
+    started = time.perf_counter()
+    reference = list(_iter_tracking_outputs(InterceptTracker(**_options(args)), _iter_decoded_lines(lines, "bench", "bench", None)))
+    serial_s = time.perf_counter() - started
+    print(f"{'mode':>10} {'frames_per_s':>14} {'speedup':>9} {'coordinator_fps':>16} {'ticks_per_frame':>16}")
+    print(f"{'serial':>10} {len(lines) / serial_s:>14.0f} {1.0:>8.2f}x")
+
+    for count in counts:
+        sharded = ShardedTracking(_options(args), count, batch_frames=args.batch_frames)
+        started = time.perf_counter()
+        cpu_started = time.process_time()
+        merged = list(sharded.run_lines(lines, source_name="bench"))
+        coordinator_cpu_s = time.process_time() - cpu_started
+        elapsed_s = time.perf_counter() - started
+        if merged != reference:
+            print(f"[bench] sharded output mismatch at {count} shards", file=sys.stderr)
+            return 1
+        print(
+            f"{f'shards={count}':>10} {len(lines) / elapsed_s:>14.0f} {serial_s / elapsed_s:>8.2f}x "
+            f"{len(lines) / max(coordinator_cpu_s, 1e-9):>16.0f} {sharded.expiry_ticks / len(lines):>16.2f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Benchmark InterceptTracker candidate lookup: spatial grid vs linear scan.
+
+Populates one camera with N live tracks spread over a frame, then times
+single-detection ``update()`` calls that each re-associate with an existing
+track. Both modes must produce identical track assignments.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+
+from intercept_tracker import Detection, InterceptTracker
+
+
+def _populate(tracker: InterceptTracker, centers: list[tuple[float, float]], box: float) -> None:
+    half = box / 2.0
+    for index, (cx, cy) in enumerate(centers):
+        tracker.update(0.0, "bench_cam", [Detection((cx - half, cy - half, cx + half, cy + half), 0.9, f"t{index}")])
+
+
+def _run(track_count: int, frames: int, grid_cell_px: float | None, args: argparse.Namespace) -> tuple[float, list[str], int]:
+    rng = random.Random(args.seed)
+    centers = [(rng.uniform(0, args.frame_width), rng.uniform(0, args.frame_height)) for _ in range(track_count)]
+    tracker = InterceptTracker(
+        lock_threshold=0.72,
+        iou_match_threshold=0.25,
+        min_hits_for_lock=3,
+        grid_cell_size=grid_cell_px,
+    )
+    _populate(tracker, centers, args.box_px)
+    live_tracks = tracker.live_track_count
+
+    half = args.box_px / 2.0
+    probes = []
+    for _ in range(frames):
+        cx, cy = centers[rng.randrange(track_count)]
+        cx += rng.uniform(-2.0, 2.0)
+        cy += rng.uniform(-2.0, 2.0)
+        probes.append(Detection((cx - half, cy - half, cx + half, cy + half), 0.9, "probe"))
+
+    assigned: list[str] = []
+    started = time.perf_counter()
+    for step, detection in enumerate(probes, start=1):
+        result, _ = tracker.update(float(step) * 0.01, "bench_cam", [detection])
+        assigned.append(str(result["track_id"]))
+    return time.perf_counter() - started, assigned, live_tracks
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--track-counts", default="10,100,1000", help="Comma-separated live track counts.")
+    parser.add_argument("--frames", type=int, default=2000, help="Associations timed per track count.")
+    parser.add_argument("--grid-cell-px", type=float, default=64.0, help="Grid cell size under test.")
+    parser.add_argument("--box-px", type=float, default=24.0, help="Track bbox edge length.")
+    parser.add_argument("--frame-width", type=float, default=1920.0)
+    parser.add_argument("--frame-height", type=float, default=1080.0)
+    parser.add_argument("--seed", type=int, default=7)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv or sys.argv[1:])
+    counts = [int(v) for v in args.track_counts.split(",") if v.strip()]
+    print(f"{'requested':>9} {'live':>6} {'linear_us':>12} {'grid_us':>12} {'speedup':>9}")
+    for count in counts:
+        linear_s, linear_ids, live = _run(count, args.frames, None, args)
+        grid_s, grid_ids, _ = _run(count, args.frames, args.grid_cell_px, args)
+        if linear_ids != grid_ids:
+            print(f"[bench] assignment mismatch at {count} tracks", file=sys.stderr)
+            return 1
+        linear_us = linear_s / args.frames * 1e6
+        grid_us = grid_s / args.frames * 1e6
+        print(f"{count:>9} {live:>6} {linear_us:>12.2f} {grid_us:>12.2f} {linear_us / max(grid_us, 1e-9):>8.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""Benchmark ``qgc_virtual_px4.py`` the way QGC drives it.
+
+``params``: starts the stub with ``--synthetic-params N`` (or ``--param-file``)
+and acts as the GCS. It times the full ``PARAM_REQUEST_LIST`` load,
+re-requesting missing indices by index the way QGC does, and then a burst of
+``PARAM_REQUEST_READ`` by name. It reports the load time, params/s and kB/s,
+and checks that every read is answered by exactly that one parameter.
+
+``fleet``: starts the stub with ``--vehicles N`` and listens as one GCS for
+all of them. It counts ATTITUDE / GLOBAL_POSITION_INT / SYS_STATUS per sysid
+over the measurement window and reports the achieved rates next to the
+configured ones, plus the stub's own loop report (busy fraction, wakeup
+lateness, missed periods) from ``--report-json``.
+
+``mission``: uploads a plan the way QGC's plan manager does (``MISSION_COUNT``,
+then each ``MISSION_ITEM_INT`` the vehicle requests), downloads it back
+item by item, and checks the round trip. The plan is a QGC ``.plan`` file
+(``--plan``) or ``--waypoints N`` generated survey legs. ``--item-latency-ms``
+and ``--loss`` are passed to the stub; the GCS side resends after
+``--gcs-retry-ms`` of silence. It prints GCS-side and stub-side timing for each
+direction.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Optional
+
+from pymavlink import mavutil
+
+TOOLS_DIR = Path(__file__).resolve().parent
+STUB = TOOLS_DIR / "qgc_virtual_px4.py"
+QUIET_S = 0.5
+
+
+def _start_stub(args: argparse.Namespace, extra: list[str]) -> subprocess.Popen[bytes]:
+    command = [
+        sys.executable,
+        str(STUB),
+        "--bind-host",
+        "127.0.0.1",
+        "--bind-port",
+        str(args.stub_port),
+        "--target-port",
+        str(args.gcs_port),
+        "--duration",
+        str(args.stub_duration_s),
+        "--skip-heartbeat-check",
+        "--skip-param-check",
+        "--log-level",
+        args.stub_log_level,
+        *extra,
+    ]
+    return subprocess.Popen(command)
+
+
+def _connect(args: argparse.Namespace) -> Any:
+    link = mavutil.mavlink_connection(f"udp:127.0.0.1:{args.gcs_port}", source_system=255, source_component=190)
+    if link.recv_match(type="HEARTBEAT", blocking=True, timeout=10.0) is None:
+        raise SystemExit("virtual PX4 did not send a heartbeat")
+    return link
+
+
+def _collect_params(link: Any, received: dict[int, str], deadline_s: float) -> int:
+    """Gather PARAM_VALUE until ``QUIET_S`` of silence; returns the advertised count."""
+    count = 0
+    last_seen = time.monotonic()
+    while time.monotonic() - last_seen < QUIET_S and time.monotonic() < deadline_s:
+        message = link.recv_match(type="PARAM_VALUE", blocking=True, timeout=0.05)
+        if message is None:
+            continue
+        last_seen = time.monotonic()
+        count = message.param_count
+        received[message.param_index] = message.param_id
+        if count and len(received) >= count:
+            break
+    return count
+
+
+def bench_params(args: argparse.Namespace) -> int:
+    extra = ["--link-kbps", str(args.link_kbps)]
+    extra += ["--param-file", args.param_file] if args.param_file else ["--synthetic-params", str(args.params)]
+    stub = _start_stub(args, extra)
+    try:
+        link = _connect(args)
+        deadline = time.monotonic() + args.timeout_s
+        received: dict[int, str] = {}
+        started = time.monotonic()
+        bytes_before = link.mav.total_bytes_received
+        link.mav.param_request_list_send(1, 1)
+        count = _collect_params(link, received, deadline)
+        rerequests = 0
+        while count and len(received) < count and time.monotonic() < deadline:
+            for index in sorted(set(range(count)) - set(received)):
+                link.mav.param_request_read_send(1, 1, b"", index)
+                rerequests += 1
+            _collect_params(link, received, deadline)
+        load_s = time.monotonic() - started
+        load_bytes = link.mav.total_bytes_received - bytes_before
+        if not count or len(received) < count:
+            print(f"[bench] parameter load incomplete: {len(received)}/{count}", file=sys.stderr)
+            return 1
+
+        rng = random.Random(args.seed)
+        names = rng.sample(sorted(set(received.values())), min(args.reads, len(received)))
+        read_started = time.monotonic()
+        for name in names:
+            link.mav.param_request_read_send(1, 1, name.encode("ascii"), -1)
+        answers: list[str] = []
+        while len(answers) < len(names) and time.monotonic() < deadline:
+            message = link.recv_match(type="PARAM_VALUE", blocking=True, timeout=QUIET_S)
+            if message is None:
+                break
+            answers.append(message.param_id)
+        read_s = time.monotonic() - read_started
+        if sorted(answers) != sorted(names):
+            print(f"[bench] PARAM_REQUEST_READ answered {len(answers)} values for {len(names)} requests", file=sys.stderr)
+            return 1
+
+        print(f"{'params':>7} {'link_kbps':>10} {'load_s':>8} {'params_per_s':>13} {'kB_per_s':>9} {'rerequests':>11} {'reads':>6} {'read_burst_ms':>14}")
+        print(
+            f"{count:>7} {args.link_kbps:>10.0f} {load_s:>8.3f} {count / load_s:>13.0f} {load_bytes / load_s / 1000.0:>9.1f} "
+            f"{rerequests:>11} {len(names):>6} {read_s * 1000.0:>14.1f}"
+        )
+        link.close()
+        return 0
+    finally:
+        stub.terminate()
+        stub.wait(timeout=5.0)
+
+
+FLEET_STREAMS = (("ATTITUDE", "attitude_rate"), ("GLOBAL_POSITION_INT", "position_rate"), ("SYS_STATUS", "sys_status_rate"))
+
+
+def bench_fleet(args: argparse.Namespace) -> int:
+    report_path = Path(tempfile.mkdtemp(prefix="bench_fleet_")) / "fleet_report.json"
+    args.stub_duration_s = args.warmup_s + args.seconds + 1.0
+    extra = [
+        "--vehicles", str(args.vehicles),
+        "--attitude-rate", str(args.attitude_rate),
+        "--position-rate", str(args.position_rate),
+        "--sys-status-rate", str(args.sys_status_rate),
+        "--report-json", str(report_path),
+    ]  # fmt: skip
+    stub = _start_stub(args, extra)
+    try:
+        link = _connect(args)
+        warmup_end = time.monotonic() + args.warmup_s
+        while time.monotonic() < warmup_end:
+            link.recv_msg() or time.sleep(0.001)
+        counts: Counter[tuple[int, str]] = Counter()
+        wanted = {name for name, _ in FLEET_STREAMS}
+        started = time.monotonic()
+        end = started + args.seconds
+        while time.monotonic() < end:
+            message = link.recv_match(blocking=True, timeout=0.05)
+            if message is not None and message.get_type() in wanted:
+                counts[(message.get_srcSystem(), message.get_type())] += 1
+        window_s = time.monotonic() - started
+        link.close()
+        stub.wait(timeout=args.stub_duration_s + 10.0)
+    finally:
+        if stub.poll() is None:
+            stub.terminate()
+            stub.wait(timeout=5.0)
+
+    sysids = range(1, args.vehicles + 1)
+    print(f"{'sysid':>6} " + " ".join(f"{name.lower():>20}" for name, _ in FLEET_STREAMS))
+    worst: dict[str, float] = {}
+    for sysid in sysids:
+        cells = []
+        for name, rate_attr in FLEET_STREAMS:
+            rate = counts[(sysid, name)] / window_s
+            target = getattr(args, rate_attr)
+            if target > 0:
+                worst[name] = min(worst.get(name, 1.0), rate / target)
+            cells.append(f"{rate:.1f}/{target:g} Hz")
+        if args.vehicles <= args.max_rows or sysid in (1, args.vehicles):
+            print(f"{sysid:>6} " + " ".join(f"{cell:>20}" for cell in cells))
+    total = sum(counts.values()) / window_s
+    print(f"received {total:.0f} telemetry msgs/s from {len({sysid for sysid, _ in counts})}/{args.vehicles} vehicles; "
+          + ", ".join(f"worst {name.lower()} {100.0 * ratio:.0f}% of target" for name, ratio in worst.items()))
+    if report_path.exists():
+        report = json.loads(report_path.read_text(encoding="utf-8"))
+        loop = report["loop"]
+        print(
+            f"stub: {report['tx_msgs_per_s']:.0f} msgs/s sent, {report['missed_periods']} missed periods, "
+            f"loop busy {100.0 * loop['busy_fraction']:.1f}%, wake late p50 {loop['wake_late_p50_ms']:.2f} ms "
+            f"p99 {loop['wake_late_p99_ms']:.2f} ms max {loop['wake_late_max_ms']:.2f} ms"
+        )
+    return 0
+
+
+GLOBAL_FRAMES = frozenset({0, 3, 5, 6, 10, 11})  # MAV_FRAME_GLOBAL* variants, lat/lon in x/y
+MissionRow = tuple[int, int, int, float, float, float, float, int, int, float]
+MAX_GCS_RETRIES = 5
+
+
+def load_plan_items(path: Path) -> list[MissionRow]:
+    """``(frame, command, autocontinue, param1..4, x, y, z)`` for each SimpleItem of a QGC plan."""
+    mission = json.loads(path.read_text(encoding="utf-8"))["mission"]
+    rows: list[MissionRow] = []
+    for item in mission["items"]:
+        if item.get("type") != "SimpleItem":
+            raise SystemExit(f"{path}: only SimpleItem entries are supported, found {item.get('type')!r}")
+        params = [math.nan if value is None else float(value) for value in item["params"]]
+        frame = int(item["frame"])
+        scale = 1e7 if frame in GLOBAL_FRAMES else 1.0
+        rows.append(
+            (frame, int(item["command"]), int(item.get("autoContinue", True)), *params[:4],
+             int(round(params[4] * scale)), int(round(params[5] * scale)), params[6])
+        )  # fmt: skip
+    return rows
+
+
+def synthetic_plan(waypoints: int) -> list[MissionRow]:
+    """Takeoff, ``waypoints - 2`` lawnmower legs 20 m apart, land."""
+    mavlink = mavutil.mavlink
+    lat0, lon0 = 47.397742, 8.545594
+    rows: list[MissionRow] = [
+        (mavlink.MAV_FRAME_GLOBAL_RELATIVE_ALT_INT, mavlink.MAV_CMD_NAV_TAKEOFF, 1, 0.0, 0.0, 0.0, math.nan, int(lat0 * 1e7), int(lon0 * 1e7), 10.0)
+    ]
+    for index in range(max(0, waypoints - 2)):
+        row, end = divmod(index, 2)
+        north_m = 20.0 * row
+        east_m = 200.0 * (end ^ (row % 2))
+        rows.append(
+            (mavlink.MAV_FRAME_GLOBAL_RELATIVE_ALT_INT, mavlink.MAV_CMD_NAV_WAYPOINT, 1, 0.0, 0.0, 0.0, math.nan,
+             int((lat0 + north_m / 111_320.0) * 1e7), int((lon0 + east_m / 75_500.0) * 1e7), 30.0)
+        )  # fmt: skip
+    rows.append((mavlink.MAV_FRAME_GLOBAL_RELATIVE_ALT_INT, mavlink.MAV_CMD_NAV_LAND, 1, 0.0, 0.0, 0.0, math.nan, int(lat0 * 1e7), int(lon0 * 1e7), 0.0))
+    return rows[:waypoints]
+
+
+def _f32(value: float) -> float:
+    return struct.unpack("<f", struct.pack("<f", value))[0]
+
+
+def _same_row(sent: MissionRow, received: MissionRow) -> bool:
+    for a, b in zip(sent, received):
+        if isinstance(a, float):
+            a, b = _f32(a), _f32(b)
+            if not (a == b or (math.isnan(a) and math.isnan(b))):
+                return False
+        elif a != b:
+            return False
+    return True
+
+
+def _upload(link: Any, rows: list[MissionRow], retry_s: float) -> tuple[float, int]:
+    """Send ``rows`` as the vehicle requests them; returns (seconds, GCS resends)."""
+    started = time.monotonic()
+    link.mav.mission_count_send(1, 1, len(rows))
+    last_sent: Optional[int] = None
+    resends = retries = 0
+    while True:
+        message = link.recv_match(type=["MISSION_REQUEST_INT", "MISSION_REQUEST", "MISSION_ACK"], blocking=True, timeout=retry_s)
+        if message is None:
+            retries += 1
+            if retries > MAX_GCS_RETRIES:
+                raise SystemExit(f"mission upload stalled after item {last_sent}")
+            resends += 1
+            if last_sent is None:
+                link.mav.mission_count_send(1, 1, len(rows))
+            else:
+                link.mav.mission_item_int_send(1, 1, last_sent, rows[last_sent][0], rows[last_sent][1], 0, *rows[last_sent][2:])
+            continue
+        if message.get_type() == "MISSION_ACK":
+            if message.type != mavutil.mavlink.MAV_MISSION_ACCEPTED:
+                raise SystemExit(f"mission upload rejected: {message.type}")
+            return time.monotonic() - started, resends
+        retries = 0
+        last_sent = message.seq
+        row = rows[message.seq]
+        link.mav.mission_item_int_send(1, 1, message.seq, row[0], row[1], 0, *row[2:])
+
+
+def _download(link: Any, retry_s: float) -> tuple[list[MissionRow], float, int]:
+    """Read the vehicle's mission item by item; returns (rows, seconds, GCS resends)."""
+    started = time.monotonic()
+    resends = 0
+    count = None
+    for attempt in range(MAX_GCS_RETRIES + 1):
+        link.mav.mission_request_list_send(1, 1)
+        message = link.recv_match(type="MISSION_COUNT", blocking=True, timeout=retry_s)
+        if message is not None:
+            count = message.count
+            break
+        resends += 1
+    if count is None:
+        raise SystemExit("vehicle did not answer MISSION_REQUEST_LIST")
+    rows: list[MissionRow] = []
+    for seq in range(count):
+        for attempt in range(MAX_GCS_RETRIES + 1):
+            resends += attempt > 0
+            link.mav.mission_request_int_send(1, 1, seq)
+            deadline = time.monotonic() + retry_s
+            message = None
+            while message is None and time.monotonic() < deadline:
+                candidate = link.recv_match(type="MISSION_ITEM_INT", blocking=True, timeout=max(0.0, deadline - time.monotonic()))
+                if candidate is not None and candidate.seq == seq:
+                    message = candidate
+            if message is not None:
+                break
+        else:
+            raise SystemExit(f"mission download stalled at item {seq}")
+        rows.append(
+            (message.frame, message.command, message.autocontinue, message.param1, message.param2,
+             message.param3, message.param4, message.x, message.y, message.z)
+        )  # fmt: skip
+    link.mav.mission_ack_send(1, 1, mavutil.mavlink.MAV_MISSION_ACCEPTED)
+    return rows, time.monotonic() - started, resends
+
+
+def bench_mission(args: argparse.Namespace) -> int:
+    rows = load_plan_items(Path(args.plan)) if args.plan else synthetic_plan(args.waypoints)
+    report_path = Path(tempfile.mkdtemp(prefix="bench_mission_")) / "stub_report.json"
+    extra = [
+        "--mission-item-latency-ms", str(args.item_latency_ms),
+        "--mission-loss", str(args.loss),
+        "--mission-seed", str(args.seed),
+        "--attitude-rate", "0",
+        "--position-rate", "0",
+        "--sys-status-rate", "0",
+        "--report-json", str(report_path),
+    ]  # fmt: skip
+    stub = _start_stub(args, extra)
+    try:
+        link = _connect(args)
+        retry_s = args.gcs_retry_ms / 1000.0
+        upload_s, upload_resends = _upload(link, rows, retry_s)
+        received, download_s, download_resends = _download(link, retry_s)
+        link.close()
+    finally:
+        # SIGTERM: the stub finishes its loop and writes the report.
+        stub.terminate()
+        stub.wait(timeout=5.0)
+    if len(received) != len(rows) or not all(_same_row(a, b) for a, b in zip(rows, received)):
+        print(f"[bench] downloaded mission differs from the uploaded plan ({len(received)}/{len(rows)} items)", file=sys.stderr)
+        return 1
+
+    transfers = []
+    if report_path.exists():
+        transfers = json.loads(report_path.read_text(encoding="utf-8"))["missions"]["transfers"]
+    stub_side = {transfer["direction"]: transfer for transfer in transfers if transfer["result"] != "superseded"}
+    print(f"{'direction':>9} {'items':>6} {'latency_ms':>11} {'loss':>5} {'gcs_s':>8} {'items_per_s':>12} {'gcs_resends':>12} {'stub_s':>8} {'stub_rerequests':>16} {'dropped':>8}")
+    for direction, seconds, resends in (("upload", upload_s, upload_resends), ("download", download_s, download_resends)):
+        stub_entry = stub_side.get(direction, {})
+        print(
+            f"{direction:>9} {len(rows):>6} {args.item_latency_ms:>11g} {args.loss:>5g} {seconds:>8.3f} {len(rows) / seconds:>12.0f} "
+            f"{resends:>12} {stub_entry.get('duration_s', math.nan):>8.3f} {stub_entry.get('rerequests', 0):>16} {stub_entry.get('dropped', 0):>8}"
+        )
+    return 0
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stub-port", type=int, default=14760, help="UDP port the stub binds")
+    parser.add_argument("--gcs-port", type=int, default=14750, help="UDP port this bench listens on as the GCS")
+    parser.add_argument("--stub-duration-s", type=float, default=120.0)
+    parser.add_argument("--stub-log-level", default="WARNING")
+    parser.add_argument("--timeout-s", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=7)
+    modes = parser.add_subparsers(dest="mode", required=True)
+
+    params = modes.add_parser("params", help="Parameter list load and read-by-name burst")
+    params.add_argument("--params", type=int, default=1500, help="Synthetic parameter count")
+    params.add_argument("--param-file", help="Serve this parameter dump instead of synthetic parameters")
+    params.add_argument("--link-kbps", type=float, default=1000.0, help="Stub parameter stream budget (0: unpaced)")
+    params.add_argument("--reads", type=int, default=200, help="PARAM_REQUEST_READ by name sent in one burst")
+    params.set_defaults(run=bench_params)
+
+    fleet = modes.add_parser("fleet", help="Per-vehicle telemetry rates and loop overrun for --vehicles N")
+    fleet.add_argument("--vehicles", type=int, default=32)
+    fleet.add_argument("--attitude-rate", type=float, default=20.0)
+    fleet.add_argument("--position-rate", type=float, default=5.0)
+    fleet.add_argument("--sys-status-rate", type=float, default=1.0)
+    fleet.add_argument("--warmup-s", type=float, default=1.0)
+    fleet.add_argument("--seconds", type=float, default=5.0, help="Measurement window")
+    fleet.add_argument("--max-rows", type=int, default=16, help="Print every vehicle up to this many, else first/last")
+    fleet.set_defaults(run=bench_fleet)
+
+    mission = modes.add_parser("mission", help="Plan upload and download round trip")
+    mission.add_argument("--plan", help="QGC .plan file to transfer (SimpleItem entries only)")
+    mission.add_argument("--waypoints", type=int, default=1000, help="Generated plan size when --plan is not given")
+    mission.add_argument("--item-latency-ms", type=float, default=0.0, help="Stub delay per mission response")
+    mission.add_argument("--loss", type=float, default=0.0, help="Stub drop rate for mission messages")
+    mission.add_argument("--gcs-retry-ms", type=float, default=1500.0, help="GCS resend timeout (QGC uses 1500 ms)")
+    mission.set_defaults(run=bench_mission)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv or sys.argv[1:])
+    return args.run(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
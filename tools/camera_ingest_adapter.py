@@ -2,28 +2,34 @@
 """Camera ingest adapter that emits tracker-ready JSONL frames."""
 from __future__ import annotations
 
-import argparse, json, math, sys, time
+import argparse, math, sys, time
 from pathlib import Path
 from typing import Any, Iterable
-from intercept_adapter_contract import normalize_adapter_frame
+from intercept_adapter_contract import get_codec, normalize_adapter_frame
+from vision_clock import Clock, WallClock, add_clock_arguments, build_clock
+from vision_diagnostics import Diagnostics, add_diagnostics_arguments, build_diagnostics
 
 
-def _iter_jsonl_stream(lines: Iterable[str], source_name: str) -> Iterable[dict[str, Any]]:
+def _iter_jsonl_stream(lines: Iterable[str], source_name: str, diagnostics: Diagnostics | None = None) -> Iterable[dict[str, Any]]:
+    loads = get_codec().loads
     for line_number, raw_line in enumerate(lines, start=1):
         line = raw_line.strip()
         if not line:
             continue
-        payload = json.loads(line)
+        payload = loads(line)
         if not isinstance(payload, dict):
             raise SystemExit(f"Expected object JSON in {source_name} line {line_number}")
-        frame = normalize_adapter_frame(payload, source_name=source_name, line_number=line_number)
+        frame = normalize_adapter_frame(payload, source_name=source_name, line_number=line_number, drops=diagnostics)
         if frame is not None:
             yield frame
 
 
-def _iter_simulated_camera_frames(camera_id: str, duration_s: float, fps: float, realtime: bool) -> Iterable[dict[str, Any]]:
+def _iter_simulated_camera_frames(
+    camera_id: str, duration_s: float, fps: float, realtime: bool, clock: Clock | None = None
+) -> Iterable[dict[str, Any]]:
+    clock = clock or WallClock()
     frame_count = max(1, int(max(duration_s, 0.01) * max(fps, 0.1)))
-    start_ts = time.time()
+    start_ts = clock.now()
     wall_start = time.monotonic()
     for step in range(frame_count):
         if realtime:
@@ -32,6 +38,7 @@ def _iter_simulated_camera_frames(camera_id: str, duration_s: float, fps: float,
             if remaining > 0:
                 time.sleep(remaining)
         timestamp = start_ts + step / max(fps, 0.1)
+        clock.observe(timestamp)
         phase = (step / max(1, frame_count - 1)) * math.tau
         cx = 320.0 + 48.0 * math.sin(phase)
         cy = 240.0 + 28.0 * math.cos(phase * 0.7)
@@ -50,29 +57,30 @@ def parse_args(argv: list[str]) -> argparse.Namespace:
     p.add_argument("--duration-s", type=float, default=20.0)
     p.add_argument("--fps", type=float, default=5.0)
     p.add_argument("--realtime", action="store_true", help="Pace emitted frames to wall-clock FPS.")
+    add_clock_arguments(p)
+    add_diagnostics_arguments(p)
     return p.parse_args(argv)
 
 
 def main(argv: list[str] | None = None) -> int:
     args = parse_args(argv or sys.argv[1:])
-    if args.input_jsonl:
-        with args.input_jsonl.open("r", encoding="utf-8") as h:
-            for frame in _iter_jsonl_stream(h, str(args.input_jsonl)):
-                if frame["camera_id"] == "unknown_camera":
-                    frame["camera_id"] = args.camera_id
-                sys.stdout.write(json.dumps(frame, separators=(",", ":")) + "\n")
+    dumps = get_codec().dumps
+    diagnostics = build_diagnostics(args, "camera_ingest_adapter")
+    try:
+        if args.input_jsonl or args.input_stdin_jsonl:
+            with (args.input_jsonl.open("r", encoding="utf-8") if args.input_jsonl else sys.stdin) as h:
+                for frame in _iter_jsonl_stream(h, str(args.input_jsonl or "stdin"), diagnostics):
+                    if frame["camera_id"] == "unknown_camera":
+                        frame["camera_id"] = args.camera_id
+                    sys.stdout.write(dumps(frame) + "\n")
+            return 0
+        mode = "realtime" if args.realtime else "fast"
+        print(f"[camera-ingest-adapter] synthetic mode={mode} duration_s={args.duration_s:.2f} fps={args.fps:.2f}", file=sys.stderr)
+        for frame in _iter_simulated_camera_frames(args.camera_id, args.duration_s, args.fps, args.realtime, build_clock(args)):
+            sys.stdout.write(dumps(frame) + "\n")
         return 0
-    if args.input_stdin_jsonl:
-        for frame in _iter_jsonl_stream(sys.stdin, "stdin"):
-            if frame["camera_id"] == "unknown_camera":
-                frame["camera_id"] = args.camera_id
-            sys.stdout.write(json.dumps(frame, separators=(",", ":")) + "\n")
-        return 0
-    mode = "realtime" if args.realtime else "fast"
-    print(f"[camera-ingest-adapter] synthetic mode={mode} duration_s={args.duration_s:.2f} fps={args.fps:.2f}", file=sys.stderr)
-    for frame in _iter_simulated_camera_frames(args.camera_id, args.duration_s, args.fps, args.realtime):
-        sys.stdout.write(json.dumps(frame, separators=(",", ":")) + "\n")
-    return 0
+    finally:
+        diagnostics.close(args.diagnostics_json)
 
 if __name__ == "__main__":
     raise SystemExit(main())
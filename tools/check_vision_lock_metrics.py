@@ -1,13 +1,16 @@
 #!/usr/bin/env python3
 from __future__ import annotations
-import argparse, json, math, os, sys
-from dataclasses import dataclass
+import argparse, json, math, os, signal, sys, time
+from dataclasses import asdict, dataclass
 from pathlib import Path
 from typing import Any
+from percentiles import percentile
+from track_binary import BinaryTrackDecoder, is_binary_path, iter_binary_records
+EXIT_LIVE_FAIL=3  # --follow: thresholds can no longer be met (1 stays the final-verdict FAIL; crashes also exit 1)
 @dataclass
 class Thresholds: max_lock_acquisition_s: float; min_lock_hold_ratio: float; max_dropout_count: int; max_dropout_gap_s: float; lock_quality_percentile: float; min_lock_quality_at_percentile: float
 @dataclass
-class ComputedMetrics: lock_acquisition_s: float|None; lock_hold_ratio: float; dropout_count: int; max_dropout_gap_s: float; lock_quality_percentile_value: float|None; lock_quality_samples: int
+class ComputedMetrics: lock_acquisition_s: float|None; lock_hold_ratio: float; dropout_count: int; max_dropout_gap_s: float; lock_quality_percentile_value: float|None; lock_quality_samples: int; lock_quality_skipped: int = 0
 
 def _envf(n,d):
     v=os.getenv(n); return d if v is None else float(v)
@@ -25,39 +28,143 @@ def parse_args(argv):
     p.add_argument("--scenario-summary-json",type=Path,default=Path(os.getenv("VISION_LOCK_SCENARIO_SUMMARY_JSON","artifacts/vision_lock_static_summary.json")))
     p.add_argument("--max-lock-acquisition-s",type=float,default=_envf("VISION_LOCK_MAX_ACQUISITION_S",6.0)); p.add_argument("--min-lock-hold-ratio",type=float,default=_envf("VISION_LOCK_MIN_HOLD_RATIO",0.85)); p.add_argument("--max-dropout-count",type=int,default=_envi("VISION_LOCK_MAX_DROPOUT_COUNT",2)); p.add_argument("--max-dropout-gap-s",type=float,default=_envf("VISION_LOCK_MAX_DROPOUT_GAP_S",1.0)); p.add_argument("--lock-quality-percentile",type=float,default=_envf("VISION_LOCK_QUALITY_PERCENTILE",10.0)); p.add_argument("--min-lock-quality-at-percentile",type=float,default=_envf("VISION_LOCK_MIN_QUALITY_AT_PERCENTILE",0.65))
     p.add_argument("--consistency-lock-s-tol",type=float,default=_envf("VISION_LOCK_CONSISTENCY_LOCK_S_TOL",0.30)); p.add_argument("--consistency-hold-ratio-tol",type=float,default=_envf("VISION_LOCK_CONSISTENCY_HOLD_RATIO_TOL",0.05)); p.add_argument("--consistency-dropout-gap-s-tol",type=float,default=_envf("VISION_LOCK_CONSISTENCY_DROPOUT_GAP_S_TOL",0.30)); p.add_argument("--consistency-strict",action="store_true",default=os.getenv("VISION_LOCK_CONSISTENCY_STRICT","1")=="1")
+    p.add_argument("--exact",action="store_true",default=os.getenv("VISION_LOCK_EXACT_PERCENTILE","0")=="1",help="keep every lock_quality sample and compute the exact percentile (O(rows) memory)"); p.add_argument("--quantile-bins",type=int,default=_envi("VISION_LOCK_QUANTILE_BINS",1000),help="histogram bins for the streaming percentile sketch; error <= 0.5/bins")
+    p.add_argument("--metrics-json",type=Path,default=None,help="also write the verdict, failures and computed metrics to this JSON file")
+    p.add_argument("--follow",action="store_true",help=f"tail a growing tracks file, print rolling metrics and exit {EXIT_LIVE_FAIL} as soon as a threshold can no longer be met (acquisition, dropout count/gap); when the stream ends the normal verdict is given")
+    p.add_argument("--follow-idle-s",type=float,default=_envf("VISION_LOCK_FOLLOW_IDLE_S",10.0),help="--follow: stop once no new rows arrived for this long (SIGTERM also stops)"); p.add_argument("--follow-poll-s",type=float,default=0.1); p.add_argument("--report-interval-s",type=float,default=1.0,help="--follow: rolling metrics print interval")
     return p.parse_args(argv)
 
 def _loadj(p): return json.loads(p.read_text())
-def _loadjl(p): return [json.loads(l) for l in p.read_text().splitlines() if l.strip()]
-def _pct(vals,p):
-    vals=sorted(vals); 
-    if not vals: return None
-    if len(vals)==1:return vals[0]
-    r=(p/100)*(len(vals)-1); lo=math.floor(r); hi=math.ceil(r); w=r-lo; return vals[lo]*(1-w)+vals[hi]*w
+def _loadjl(p): return list(_iterjl(p))
+def _iterjl(p):
+    if is_binary_path(p): yield from iter_binary_records(p); return
+    with p.open("r",encoding="utf-8") as f:
+        for l in f:
+            if l.strip(): yield json.loads(l)
+class QualitySketch:
+    """Bounded-memory percentile sketch: fixed-width histogram over lock_quality's [lo, hi] domain.
+    Memory is O(bins) regardless of row count. Order statistics are located exactly by rank and
+    reported as their bin centre (clamped to the observed min/max), so for samples inside [lo, hi]
+    the estimate differs from percentile() over the same samples by at most error_bound = (hi-lo)/bins/2.
+    Out-of-range samples are counted in the edge bins and loosen the bound; NaN/inf samples are skipped and
+    counted in `skipped`."""
+    def __init__(s,bins=1000,lo=0.0,hi=1.0):
+        if bins<=0 or hi<=lo: raise ValueError("sketch needs bins > 0 and hi > lo")
+        s.bins=bins; s.lo=lo; s.w=(hi-lo)/bins; s.c=[0]*bins; s.n=0; s.mn=s.mx=None; s.skipped=0
+    @property
+    def error_bound(s): return s.w/2
+    def __len__(s): return s.n
+    def add(s,v):
+        if not math.isfinite(v): s.skipped+=1; return
+        i=int((v-s.lo)/s.w); s.c[0 if i<0 else (i if i<s.bins else s.bins-1)]+=1; s.n+=1
+        if s.mn is None or v<s.mn: s.mn=v
+        if s.mx is None or v>s.mx: s.mx=v
+    def _order_stat(s,k):
+        acc=0
+        for i,c in enumerate(s.c):
+            acc+=c
+            if acc>k: return min(s.mx,max(s.mn,s.lo+(i+0.5)*s.w))
+        return s.mx
+    def quantile(s,p):
+        if not s.n: return None
+        if s.n==1: return s.mn
+        r=(p/100)*(s.n-1); lo=math.floor(r); hi=math.ceil(r); w=r-lo; return s._order_stat(lo)*(1-w)+s._order_stat(hi)*w
 
-def metrics_from_tracks(tracks, pct):
-    first=None; first_lock=None; total=locked=0; dcnt=0; dmax=0.0; in_d=False; dstart=None; q=[]
-    for row in tracks:
-        ts=_as_float(row.get("timestamp"));
-        if ts is None: continue
-        if first is None: first=ts
+class LockMetricsState:
+    """Incremental form of metrics_from_tracks: feed rows one at a time with update(), read result() at any point.
+    exact=True keeps every LOCKED lock_quality sample (O(rows)) and matches the historical batch result bit-for-bit;
+    otherwise percentiles come from a QualitySketch with `bins` buckets. Non-finite lock_quality values are left out of
+both and counted in lock_quality_skipped."""
+    def __init__(s,pct,exact=False,bins=1000):
+        s.pct=pct; s.exact=exact; s.first=s.first_lock=s.last=s.last_valid=s.dstart=None; s.total=s.locked=s.dcnt=0; s.dmax=0.0; s.in_d=False; s.rows=0; s.qskip=0
+        s.q=[] if exact else QualitySketch(bins)
+    def update(s,row):
+        s.rows+=1; ts=_as_float(row.get("timestamp")); s.last=ts
+        if ts is None: return
+        s.last_valid=ts
+        if s.first is None: s.first=ts
         state=str(row.get("lock_state",""))
-        if state=="LOCKED" and first_lock is None: first_lock=ts
+        if state=="LOCKED" and s.first_lock is None: s.first_lock=ts
         if state=="LOCKED":
             v=_as_float(row.get("lock_quality"));
-            if v is not None:q.append(v)
-        if first_lock is None: continue
-        total+=1
+            if v is not None and not math.isfinite(v): s.qskip+=1
+            elif v is not None:(s.q.append if s.exact else s.q.add)(v)
+        if s.first_lock is None: return
+        s.total+=1
         if state=="LOCKED":
-            locked+=1
-            if in_d and dstart is not None: dmax=max(dmax,max(0.0,ts-dstart)); in_d=False; dstart=None
-        elif not in_d:
-            in_d=True; dstart=ts; dcnt+=1
-    if in_d and dstart is not None and tracks:
-        t=_as_float(tracks[-1].get("timestamp"));
-        if t is not None:dmax=max(dmax,max(0.0,t-dstart))
-    acq=None if first is None or first_lock is None else max(0.0, first_lock-first)
-    return ComputedMetrics(acq, 0.0 if total==0 else locked/total, dcnt, dmax, _pct(q,pct), len(q))
+            s.locked+=1
+            if s.in_d and s.dstart is not None: s.dmax=max(s.dmax,max(0.0,ts-s.dstart)); s.in_d=False; s.dstart=None
+        elif not s.in_d:
+            s.in_d=True; s.dstart=ts; s.dcnt+=1
+    def result(s):
+        dmax=s.dmax
+        if s.in_d and s.dstart is not None and s.rows and s.last is not None: dmax=max(dmax,max(0.0,s.last-s.dstart))
+        acq=None if s.first is None or s.first_lock is None else max(0.0, s.first_lock-s.first)
+        qv=percentile(sorted(s.q),s.pct/100) if s.exact else s.q.quantile(s.pct)
+        return ComputedMetrics(acq, 0.0 if s.total==0 else s.locked/s.total, s.dcnt, dmax, qv, len(s.q), s.qskip)
+
+def doomed(st,t):
+    """Failures already certain from the rows seen so far (timestamps assumed non-decreasing). Acquisition time,
+    dropout count and the longest dropout only grow, so they are decided early; hold ratio and lock quality can
+    still recover and are left to the final verdict. Messages match eval_fail."""
+    f=[]
+    if st.first_lock is None and st.first is not None and st.last_valid-st.first>t.max_lock_acquisition_s: f.append("lock acquisition threshold failed")
+    if st.dcnt>t.max_dropout_count: f.append("dropout count too high")
+    gap=max(st.dmax,st.last_valid-st.dstart) if st.in_d and st.dstart is not None else st.dmax
+    if gap>t.max_dropout_gap_s: f.append("dropout gap too long")
+    return f
+
+def _followjl(p,poll_s,stopped,bad):
+    """Yield rows appended to p (JSONL or binary) as they arrive, None after each idle poll; restarts on truncation/rotation.
+    Lines that are not a JSON object are skipped and counted in bad[0]."""
+    f=None
+    while not stopped():
+        if f is None:
+            if not p.exists(): time.sleep(poll_s); yield None; continue
+            f=p.open("rb"); dec=BinaryTrackDecoder() if is_binary_path(p) else None; buf=b""
+        chunk=f.read(1<<16)
+        if chunk:
+            if dec is not None: yield from dec.feed(chunk); continue
+            *lines,buf=(buf+chunk).split(b"\n")
+            for l in lines:
+                if not l.strip(): continue
+                try: r=json.loads(l)
+                except ValueError: r=None
+                if isinstance(r,dict): yield r
+                else: bad[0]+=1
+            continue
+        try: cur=os.stat(p)
+        except FileNotFoundError: cur=None
+        if cur is not None and ((cur.st_dev,cur.st_ino)!=(os.fstat(f.fileno()).st_dev,os.fstat(f.fileno()).st_ino) or cur.st_size<f.tell()):
+            f.close(); f=None; continue
+        time.sleep(poll_s); yield None
+    if f is not None: f.close()
+
+def _live(st,pct):
+    m=st.result(); print(f"[vision-lock-check] live: rows={st.rows} lock_acquisition_s={m.lock_acquisition_s} lock_hold_ratio={m.lock_hold_ratio:.4f} dropout_count={m.dropout_count} max_dropout_gap_s={m.max_dropout_gap_s:.3f} lock_quality_p{pct:g}={m.lock_quality_percentile_value}")
+
+def follow_tracks(a,t):
+    """--follow loop: returns EXIT_LIVE_FAIL on early FAIL, otherwise the LockMetricsState once the stream stops."""
+    stop=[]; bad=[0]; signal.signal(signal.SIGTERM,lambda *_: stop.append(1)); sys.stdout.reconfigure(line_buffering=True)
+    st=LockMetricsState(a.lock_quality_percentile,a.exact,a.quantile_bins); last_row=last_rep=time.monotonic()
+    print(f"[vision-lock-check] following {a.tracks_jsonl}")
+    try:
+        for row in _followjl(a.tracks_jsonl,max(0.001,a.follow_poll_s),lambda: bool(stop),bad):
+            now=time.monotonic()
+            if row is not None:
+                st.update(row); last_row=now; d=doomed(st,t)
+                if d:
+                    _live(st,a.lock_quality_percentile); print("[vision-lock-check] FAIL (live: thresholds can no longer be met)"); [print(f"  - {x}") for x in d]; return EXIT_LIVE_FAIL
+            elif now-last_row>=a.follow_idle_s: print(f"[vision-lock-check] live: no new rows for {a.follow_idle_s:g}s, stopping"); break
+            if now-last_rep>=a.report_interval_s: _live(st,a.lock_quality_percentile); last_rep=now
+    except KeyboardInterrupt: pass
+    if bad[0]: print(f"[vision-lock-check] live: skipped {bad[0]} undecodable rows")
+    _live(st,a.lock_quality_percentile); return st
+
+def metrics_from_tracks(tracks, pct, exact=True, bins=1000):
+    st=LockMetricsState(pct,exact,bins)
+    for row in tracks: st.update(row)
+    return st.result()
 
 def eval_fail(m,t,s):
     f=[]; st=str(s.get("status","")).lower().strip()
@@ -71,13 +178,21 @@ def eval_fail(m,t,s):
 
 def main(argv):
     a=parse_args(argv); t=Thresholds(a.max_lock_acquisition_s,a.min_lock_hold_ratio,a.max_dropout_count,a.max_dropout_gap_s,a.lock_quality_percentile,a.min_lock_quality_at_percentile)
+    st=None
+    if a.follow:
+        if a.mode!="full-pipeline": print("[vision-lock-check] error: --follow requires --mode full-pipeline"); return 2
+        st=follow_tracks(a,t)
+        if isinstance(st,int): return st
+        if not a.scenario_summary_json.exists() or not a.scenario_summary_json.read_text().strip():
+            print("[vision-lock-check] live: stream ended without early failure; no scenario summary for a final verdict"); return 0
     req=[a.scenario_summary_json] + ([] if a.mode=="scenario-only" else [a.tracks_jsonl,a.events_jsonl])
     miss=[str(p) for p in req if not p.exists()]
     if miss: print("[vision-lock-check] error: missing artifacts\n  - "+"\n  - ".join(miss)); return 2
-    s=_loadj(a.scenario_summary_json); tracks=[] if a.mode=="scenario-only" else _loadjl(a.tracks_jsonl)
-    m = ComputedMetrics(_as_float(s.get("time_to_lock_s_scenario_estimate")), _as_float(s.get("lock_hold_ratio_scenario_estimate")) or 0.0,0,_as_float(s.get("max_gap_s_scenario_estimate")) or 0.0,None,0) if a.mode=="scenario-only" else metrics_from_tracks(tracks,a.lock_quality_percentile)
+    s=_loadj(a.scenario_summary_json)
+    m = ComputedMetrics(_as_float(s.get("time_to_lock_s_scenario_estimate")), _as_float(s.get("lock_hold_ratio_scenario_estimate")) or 0.0,0,_as_float(s.get("max_gap_s_scenario_estimate")) or 0.0,None,0) if a.mode=="scenario-only" else st.result() if st is not None else metrics_from_tracks(_iterjl(a.tracks_jsonl),a.lock_quality_percentile,a.exact,a.quantile_bins)
     print("[vision-lock-check] computed metrics:")
     print(f"  checker_mode: {a.mode}"); print(f"  lock_acquisition_s: {m.lock_acquisition_s}"); print(f"  lock_hold_ratio: {m.lock_hold_ratio:.4f}"); print(f"  dropout_count: {m.dropout_count}"); print(f"  max_dropout_gap_s: {m.max_dropout_gap_s:.3f}")
+    if a.mode=="full-pipeline": print(f"  lock_quality_p{a.lock_quality_percentile:g}: {m.lock_quality_percentile_value} (samples={m.lock_quality_samples}{f', skipped_non_finite={m.lock_quality_skipped}' if m.lock_quality_skipped else ''}, {'exact' if a.exact else f'sketch +/-{0.5/a.quantile_bins:.2g}'})")
     if a.mode=="full-pipeline":
       print("[vision-lock-check] consistency_check:")
       deltas=[]
@@ -93,6 +208,7 @@ def main(argv):
     if a.mode=="full-pipeline" and a.consistency_strict and any(abs((_as_float(s.get(k)) or 0)-v)>tol for k,v,tol in [("time_to_lock_s_scenario_estimate",m.lock_acquisition_s or 0,a.consistency_lock_s_tol),("lock_hold_ratio_scenario_estimate",m.lock_hold_ratio,a.consistency_hold_ratio_tol),("max_gap_s_scenario_estimate",m.max_dropout_gap_s,a.consistency_dropout_gap_s_tol)] if _as_float(s.get(k)) is not None):
       fails.append("consistency check divergence exceeded tolerance")
     if a.mode=="scenario-only": fails=[x for x in fails if "quality" not in x and "dropout count" not in x]
+    if a.metrics_json: a.metrics_json.write_text(json.dumps({"verdict":"FAIL" if fails else "PASS","mode":a.mode,"failures":fails,"metrics":asdict(m)},separators=(",",":"))+"\n")
     if fails:
       print("[vision-lock-check] FAIL"); [print(f"  - {x}") for x in fails]; return 1
     print("[vision-lock-check] PASS"); return 0
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Convert intercept tracker track/event logs between JSONL and the binary format.
+
+The direction follows the input: a binary file (``.bin`` suffix or ``TRKB``
+magic) is expanded to contract JSONL, anything else is packed to binary.
+See ``track_binary.py`` for the layout and
+``docs/intercept_tracker_contract.md`` for the record contract.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+from jsonl_writer import BufferedJsonlWriter
+from track_binary import BinaryTrackWriter, is_binary_path, iter_record_file
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("input", type=Path, help="Track or event log to convert (JSONL or binary).")
+    parser.add_argument("output", type=Path, help="Destination file; overwritten.")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv or sys.argv[1:])
+    if not args.input.exists():
+        raise SystemExit(f"Missing input log: {args.input}")
+    if args.input.resolve() == args.output.resolve():
+        raise SystemExit("input and output must be different files")
+
+    to_binary = not is_binary_path(args.input)
+    writer_class = BinaryTrackWriter if to_binary else BufferedJsonlWriter
+    try:
+        with writer_class(args.output, flush_rows=4096, truncate=True) as writer:
+            for record in iter_record_file(args.input):
+                writer.write(record)
+    except ValueError as error:
+        raise SystemExit(f"Cannot convert {args.input}: {error}") from error
+
+    in_bytes = args.input.stat().st_size
+    out_bytes = args.output.stat().st_size
+    print(
+        f"[convert] {args.input} -> {args.output} ({'bin' if to_binary else 'jsonl'}): "
+        f"rows={writer.rows_written} bytes {in_bytes} -> {out_bytes} "
+        f"(x{in_bytes / max(out_bytes, 1):.2f})"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -11,12 +11,24 @@ Each advisory row includes:
 from __future__ import annotations
 
 import argparse
-import json
+import ctypes
+import ctypes.util
 import math
+import os
+import select
+import signal
+import struct
 import sys
 import time
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator, TextIO
+
+from intercept_adapter_contract import get_codec
+from jsonl_writer import BufferedJsonlWriter
+from track_binary import BinaryTrackDecoder, is_binary_path
+from track_ring import TrackRingReader
+from vision_clock import add_clock_arguments, build_clock
+from vision_diagnostics import Diagnostics, add_diagnostics_arguments, build_diagnostics
 
 
 def parse_args(argv: list[str]) -> argparse.Namespace:
@@ -25,7 +37,31 @@ def parse_args(argv: list[str]) -> argparse.Namespace:
         "--tracks-jsonl",
         type=Path,
         default=Path("artifacts/intercept_tracker_tracks.jsonl"),
-        help="Path to intercept_tracker track JSONL input.",
+        help="Path to intercept_tracker track JSONL input (a .bin path reads the binary track format).",
+    )
+    parser.add_argument(
+        "--tracks-shm",
+        default=None,
+        metavar="NAME",
+        help="Read track records from this shared-memory ring instead of --tracks-jsonl.",
+    )
+    parser.add_argument(
+        "--shm-attach-timeout-s",
+        type=float,
+        default=10.0,
+        help="How long to wait for the --tracks-shm ring to be created by the tracker.",
+    )
+    parser.add_argument(
+        "--shm-poll-interval-s",
+        type=float,
+        default=0.001,
+        help="First idle wait between shared-memory ring reads; doubles while the ring stays empty.",
+    )
+    parser.add_argument(
+        "--shm-max-poll-interval-s",
+        type=float,
+        default=0.05,
+        help="Upper bound for the backed-off idle wait between shared-memory ring reads.",
     )
     parser.add_argument(
         "--output-jsonl",
@@ -38,6 +74,13 @@ def parse_args(argv: list[str]) -> argparse.Namespace:
         action="store_true",
         help="Truncate output file before writing.",
     )
+    parser.add_argument(
+        "--flush-rows",
+        type=int,
+        default=32,
+        help="Flush advisory output after this many buffered rows; pending rows are also "
+        "flushed whenever the input is drained (1 flushes every row).",
+    )
     parser.add_argument(
         "--follow",
         action=argparse.BooleanOptionalAction,
@@ -48,7 +91,13 @@ def parse_args(argv: list[str]) -> argparse.Namespace:
         "--poll-interval-s",
         type=float,
         default=0.2,
-        help="Polling interval while following input file.",
+        help="Polling interval while following input file (also the idle re-check period with inotify).",
+    )
+    parser.add_argument(
+        "--follow-mode",
+        choices=["auto", "inotify", "poll"],
+        default="auto",
+        help="How to wait for appended rows: inotify wake-ups (Linux), sleep polling, or auto (inotify when available).",
     )
     parser.add_argument(
         "--stale-after-s",
@@ -116,6 +165,8 @@ def parse_args(argv: list[str]) -> argparse.Namespace:
         default=None,
         help="Exit after this many seconds without new input rows while following.",
     )
+    add_clock_arguments(parser)
+    add_diagnostics_arguments(parser)
     return parser.parse_args(argv)
 
 
@@ -176,8 +227,10 @@ def _gating_reason(
     return "OK"
 
 
-def _advisory_from_track(row: dict[str, Any], args: argparse.Namespace) -> dict[str, Any]:
-    now_ts = time.time()
+def _advisory_from_track(row: dict[str, Any], args: argparse.Namespace, now_ts: float | None = None) -> dict[str, Any]:
+    """Build one advisory row; ``now_ts`` overrides wall-clock time (e.g. a replay clock)."""
+    if now_ts is None:
+        now_ts = time.time()
     frame_ts = _as_float(row.get("timestamp"))
     latency_s = float("inf") if frame_ts is None else max(0.0, now_ts - frame_ts)
 
@@ -230,26 +283,258 @@ def _advisory_from_track(row: dict[str, Any], args: argparse.Namespace) -> dict[
     }
 
 
-def _iter_jsonl_tail(path: Path, *, follow: bool, poll_interval_s: float):
-    with path.open("r", encoding="utf-8") as handle:
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_INOTIFY_EVENT = struct.Struct("iIII")
+
+
+class _InotifyWatcher:
+    """Wake-on-change watcher for one file using Linux inotify via ctypes.
+
+    The parent directory is watched (filtered to the target file name) so
+    truncation, rename-based rotation and re-creation are all observed.
+    """
+
+    def __init__(self, path: Path) -> None:
+        libc_name = ctypes.util.find_library("c")
+        if not sys.platform.startswith("linux") or libc_name is None:
+            raise OSError("inotify is only available on Linux")
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._name = os.fsencode(path.name)
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = _IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+        directory = os.fsencode(str(path.parent.resolve()))
+        if libc.inotify_add_watch(self._fd, directory, mask) < 0:
+            error = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(error, f"inotify_add_watch failed for {path.parent}")
+
+    def wait(self, timeout_s: float) -> bool:
+        """Block until the target file changes or ``timeout_s`` elapses."""
+        deadline = time.monotonic() + max(0.0, timeout_s)
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            ready, _, _ = select.select([self._fd], [], [], remaining)
+            if not ready:
+                return False
+            try:
+                buffer = os.read(self._fd, 65536)
+            except BlockingIOError:
+                continue
+            offset = 0
+            while offset + _INOTIFY_EVENT.size <= len(buffer):
+                _wd, _mask, _cookie, name_len = _INOTIFY_EVENT.unpack_from(buffer, offset)
+                start = offset + _INOTIFY_EVENT.size
+                name = buffer[start : start + name_len].rstrip(b"\0")
+                offset = start + name_len
+                if name == self._name:
+                    return True
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+def _open_change_watcher(path: Path, follow_mode: str) -> _InotifyWatcher | None:
+    if follow_mode == "poll":
+        return None
+    try:
+        return _InotifyWatcher(path)
+    except (OSError, AttributeError) as error:
+        if follow_mode == "inotify":
+            raise SystemExit(f"--follow-mode inotify unavailable: {error}") from error
+        print(f"inotify unavailable ({error}); falling back to polling", file=sys.stderr)
+        return None
+
+
+def _iter_jsonl_tail(
+    path: Path,
+    *,
+    follow: bool,
+    poll_interval_s: float,
+    follow_mode: str = "poll",
+) -> Iterator[tuple[int, str]]:
+    """Yield ``(line_number, line)`` for complete lines from ``path``; while following, yield ``(0, "")`` before each idle wait.
+
+    Truncation rewinds to the start of the file and rotation (a new file at
+    ``path``) drains the old handle before reopening; both restart line numbers at 1.
+    """
+    watcher = _open_change_watcher(path, follow_mode) if follow else None
+    handle: TextIO = path.open("r", encoding="utf-8")
+    line_number = 0
+    try:
         while True:
             position = handle.tell()
             raw_line = handle.readline()
-            if raw_line:
-                yield raw_line
+            if raw_line.endswith("\n") or (raw_line and not follow):
+                line_number += 1
+                yield line_number, raw_line
                 continue
 
             if not follow:
                 break
 
+            # EOF or a partially written row: rewind and wait for the rest.
             handle.seek(position)
-            time.sleep(max(0.01, poll_interval_s))
-            yield ""
+            reopened = _reopen_if_replaced(path, handle)
+            if reopened is not None:
+                handle.close()
+                handle = reopened
+                line_number = 0
+                continue
+            if handle.tell() < position:
+                line_number = 0
+
+            # Hand control back first so the caller can flush buffered output before we block.
+            yield 0, ""
+            if watcher is not None:
+                watcher.wait(max(0.01, poll_interval_s))
+            else:
+                time.sleep(max(0.01, poll_interval_s))
+    finally:
+        handle.close()
+        if watcher is not None:
+            watcher.close()
+
+
+def _reopen_if_replaced(path: Path, handle: TextIO) -> TextIO | None:
+    """Return a fresh handle when ``path`` was rotated, or rewind ``handle`` if truncated."""
+    try:
+        current = os.stat(path)
+    except FileNotFoundError:
+        return None
+    opened = os.fstat(handle.fileno())
+    if (current.st_dev, current.st_ino) != (opened.st_dev, opened.st_ino):
+        position = handle.tell()
+        pending = handle.readline()
+        handle.seek(position)
+        if pending.endswith("\n"):
+            # Old file still has complete unread rows; finish those first.
+            return None
+        return path.open("r", encoding="utf-8")
+    if current.st_size < handle.tell():
+        handle.seek(0)
+    return None
+
+
+def _iter_jsonl_rows(args: argparse.Namespace, diagnostics: Diagnostics | None = None) -> Iterator[dict[str, Any] | None]:
+    """Yield track rows from --tracks-jsonl, or ``None`` before each idle wait.
+
+    Unparseable rows are skipped and counted in ``diagnostics`` (printed one by one without it).
+    """
+    loads = get_codec().loads
+    tail = _iter_jsonl_tail(
+        args.tracks_jsonl,
+        follow=args.follow,
+        poll_interval_s=args.poll_interval_s,
+        follow_mode=args.follow_mode,
+    )
+    for line_number, raw_line in tail:
+        if not raw_line:
+            yield None
+            continue
+        line = raw_line.strip()
+        if not line:
+            continue
+
+        try:
+            row = loads(line)
+        except ValueError as error:
+            if diagnostics is not None:
+                diagnostics.count("invalid_json", line, f"{args.tracks_jsonl}:{line_number}")
+            else:
+                print(f"Skipping invalid JSON at {args.tracks_jsonl}:{line_number}: {error}", file=sys.stderr)
+            continue
+
+        if not isinstance(row, dict):
+            if diagnostics is not None:
+                diagnostics.count("not_object", row, f"{args.tracks_jsonl}:{line_number}")
+            else:
+                print(f"Skipping non-object JSON at {args.tracks_jsonl}:{line_number}", file=sys.stderr)
+            continue
+        yield row
 
 
-def _write_jsonl(path: Path, record: dict[str, Any]) -> None:
-    with path.open("a", encoding="utf-8") as handle:
-        handle.write(json.dumps(record, separators=(",", ":")) + "\n")
+def _iter_binary_rows(args: argparse.Namespace) -> Iterator[dict[str, Any] | None]:
+    """Yield track rows from a binary --tracks-jsonl file, or ``None`` before each idle wait.
+
+    Partial frames stay buffered in the decoder; truncation and rotation
+    restart decoding from the new file header.
+    """
+    path = args.tracks_jsonl
+    watcher = _open_change_watcher(path, args.follow_mode) if args.follow else None
+    handle = path.open("rb")
+    decoder = BinaryTrackDecoder()
+    try:
+        while True:
+            chunk = handle.read(1 << 16)
+            if chunk:
+                try:
+                    rows = decoder.feed(chunk)
+                except ValueError as error:
+                    raise SystemExit(f"Invalid binary track stream {path}: {error}") from error
+                for row in rows:
+                    if row.get("event") is None:
+                        yield row
+                continue
+
+            if not args.follow:
+                if decoder.pending_bytes:
+                    print(f"Ignoring {decoder.pending_bytes} trailing bytes of partial record in {path}", file=sys.stderr)
+                break
+
+            try:
+                current = os.stat(path)
+            except FileNotFoundError:
+                current = None
+            if current is not None:
+                opened = os.fstat(handle.fileno())
+                if (current.st_dev, current.st_ino) != (opened.st_dev, opened.st_ino) or current.st_size < handle.tell():
+                    handle.close()
+                    handle = path.open("rb")
+                    decoder = BinaryTrackDecoder()
+                    continue
+
+            yield None
+            if watcher is not None:
+                watcher.wait(max(0.01, args.poll_interval_s))
+            else:
+                time.sleep(max(0.01, args.poll_interval_s))
+    finally:
+        handle.close()
+        if watcher is not None:
+            watcher.close()
+
+
+def _iter_ring_rows(reader: TrackRingReader, args: argparse.Namespace) -> Iterator[dict[str, Any] | None]:
+    """Yield track rows from a shared-memory ring, or ``None`` before each idle wait.
+
+    Stops once the writer has closed the ring and every record was read. The
+    idle wait starts at --shm-poll-interval-s and doubles up to
+    --shm-max-poll-interval-s while nothing arrives, so an idle reader does not spin.
+    """
+    first_wait_s = max(0.0, args.shm_poll_interval_s)
+    max_wait_s = max(first_wait_s, args.shm_max_poll_interval_s)
+    wait_s = first_wait_s
+    while True:
+        rows = reader.read_available()
+        if rows:
+            yield from rows
+            wait_s = first_wait_s
+            continue
+        if reader.drained() or not args.follow:
+            return
+        yield None
+        time.sleep(wait_s)
+        wait_s = min(max_wait_s, max(2.0 * wait_s, 1e-4))
 
 
 def main(argv: list[str] | None = None) -> int:
@@ -264,18 +549,39 @@ def main(argv: list[str] | None = None) -> int:
     if args.exit_on_idle_seconds is not None and args.exit_on_idle_seconds <= 0:
         raise SystemExit("--exit-on-idle-seconds must be > 0 when provided")
 
-    if not args.tracks_jsonl.exists():
+    ring_reader: TrackRingReader | None = None
+    if args.tracks_shm:
+        try:
+            ring_reader = TrackRingReader.attach(args.tracks_shm, timeout_s=args.shm_attach_timeout_s)
+        except FileNotFoundError as error:
+            raise SystemExit(f"Missing tracker shared-memory ring: {args.tracks_shm}") from error
+    elif not args.tracks_jsonl.exists():
         raise SystemExit(f"Missing tracker JSONL: {args.tracks_jsonl}")
 
-    args.output_jsonl.parent.mkdir(parents=True, exist_ok=True)
-    if args.clear_output:
-        args.output_jsonl.write_text("", encoding="utf-8")
+    if args.flush_rows <= 0:
+        raise SystemExit("--flush-rows must be > 0")
+
+    clock = build_clock(args)
+    diagnostics = build_diagnostics(args, "guidance_advisory")
+    writer = BufferedJsonlWriter(args.output_jsonl, flush_rows=args.flush_rows, truncate=args.clear_output)
+
+    def _handle_sigterm(signum: int, _frame: object) -> None:
+        # Unwind through the finally block below so buffered rows are flushed.
+        raise SystemExit(128 + signum)
+
+    signal.signal(signal.SIGTERM, _handle_sigterm)
 
     processed = 0
     started_at = time.time()
     last_activity_at = started_at
     try:
-        for line_number, raw_line in enumerate(_iter_jsonl_tail(args.tracks_jsonl, follow=args.follow, poll_interval_s=args.poll_interval_s), start=1):
+        if ring_reader is not None:
+            rows = _iter_ring_rows(ring_reader, args)
+        elif is_binary_path(args.tracks_jsonl):
+            rows = _iter_binary_rows(args)
+        else:
+            rows = _iter_jsonl_rows(args, diagnostics)
+        for row in rows:
             now = time.time()
             if args.max_seconds is not None and now - started_at >= args.max_seconds:
                 print(f"Reached --max-seconds={args.max_seconds:.3f}, exiting.", file=sys.stderr)
@@ -284,22 +590,17 @@ def main(argv: list[str] | None = None) -> int:
                 print(f"Reached --exit-on-idle-seconds={args.exit_on_idle_seconds:.3f}, exiting.", file=sys.stderr)
                 break
 
-            line = raw_line.strip()
-            if not line:
-                continue
-
-            try:
-                row = json.loads(line)
-            except json.JSONDecodeError as error:
-                print(f"Skipping invalid JSON at {args.tracks_jsonl}:{line_number}: {error}", file=sys.stderr)
-                continue
-
-            if not isinstance(row, dict):
-                print(f"Skipping non-object JSON at {args.tracks_jsonl}:{line_number}", file=sys.stderr)
+            if row is None:
+                # Input drained: push buffered advisories out before the reader blocks.
+                if writer.pending_rows:
+                    writer.flush()
                 continue
 
-            advisory = _advisory_from_track(row, args)
-            _write_jsonl(args.output_jsonl, advisory)
+            frame_ts = _as_float(row.get("timestamp"))
+            if frame_ts is not None:
+                clock.observe(frame_ts)
+            advisory = _advisory_from_track(row, args, now_ts=clock.now())
+            writer.write(advisory)
             processed += 1
             last_activity_at = time.time()
             if args.max_rows is not None and processed >= args.max_rows:
@@ -307,8 +608,18 @@ def main(argv: list[str] | None = None) -> int:
                 break
     except KeyboardInterrupt:
         print("Interrupted, stopping tail loop.", file=sys.stderr)
+    finally:
+        writer.close()
+        diagnostics.close(args.diagnostics_json)
+        if ring_reader is not None:
+            ring_reader.close()
+        if hasattr(clock, "close"):
+            clock.close()
 
     print(f"Guidance advisory output written to {args.output_jsonl} ({processed} rows)")
+    if ring_reader is not None:
+        print(f"[guidance] shm ring {args.tracks_shm}: read={ring_reader.read_index} overruns={ring_reader.overruns}")
+    print(writer.stats_line("[guidance] advisory writer"))
     return 0
 
 
@@ -9,9 +9,27 @@ Adapters should emit one JSON object per line with:
 
 from __future__ import annotations
 
+import json
 import math
+import os
 import sys
-from typing import Any, TypedDict
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Iterator, TypedDict
+
+from vision_diagnostics import Diagnostics
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - exercised only without msgspec
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+BBox = tuple[float, float, float, float]
 
 
 class AdapterDetection(TypedDict, total=False):
@@ -27,33 +45,73 @@ class AdapterFrame(TypedDict):
     detections: list[AdapterDetection]
 
 
+@dataclass
+class Detection:
+    bbox: BBox
+    confidence: float
+    target_signature: str
+
+
+REJECT_NOT_OBJECT = "not_object"
+REJECT_INVALID_TIMESTAMP = "invalid_timestamp"
+REJECT_NON_FINITE_TIMESTAMP = "non_finite_timestamp"
+
+_REJECT_LABELS = {
+    REJECT_NOT_OBJECT: "non-object record",
+    REJECT_INVALID_TIMESTAMP: "invalid timestamp",
+    REJECT_NON_FINITE_TIMESTAMP: "non-finite timestamp",
+}
+
+
+def _timestamp_or_reason(raw: dict[str, Any]) -> tuple[float, str | None]:
+    timestamp_raw = raw.get("timestamp")
+    if type(timestamp_raw) is float:
+        timestamp = timestamp_raw
+    else:
+        try:
+            timestamp = float(timestamp_raw)
+        except (TypeError, ValueError):
+            return 0.0, REJECT_INVALID_TIMESTAMP
+    if not math.isfinite(timestamp):
+        return 0.0, REJECT_NON_FINITE_TIMESTAMP
+    return timestamp, None
+
+
+def record_drop(
+    reason: str,
+    raw: Any,
+    *,
+    drops: Diagnostics | None,
+    source_name: str = "adapter_stream",
+    line_number: int | None = None,
+) -> None:
+    """Count a rejected record in ``drops``, or print the legacy per-record warning when ``drops`` is ``None``."""
+    location = source_name if line_number is None else f"{source_name}:{line_number}"
+    value = raw.get("timestamp") if isinstance(raw, dict) else raw
+    if drops is not None:
+        drops.count(reason, value, location)
+        return
+    detail = f"={value!r}" if isinstance(raw, dict) else ""
+    print(f"[adapter-contract] dropping record at {location}: {_REJECT_LABELS[reason]}{detail}", file=sys.stderr)
+
+
 def normalize_adapter_frame(
     raw: dict[str, Any],
     *,
     default_camera_id: str = "unknown_camera",
     source_name: str = "adapter_stream",
     line_number: int | None = None,
+    drops: Diagnostics | None = None,
 ) -> dict[str, Any] | None:
     """Normalize loosely-typed adapter payloads to the shared tracker contract.
 
-    Invalid records are dropped with a warning (stderr) instead of coercing
-    malformed timestamps to ``0.0``.
+    Invalid records are dropped instead of coercing malformed timestamps to
+    ``0.0``. Drops are counted per reason in ``drops`` (see
+    ``vision_diagnostics.py``); without it each drop prints a stderr warning.
     """
-    location = source_name if line_number is None else f"{source_name}:{line_number}"
-    timestamp_raw = raw.get("timestamp")
-    try:
-        timestamp = float(timestamp_raw)
-    except (TypeError, ValueError):
-        print(
-            f"[adapter-contract] dropping record at {location}: invalid timestamp={timestamp_raw!r}",
-            file=sys.stderr,
-        )
-        return None
-    if not math.isfinite(timestamp):
-        print(
-            f"[adapter-contract] dropping record at {location}: non-finite timestamp={timestamp_raw!r}",
-            file=sys.stderr,
-        )
+    timestamp, reason = _timestamp_or_reason(raw)
+    if reason is not None:
+        record_drop(reason, raw, drops=drops, source_name=source_name, line_number=line_number)
         return None
 
     camera_id = str(raw.get("camera_id") or default_camera_id)
@@ -69,3 +127,358 @@ def normalize_adapter_frame(
         "camera_id": camera_id,
         "detections": detections,
     }
+
+
+def _usable_box(x1: float, y1: float, x2: float, y2: float) -> bool:
+    """Positive size with finite corners and a finite area (rules out inf/NaN and overflowing boxes)."""
+    return x2 > x1 and y2 > y1 and math.isfinite(x1) and math.isfinite(y1) and math.isfinite((x2 - x1) * (y2 - y1))
+
+
+def parse_bbox(raw: Any) -> BBox | None:
+    if not isinstance(raw, list) or len(raw) != 4:
+        return None
+    try:
+        vals = [float(v) for v in raw]
+    except (TypeError, ValueError):
+        return None
+    x1, y1, x2, y2 = vals
+    if not _usable_box(x1, y1, x2, y2):
+        return None
+    return (x1, y1, x2, y2)
+
+
+def bbox_from_centroid(centroid: tuple[float, float], width: float, height: float) -> BBox:
+    cx, cy = centroid
+    half_w = width / 2.0
+    half_h = height / 2.0
+    return (cx - half_w, cy - half_h, cx + half_w, cy + half_h)
+
+
+def _parse_detection(raw_detection: Any, default_signature: str, centroid_half_px: float) -> Detection | None:
+    if not isinstance(raw_detection, dict):
+        return None
+    bbox = parse_bbox(raw_detection.get("bbox"))
+    if bbox is None:
+        centroid_raw = raw_detection.get("centroid")
+        if not isinstance(centroid_raw, list) or len(centroid_raw) != 2:
+            return None
+        try:
+            cx, cy = float(centroid_raw[0]), float(centroid_raw[1])
+        except (TypeError, ValueError):
+            return None
+        if not (math.isfinite(cx) and math.isfinite(cy)):
+            return None
+        bbox = (cx - centroid_half_px, cy - centroid_half_px, cx + centroid_half_px, cy + centroid_half_px)
+
+    conf_raw = raw_detection.get("confidence", 0.5)
+    try:
+        confidence = min(1.0, max(0.0, float(conf_raw)))
+    except (TypeError, ValueError):
+        confidence = 0.5
+
+    signature = str(raw_detection.get("target_signature", default_signature))
+    return Detection(bbox=bbox, confidence=confidence, target_signature=signature)
+
+
+def parse_detections(raw_detections: Any, default_signature: str = "default_target") -> list[Detection]:
+    """Validate adapter detection objects into typed ``Detection`` values.
+
+    Entries without a usable finite bbox (or 2-value centroid, expanded to a
+    40x40 box) are skipped; confidence is clamped to ``[0, 1]`` and defaults to 0.5.
+    """
+    if not isinstance(raw_detections, list):
+        return []
+    parsed = (_parse_detection(raw, default_signature, 20.0) for raw in raw_detections)
+    return [detection for detection in parsed if detection is not None]
+
+
+class FrameValidator:
+    """Single-pass adapter frame validator with the contract defaults bound once.
+
+    ``validator(raw)`` returns ``(frame, None)`` with the normalized frame whose
+    ``detections`` are already typed ``Detection`` values, or ``(None, reason)``
+    with one of the ``REJECT_*`` reasons. It replaces ``normalize_adapter_frame``
+    followed by ``parse_detections`` on the tracker input path.
+    """
+
+    def __init__(
+        self,
+        *,
+        default_camera_id: str = "unknown_camera",
+        default_signature: str = "default_target",
+        centroid_box_px: float = 40.0,
+    ) -> None:
+        self.default_camera_id = default_camera_id
+        self.default_signature = default_signature
+        self.centroid_half_px = centroid_box_px / 2.0
+
+    def __call__(self, raw: Any) -> tuple[dict[str, Any] | None, str | None]:
+        if not isinstance(raw, dict):
+            return None, REJECT_NOT_OBJECT
+        timestamp, reason = _timestamp_or_reason(raw)
+        if reason is not None:
+            return None, reason
+        detections: list[Detection] = []
+        detections_raw = raw.get("detections")
+        if isinstance(detections_raw, list):
+            signature, half = self.default_signature, self.centroid_half_px
+            for raw_detection in detections_raw:
+                detection = _parse_detection(raw_detection, signature, half)
+                if detection is not None:
+                    detections.append(detection)
+        return {"timestamp": timestamp, "camera_id": self._camera_id(raw), "detections": detections}, None
+
+    def frame_key(self, raw: dict[str, Any]) -> tuple[tuple[float, str] | None, str | None]:
+        """``((timestamp, camera_id), None)`` exactly as ``validator(raw)`` would give them, or ``(None, reason)``.
+
+        Detections are not looked at: a frame object is only ever rejected for
+        its timestamp, so this decides acceptance without the per-detection work.
+        """
+        timestamp, reason = _timestamp_or_reason(raw)
+        if reason is not None:
+            return None, reason
+        return (timestamp, self._camera_id(raw)), None
+
+    def _camera_id(self, raw: dict[str, Any]) -> str:
+        camera_id = raw.get("camera_id")
+        if type(camera_id) is not str or not camera_id:
+            camera_id = str(camera_id or self.default_camera_id)
+        return camera_id
+
+
+_DEFAULT_VALIDATOR = FrameValidator()
+
+
+@dataclass
+class AdapterBatch:
+    """Columnar result of ``normalize_adapter_batch``.
+
+    Accepted frame ``i`` has ``timestamps[i]``, camera ``camera_ids[camera_index[i]]``
+    and input row ``rows[i]``; its detections are ``detection_offsets[i]`` up to
+    ``detection_offsets[i + 1]``, with four ``bboxes`` values (x1, y1, x2, y2),
+    one ``confidences`` value and one ``signatures`` entry each. The ``array``
+    columns support the buffer protocol (``numpy.frombuffer`` views them
+    without copying). Rejected input rows are listed in ``rejections`` as
+    ``(row, reason)`` and counted per reason in ``drops``.
+    """
+
+    timestamps: array = field(default_factory=lambda: array("d"))
+    camera_index: array = field(default_factory=lambda: array("I"))
+    camera_ids: list[str] = field(default_factory=list)
+    rows: array = field(default_factory=lambda: array("I"))
+    detection_offsets: array = field(default_factory=lambda: array("I", [0]))
+    bboxes: array = field(default_factory=lambda: array("d"))
+    confidences: array = field(default_factory=lambda: array("d"))
+    signatures: list[str] = field(default_factory=list)
+    rejections: list[tuple[int, str]] = field(default_factory=list)
+    drops: dict[str, int] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def frames(self) -> Iterator[dict[str, Any]]:
+        """Rebuild the accepted frames, in input order, with typed detections."""
+        offsets, boxes = self.detection_offsets, self.bboxes
+        for i, timestamp in enumerate(self.timestamps):
+            detections = [
+                Detection(bbox=tuple(boxes[4 * j : 4 * j + 4]), confidence=self.confidences[j], target_signature=self.signatures[j])
+                for j in range(offsets[i], offsets[i + 1])
+            ]
+            yield {"timestamp": timestamp, "camera_id": self.camera_ids[self.camera_index[i]], "detections": detections}
+
+
+def normalize_adapter_batch(raw_frames: Iterable[Any], *, validator: FrameValidator | None = None) -> AdapterBatch:
+    """Validate a batch of decoded adapter frames into an ``AdapterBatch``.
+
+    Each frame is validated exactly once by ``validator`` (contract defaults
+    when omitted); rejections are recorded per row instead of printed.
+    """
+    validator = validator or _DEFAULT_VALIDATOR
+    batch = AdapterBatch()
+    camera_slots: dict[str, int] = {}
+    for row, raw in enumerate(raw_frames):
+        frame, reason = validator(raw)
+        if frame is None:
+            batch.rejections.append((row, reason))
+            batch.drops[reason] = batch.drops.get(reason, 0) + 1
+            continue
+        camera_id = frame["camera_id"]
+        slot = camera_slots.get(camera_id)
+        if slot is None:
+            slot = camera_slots[camera_id] = len(batch.camera_ids)
+            batch.camera_ids.append(camera_id)
+        batch.timestamps.append(frame["timestamp"])
+        batch.camera_index.append(slot)
+        batch.rows.append(row)
+        for detection in frame["detections"]:
+            batch.bboxes.extend(detection.bbox)
+            batch.confidences.append(detection.confidence)
+            batch.signatures.append(detection.target_signature)
+        batch.detection_offsets.append(len(batch.confidences))
+    return batch
+
+
+# --- JSON codec layer -------------------------------------------------------
+#
+# Every hop of the vision pipeline exchanges one compact JSON object per line.
+# The codec picks the fastest installed backend (msgspec, then orjson, then the
+# stdlib); ``VISION_JSON_CODEC`` forces one. Fast backends are strict JSON, so
+# lines they reject (for example ``NaN`` tokens) are retried with the stdlib
+# decoder and keep the stdlib behaviour; likewise values they cannot encode
+# (for example numpy scalars) go through ``json.dumps``. Decode errors are
+# ``ValueError``.
+
+CODEC_BACKENDS = ("msgspec", "orjson", "json")
+
+
+def _stdlib_dumps(obj: Any) -> str:
+    return json.dumps(obj, separators=(",", ":"))
+
+
+def _with_stdlib_fallback(
+    fast_dumps: Callable[[Any], bytes], fast_loads: Callable[[str | bytes], Any]
+) -> tuple[Callable[[Any], str], Callable[[str | bytes], Any]]:
+    def dumps(obj: Any) -> str:
+        try:
+            return fast_dumps(obj).decode("utf-8")
+        except TypeError:
+            return _stdlib_dumps(obj)
+
+    def loads(data: str | bytes) -> Any:
+        try:
+            return fast_loads(data)
+        except ValueError:
+            return json.loads(data)
+
+    return dumps, loads
+
+
+@dataclass(frozen=True)
+class JsonCodec:
+    name: str
+    dumps: Callable[[Any], str]
+    loads: Callable[[str | bytes], Any]
+
+
+def available_codecs() -> list[str]:
+    installed = {"msgspec": msgspec is not None, "orjson": orjson is not None, "json": True}
+    return [name for name in CODEC_BACKENDS if installed[name]]
+
+
+def get_codec(name: str | None = None) -> JsonCodec:
+    """Return the codec for ``name`` (``None``/``"auto"``: ``VISION_JSON_CODEC`` or the fastest installed)."""
+    if name in (None, "auto"):
+        name = os.getenv("VISION_JSON_CODEC", "auto")
+    if name == "auto":
+        name = available_codecs()[0]
+    if name not in available_codecs():
+        raise ValueError(f"JSON codec {name!r} is not available (installed: {', '.join(available_codecs())})")
+    if name == "msgspec":
+        return JsonCodec("msgspec", *_with_stdlib_fallback(msgspec.json.Encoder().encode, msgspec.json.Decoder().decode))
+    if name == "orjson":
+        return JsonCodec("orjson", *_with_stdlib_fallback(orjson.dumps, orjson.loads))
+    return JsonCodec("json", _stdlib_dumps, json.loads)
+
+
+if msgspec is not None:
+
+    class _DetectionStruct(msgspec.Struct):
+        bbox: list[float] | None = None
+        centroid: list[float] | None = None
+        confidence: float = 0.5
+        target_signature: str | None | msgspec.UnsetType = msgspec.UNSET
+
+    class _FrameStruct(msgspec.Struct):
+        timestamp: float
+        camera_id: str | None = None
+        detections: list[_DetectionStruct] | None = None
+
+    _FRAME_DECODER = msgspec.json.Decoder(_FrameStruct)
+
+    class _FrameKeyStruct(msgspec.Struct):
+        timestamp: Any = msgspec.UNSET
+        camera_id: Any = msgspec.UNSET
+
+    _FRAME_KEY_DECODER = msgspec.json.Decoder(_FrameKeyStruct)
+
+
+def _typed_frame_from_struct(frame: Any, validator: FrameValidator) -> dict[str, Any] | None:
+    """Convert a msgspec-decoded frame; ``None`` means fall back to the generic path."""
+    if not math.isfinite(frame.timestamp):
+        return None
+    half = validator.centroid_half_px
+    detections: list[Detection] = []
+    for raw in frame.detections or ():
+        bbox: BBox | None = None
+        if raw.bbox is not None and len(raw.bbox) == 4:
+            x1, y1, x2, y2 = raw.bbox
+            if _usable_box(x1, y1, x2, y2):
+                bbox = (x1, y1, x2, y2)
+        if bbox is None and raw.centroid is not None and len(raw.centroid) == 2:
+            cx, cy = raw.centroid
+            if math.isfinite(cx) and math.isfinite(cy):
+                bbox = (cx - half, cy - half, cx + half, cy + half)
+        if bbox is None:
+            continue
+        signature = validator.default_signature if raw.target_signature is msgspec.UNSET else str(raw.target_signature)
+        detections.append(Detection(bbox=bbox, confidence=min(1.0, max(0.0, raw.confidence)), target_signature=signature))
+    return {"timestamp": frame.timestamp, "camera_id": frame.camera_id or validator.default_camera_id, "detections": detections}
+
+
+def decode_tracker_frame(
+    line: str | bytes,
+    *,
+    codec: JsonCodec | None = None,
+    validator: FrameValidator | None = None,
+    drops: Diagnostics | None = None,
+    source_name: str = "adapter_stream",
+    line_number: int | None = None,
+) -> dict[str, Any] | None:
+    """Decode one adapter JSON line straight into a normalized frame with typed ``Detection`` values.
+
+    With the msgspec codec, well-formed frames decode directly into structs;
+    anything the strict schema rejects is decoded generically and checked by
+    ``validator`` in a single pass, so results and drop behaviour are
+    identical for every backend. Dropped frames return ``None`` and are
+    counted in ``drops`` (see ``record_drop``). Raises ``ValueError`` for
+    invalid JSON and ``TypeError`` for non-object lines.
+    """
+    codec = codec or get_codec()
+    validator = validator or _DEFAULT_VALIDATOR
+    if codec.name == "msgspec":
+        try:
+            typed = _typed_frame_from_struct(_FRAME_DECODER.decode(line), validator)
+        except (msgspec.ValidationError, msgspec.DecodeError):
+            typed = None
+        if typed is not None:
+            return typed
+
+    raw = codec.loads(line)
+    if not isinstance(raw, dict):
+        raise TypeError("expected a JSON object")
+    frame, reason = validator(raw)
+    if reason is not None:
+        record_drop(reason, raw, drops=drops, source_name=source_name, line_number=line_number)
+    return frame
+
+
+def peek_frame_key(line: str | bytes, *, codec: JsonCodec | None = None) -> dict[str, Any]:
+    """Decode only ``timestamp`` and ``camera_id`` of one adapter line, for ``FrameValidator.frame_key``.
+
+    With msgspec the detections are skipped without being built; other codecs
+    decode the whole object. Raises like ``decode_tracker_frame``: ``ValueError``
+    for invalid JSON and ``TypeError`` for non-object lines.
+    """
+    codec = codec or get_codec()
+    if codec.name == "msgspec":
+        try:
+            key = _FRAME_KEY_DECODER.decode(line)
+        except (msgspec.ValidationError, msgspec.DecodeError):
+            pass  # re-decoded below so the error matches decode_tracker_frame
+        else:
+            fields = (("timestamp", key.timestamp), ("camera_id", key.camera_id))
+            return {name: value for name, value in fields if value is not msgspec.UNSET}
+    raw = codec.loads(line)
+    if not isinstance(raw, dict):
+        raise TypeError("expected a JSON object")
+    return raw
@@ -16,25 +16,40 @@ It also writes lock-quality updates and camera handoff events under artifacts/.
 from __future__ import annotations
 
 import argparse
-import json
 import math
+import queue
+import signal
 import sys
-import time
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Iterable
-
-from intercept_adapter_contract import normalize_adapter_frame
-
-
-BBox = tuple[float, float, float, float]
-
-
-@dataclass
-class Detection:
-    bbox: BBox
-    confidence: float
-    target_signature: str
+from typing import Any, Callable, Iterable, Iterator
+
+from intercept_adapter_contract import (
+    BBox,
+    Detection,
+    bbox_from_centroid,
+    decode_tracker_frame,
+    get_codec,
+    parse_bbox,
+    parse_detections,
+)
+from jsonl_writer import BufferedJsonlWriter
+from track_binary import OUTPUT_FORMATS, BinaryTrackWriter, open_record_writer
+from track_ring import TrackRingWriter
+from vision_clock import Clock, WallClock, add_clock_arguments, build_clock
+from vision_diagnostics import Diagnostics, add_diagnostics_arguments, build_diagnostics
+
+try:  # numpy is optional; multi-target association falls back to pure Python.
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+
+MAX_GRID_CELLS_PER_BOX = 1024
+# Frames a reader thread may run ahead of tracking while watching for idle input.
+_MAX_QUEUED_INPUTS = 1024
 
 
 @dataclass
@@ -48,6 +63,124 @@ class TrackState:
     last_timestamp: float
     seen_count: int
     target_signature: str
+    # Position in the camera's least-recently-updated order (larger = more recent).
+    update_order: int = 0
+
+
+class SignatureHandoffs:
+    """Camera that last saw each target signature, kept only while a live track carries it.
+
+    ``note`` records a track's signature on a camera and returns the
+    ``handoff`` event when the signature moved cameras. ``forget`` is called
+    when a track is evicted; once no live track carries a signature its entry
+    is dropped, so the map stays bounded by the live track count.
+    """
+
+    def __init__(self) -> None:
+        self.last_camera: dict[str, str] = {}
+        self._signature_by_track: dict[str, str] = {}
+        self._tracks_by_signature: dict[str, int] = {}
+
+    def note(self, timestamp: float, track_id: str, signature: str, camera_id: str) -> dict[str, Any] | None:
+        previous = self._signature_by_track.get(track_id)
+        if previous != signature:
+            if previous is not None:
+                self._tracks_by_signature[previous] -= 1
+            self._signature_by_track[track_id] = signature
+            self._tracks_by_signature[signature] = self._tracks_by_signature.get(signature, 0) + 1
+        return _handoff_event(self.last_camera, timestamp, track_id, signature, camera_id)
+
+    def forget(self, track_id: str) -> None:
+        signature = self._signature_by_track.pop(track_id, None)
+        if signature is None:
+            return
+        remaining = self._tracks_by_signature[signature] - 1
+        if remaining > 0:
+            self._tracks_by_signature[signature] = remaining
+            return
+        del self._tracks_by_signature[signature]
+        self.last_camera.pop(signature, None)
+
+
+class SpatialGridIndex:
+    """Uniform grid over track bboxes for overlap candidate lookup.
+
+    Each track id is registered in every ``cell_size`` square its bbox touches,
+    so a query only visits tracks sharing a cell with the probe box. Lookup cost
+    scales with local track density instead of the camera's total track count.
+
+    A box spanning more than ``max_cells_per_box`` cells is not rasterized:
+    an oversized track is returned by every query, and an oversized probe
+    makes ``query`` return ``None`` so the caller scans linearly.
+    """
+
+    def __init__(self, cell_size: float, max_cells_per_box: int = MAX_GRID_CELLS_PER_BOX) -> None:
+        if cell_size <= 0:
+            raise ValueError("cell_size must be > 0")
+        self.cell_size = float(cell_size)
+        self.max_cells_per_box = max_cells_per_box
+        self._cells: dict[tuple[int, int], set[str]] = {}
+        self._cells_by_id: dict[str, tuple[int, int, int, int] | None] = {}
+        self._oversized: set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self._cells_by_id)
+
+    def _cell_span(self, bbox: BBox) -> tuple[int, int, int, int] | None:
+        x1, y1, x2, y2 = bbox
+        size = self.cell_size
+        span = (math.floor(x1 / size), math.floor(y1 / size), math.floor(x2 / size), math.floor(y2 / size))
+        if (span[2] - span[0] + 1) * (span[3] - span[1] + 1) > self.max_cells_per_box:
+            return None
+        return span
+
+    def insert(self, item_id: str, bbox: BBox) -> None:
+        span = self._cell_span(bbox)
+        self._cells_by_id[item_id] = span
+        if span is None:
+            self._oversized.add(item_id)
+            return
+        cx1, cy1, cx2, cy2 = span
+        for cx in range(cx1, cx2 + 1):
+            for cy in range(cy1, cy2 + 1):
+                self._cells.setdefault((cx, cy), set()).add(item_id)
+
+    def remove(self, item_id: str) -> None:
+        if item_id not in self._cells_by_id:
+            return
+        span = self._cells_by_id.pop(item_id)
+        if span is None:
+            self._oversized.discard(item_id)
+            return
+        cx1, cy1, cx2, cy2 = span
+        for cx in range(cx1, cx2 + 1):
+            for cy in range(cy1, cy2 + 1):
+                bucket = self._cells.get((cx, cy))
+                if bucket is None:
+                    continue
+                bucket.discard(item_id)
+                if not bucket:
+                    del self._cells[(cx, cy)]
+
+    def move(self, item_id: str, bbox: BBox) -> None:
+        if item_id in self._cells_by_id and self._cells_by_id[item_id] == self._cell_span(bbox):
+            return
+        self.remove(item_id)
+        self.insert(item_id, bbox)
+
+    def query(self, bbox: BBox) -> set[str] | None:
+        """Ids that may overlap ``bbox``, or ``None`` when ``bbox`` is too large to look up."""
+        span = self._cell_span(bbox)
+        if span is None:
+            return None
+        cx1, cy1, cx2, cy2 = span
+        found = set(self._oversized)
+        for cx in range(cx1, cx2 + 1):
+            for cy in range(cy1, cy2 + 1):
+                bucket = self._cells.get((cx, cy))
+                if bucket:
+                    found.update(bucket)
+        return found
 
 
 class InterceptTracker:
@@ -56,13 +189,28 @@ class InterceptTracker:
         lock_threshold: float,
         iou_match_threshold: float,
         min_hits_for_lock: int,
+        multi_target: bool = False,
+        track_ttl_s: float | None = None,
+        max_tracks_per_camera: int | None = None,
+        grid_cell_size: float | None = 64.0,
     ) -> None:
         self.lock_threshold = lock_threshold
         self.iou_match_threshold = iou_match_threshold
         self.min_hits_for_lock = min_hits_for_lock
-        self._tracks_by_camera: dict[str, dict[str, TrackState]] = {}
+        self.multi_target = multi_target
+        self.track_ttl_s = track_ttl_s
+        self.max_tracks_per_camera = max_tracks_per_camera
+        self.grid_cell_size = grid_cell_size
+        # Per-camera tracks kept in least-recently-updated-first order so expiry
+        # and capacity eviction only ever pop from the front.
+        self._tracks_by_camera: dict[str, OrderedDict[str, TrackState]] = {}
+        self._grid_by_camera: dict[str, SpatialGridIndex] = {}
         self._next_track_index = 1
-        self._last_camera_by_signature: dict[str, str] = {}
+        self._update_counter = 0
+        self._handoffs = SignatureHandoffs()
+        self.live_track_count = 0
+        self.expired_track_count = 0
+        self.refused_track_count = 0
 
     def update(
         self,
@@ -70,69 +218,115 @@ class InterceptTracker:
         camera_id: str,
         detections: list[Detection],
     ) -> tuple[dict[str, Any], list[dict[str, Any]]]:
-        camera_tracks = self._tracks_by_camera.setdefault(camera_id, {})
+        """Associate the single most confident detection and return one track record."""
+        events = self.expire(timestamp)
+        self._camera_tracks(camera_id)
         best_detection = max(detections, key=lambda d: d.confidence) if detections else None
 
         if best_detection is None:
-            result = {
-                "timestamp": timestamp,
-                "camera_id": camera_id,
-                "bbox": None,
-                "centroid": None,
-                "confidence": 0.0,
-                "track_id": None,
-                "lock_state": "SEARCHING",
-                "lock_quality": 0.0,
-            }
-            return result, []
+            return _searching_record(timestamp, camera_id), events
+
+        track, iou_prev = self._match_track(camera_id, best_detection)
+        if track is None:
+            # With nothing else touched this frame, making room always succeeds.
+            self._make_room(camera_id, set(), timestamp, events)
+            track = self._create_track(camera_id, best_detection, timestamp)
+        result = self._apply_detection(track, best_detection, iou_prev, timestamp, camera_id, events)
+        return result, events
 
-        track, iou_prev = self._match_or_create_track(camera_id, best_detection, timestamp)
+    def update_multi(
+        self,
+        timestamp: float,
+        camera_id: str,
+        detections: list[Detection],
+    ) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+        """Associate every detection in one batch and return one track record per target.
+
+        The tracks x detections IoU matrix is built in a single vectorized pass and
+        solved with a greedy highest-IoU-first assignment. Unmatched detections
+        start new tracks. Records are ordered by descending detection confidence.
+
+        At ``max_tracks_per_camera`` a new track first evicts the camera's
+        least-recently-updated track that this frame has not matched or
+        created. When every track was touched this frame the detection is
+        refused (counted in ``refused_track_count``, no record), so a frame
+        with more targets than the cap keeps its best tracks stable.
+        """
+        events = self.expire(timestamp)
+        self._camera_tracks(camera_id)
+        if not detections:
+            return [_searching_record(timestamp, camera_id)], events
+
+        tracks = self._candidate_tracks(camera_id, [d.bbox for d in detections])
+        assignments = _greedy_assignment(
+            _iou_matrix([t.bbox for t in tracks], [d.bbox for d in detections]),
+            self.iou_match_threshold,
+        )
+
+        results: list[dict[str, Any]] = []
+        touched = {tracks[track_index].track_id for track_index, _ in assignments.values()}
+        order = sorted(range(len(detections)), key=lambda i: detections[i].confidence, reverse=True)
+        for det_index in order:
+            detection = detections[det_index]
+            matched = assignments.get(det_index)
+            if matched is None:
+                if not self._make_room(camera_id, touched, timestamp, events):
+                    self.refused_track_count += 1
+                    continue
+                track, iou_prev = self._create_track(camera_id, detection, timestamp), 0.0
+                touched.add(track.track_id)
+            else:
+                track, iou_prev = tracks[matched[0]], matched[1]
+            results.append(self._apply_detection(track, detection, iou_prev, timestamp, camera_id, events))
+        return results, events
+
+    def _apply_detection(
+        self,
+        track: TrackState,
+        detection: Detection,
+        iou_prev: float,
+        timestamp: float,
+        camera_id: str,
+        events: list[dict[str, Any]],
+    ) -> dict[str, Any]:
         track.seen_count += 1
         track.last_timestamp = timestamp
         track.camera_id = camera_id
-        track.bbox = best_detection.bbox
-        track.target_signature = best_detection.target_signature
-        track.confidence_ema = 0.6 * track.confidence_ema + 0.4 * best_detection.confidence
+        track.bbox = detection.bbox
+        grid = self._grid_by_camera.get(camera_id)
+        if grid is not None:
+            grid.move(track.track_id, track.bbox)
+        track.target_signature = detection.target_signature
+        track.confidence_ema = 0.6 * track.confidence_ema + 0.4 * detection.confidence
         track.lock_quality = 0.5 * track.confidence_ema + 0.5 * iou_prev
         track.lock_state = self._determine_lock_state(track)
+        self._tracks_by_camera[camera_id].move_to_end(track.track_id)
+        self._update_counter += 1
+        track.update_order = self._update_counter
 
-        events: list[dict[str, Any]] = []
-        previous_camera = self._last_camera_by_signature.get(track.target_signature)
-        if previous_camera and previous_camera != camera_id:
-            events.append(
-                {
-                    "timestamp": timestamp,
-                    "event": "handoff",
-                    "track_id": track.track_id,
-                    "target_signature": track.target_signature,
-                    "from_camera": previous_camera,
-                    "to_camera": camera_id,
-                }
-            )
-        self._last_camera_by_signature[track.target_signature] = camera_id
+        self._note_signature(track, camera_id, timestamp, events)
 
-        result = {
+        return {
             "timestamp": timestamp,
             "camera_id": camera_id,
             "bbox": [round(v, 4) for v in track.bbox],
             "centroid": [round(v, 4) for v in _bbox_centroid(track.bbox)],
-            "confidence": round(best_detection.confidence, 4),
+            "confidence": round(detection.confidence, 4),
             "track_id": track.track_id,
             "lock_state": track.lock_state,
             "lock_quality": round(track.lock_quality, 4),
         }
-        return result, events
 
-    def _match_or_create_track(
-        self,
-        camera_id: str,
-        detection: Detection,
-        timestamp: float,
-    ) -> tuple[TrackState, float]:
-        camera_tracks = self._tracks_by_camera.setdefault(camera_id, {})
+    def _note_signature(self, track: TrackState, camera_id: str, timestamp: float, events: list[dict[str, Any]]) -> None:
+        """Record which camera last saw the track's signature, emitting a handoff event on a camera change."""
+        event = self._handoffs.note(timestamp, track.track_id, track.target_signature, camera_id)
+        if event is not None:
+            events.append(event)
+
+    def _match_track(self, camera_id: str, detection: Detection) -> tuple[TrackState | None, float]:
         best_track: TrackState | None = None
         best_iou = -1.0
-        for candidate in camera_tracks.values():
+        for candidate in self._candidate_tracks(camera_id, [detection.bbox]):
             iou = _iou(candidate.bbox, detection.bbox)
             if iou > best_iou:
                 best_iou = iou
@@ -140,7 +334,9 @@ class InterceptTracker:
 
         if best_track and best_iou >= self.iou_match_threshold:
             return best_track, best_iou
+        return None, 0.0
 
+    def _create_track(self, camera_id: str, detection: Detection, timestamp: float) -> TrackState:
         track_id = f"trk_{self._next_track_index:05d}"
         self._next_track_index += 1
         created = TrackState(
@@ -154,8 +350,104 @@ class InterceptTracker:
             seen_count=0,
             target_signature=detection.target_signature,
         )
-        camera_tracks[track_id] = created
-        return created, 0.0
+        self._update_counter += 1
+        created.update_order = self._update_counter
+        self._camera_tracks(camera_id)[track_id] = created
+        grid = self._grid_by_camera.get(camera_id)
+        if grid is not None:
+            grid.insert(track_id, created.bbox)
+        self.live_track_count += 1
+        return created
+
+    def _candidate_tracks(self, camera_id: str, boxes: list[BBox]) -> list[TrackState]:
+        """Return the camera's tracks that may overlap any of ``boxes``.
+
+        With a spatial grid only tracks sharing a grid cell are returned, in
+        the camera's least-recently-updated order like the linear path.
+        Without one (when ``iou_match_threshold <= 0`` lets non-overlapping
+        tracks match, or a probe box is too large for the grid) every track is
+        a candidate.
+        """
+        camera_tracks = self._camera_tracks(camera_id)
+        grid = self._grid_by_camera.get(camera_id)
+        if grid is None or self.iou_match_threshold <= 0:
+            return list(camera_tracks.values())
+        found: set[str] = set()
+        for bbox in boxes:
+            hits = grid.query(bbox)
+            if hits is None:
+                return list(camera_tracks.values())
+            found |= hits
+        return sorted((camera_tracks[track_id] for track_id in found), key=lambda track: track.update_order)
+
+    def _camera_tracks(self, camera_id: str) -> OrderedDict[str, TrackState]:
+        tracks = self._tracks_by_camera.get(camera_id)
+        if tracks is None:
+            tracks = self._tracks_by_camera[camera_id] = OrderedDict()
+            if self.grid_cell_size is not None:
+                self._grid_by_camera[camera_id] = SpatialGridIndex(self.grid_cell_size)
+        return tracks
+
+    def expire(self, timestamp: float) -> list[dict[str, Any]]:
+        """Drop tracks on every camera not updated within ``track_ttl_s`` of ``timestamp``.
+
+        Every camera is swept, so tracks on a camera that stopped sending
+        frames still expire. Tracks are stored oldest-update-first, so each
+        camera's sweep stops at its first fresh track (O(cameras) per frame
+        plus O(1) amortized per expired track). Returns the ``track_expired``
+        events in camera first-seen order.
+        """
+        events: list[dict[str, Any]] = []
+        if self.track_ttl_s is None:
+            return events
+        cutoff = timestamp - self.track_ttl_s
+        for camera_tracks in self._tracks_by_camera.values():
+            while camera_tracks:
+                oldest = next(iter(camera_tracks.values()))
+                if oldest.last_timestamp >= cutoff:
+                    break
+                self._evict(camera_tracks, oldest.track_id, timestamp, "ttl", events)
+        return events
+
+    def _make_room(self, camera_id: str, touched: set[str], timestamp: float, events: list[dict[str, Any]]) -> bool:
+        """Evict untouched tracks until a new one fits; ``False`` if only ``touched`` tracks remain."""
+        if self.max_tracks_per_camera is None:
+            return True
+        camera_tracks = self._camera_tracks(camera_id)
+        while len(camera_tracks) >= self.max_tracks_per_camera:
+            victim = next((track_id for track_id in camera_tracks if track_id not in touched), None)
+            if victim is None:
+                return False
+            self._evict(camera_tracks, victim, timestamp, "capacity", events)
+        return True
+
+    def _evict(
+        self,
+        camera_tracks: OrderedDict[str, TrackState],
+        track_id: str,
+        timestamp: float,
+        reason: str,
+        events: list[dict[str, Any]],
+    ) -> None:
+        track = camera_tracks.pop(track_id)
+        self._handoffs.forget(track_id)
+        grid = self._grid_by_camera.get(track.camera_id)
+        if grid is not None:
+            grid.remove(track.track_id)
+        self.live_track_count -= 1
+        self.expired_track_count += 1
+        events.append(
+            {
+                "timestamp": timestamp,
+                "event": "track_expired",
+                "track_id": track.track_id,
+                "camera_id": track.camera_id,
+                "target_signature": track.target_signature,
+                "last_timestamp": track.last_timestamp,
+                "seen_count": track.seen_count,
+                "reason": reason,
+            }
+        )
 
     def _determine_lock_state(self, track: TrackState) -> str:
         if track.seen_count >= self.min_hits_for_lock and track.confidence_ema >= self.lock_threshold:
@@ -165,6 +457,27 @@ class InterceptTracker:
         return "SEARCHING"
 
 
+def _handoff_event(
+    last_camera_by_signature: dict[str, str],
+    timestamp: float,
+    track_id: str,
+    target_signature: str,
+    camera_id: str,
+) -> dict[str, Any] | None:
+    previous_camera = last_camera_by_signature.get(target_signature)
+    last_camera_by_signature[target_signature] = camera_id
+    if not previous_camera or previous_camera == camera_id:
+        return None
+    return {
+        "timestamp": timestamp,
+        "event": "handoff",
+        "track_id": track_id,
+        "target_signature": target_signature,
+        "from_camera": previous_camera,
+        "to_camera": camera_id,
+    }
+
+
 def _iou(a: BBox, b: BBox) -> float:
     ax1, ay1, ax2, ay2 = a
     bx1, by1, bx2, by2 = b
@@ -186,63 +499,81 @@ def _iou(a: BBox, b: BBox) -> float:
     return inter_area / union if union > 0 else 0.0
 
 
-def _bbox_centroid(bbox: BBox) -> tuple[float, float]:
-    x1, y1, x2, y2 = bbox
-    return ((x1 + x2) / 2.0, (y1 + y2) / 2.0)
+def _iou_matrix(track_boxes: list[BBox], detection_boxes: list[BBox]) -> Any:
+    """Return the ``len(track_boxes) x len(detection_boxes)`` IoU matrix.
+
+    Uses one broadcast NumPy expression when numpy is installed, otherwise a
+    nested list of ``_iou`` values with the same shape.
+    """
+    if np is None:
+        return [[_iou(t, d) for d in detection_boxes] for t in track_boxes]
+    if not track_boxes or not detection_boxes:
+        return np.zeros((len(track_boxes), len(detection_boxes)), dtype=np.float64)
+
+    tracks = np.asarray(track_boxes, dtype=np.float64)[:, None, :]
+    dets = np.asarray(detection_boxes, dtype=np.float64)[None, :, :]
+    inter_w = np.clip(np.minimum(tracks[..., 2], dets[..., 2]) - np.maximum(tracks[..., 0], dets[..., 0]), 0.0, None)
+    inter_h = np.clip(np.minimum(tracks[..., 3], dets[..., 3]) - np.maximum(tracks[..., 1], dets[..., 1]), 0.0, None)
+    inter = inter_w * inter_h
+    area_t = np.clip(tracks[..., 2] - tracks[..., 0], 0.0, None) * np.clip(tracks[..., 3] - tracks[..., 1], 0.0, None)
+    area_d = np.clip(dets[..., 2] - dets[..., 0], 0.0, None) * np.clip(dets[..., 3] - dets[..., 1], 0.0, None)
+    union = area_t + area_d - inter
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where((inter > 0) & (union > 0), inter / union, 0.0)
+
+
+def _greedy_assignment(iou: Any, threshold: float) -> dict[int, tuple[int, float]]:
+    """Assign detections to tracks highest-IoU-first; returns ``{det: (track, iou)}``."""
+    if np is None:
+        pairs = sorted(
+            ((value, t, d) for t, row in enumerate(iou) for d, value in enumerate(row) if value >= threshold),
+            key=lambda item: item[0],
+            reverse=True,
+        )
+    else:
+        rows, cols = np.nonzero(iou >= threshold)
+        values = iou[rows, cols]
+        order = np.argsort(-values, kind="stable")
+        pairs = zip(values[order].tolist(), rows[order].tolist(), cols[order].tolist())
+
+    assigned: dict[int, tuple[int, float]] = {}
+    used_tracks: set[int] = set()
+    for value, track_index, det_index in pairs:
+        if track_index in used_tracks or det_index in assigned:
+            continue
+        used_tracks.add(track_index)
+        assigned[det_index] = (track_index, float(value))
+    return assigned
 
 
-def _build_bbox_from_centroid(centroid: tuple[float, float], width: float, height: float) -> BBox:
-    cx, cy = centroid
-    half_w = width / 2.0
-    half_h = height / 2.0
-    return (cx - half_w, cy - half_h, cx + half_w, cy + half_h)
+def _searching_record(timestamp: float, camera_id: str) -> dict[str, Any]:
+    return {
+        "timestamp": timestamp,
+        "camera_id": camera_id,
+        "bbox": None,
+        "centroid": None,
+        "confidence": 0.0,
+        "track_id": None,
+        "lock_state": "SEARCHING",
+        "lock_quality": 0.0,
+    }
 
 
-def _parse_bbox(raw: Any) -> BBox | None:
-    if not isinstance(raw, list) or len(raw) != 4:
-        return None
-    try:
-        vals = [float(v) for v in raw]
-    except (TypeError, ValueError):
-        return None
-    x1, y1, x2, y2 = vals
-    if x2 <= x1 or y2 <= y1:
-        return None
-    return (x1, y1, x2, y2)
+def _bbox_centroid(bbox: BBox) -> tuple[float, float]:
+    x1, y1, x2, y2 = bbox
+    return ((x1 + x2) / 2.0, (y1 + y2) / 2.0)
 
 
 def _frame_to_detections(frame: dict[str, Any]) -> list[Detection]:
-    detections: list[Detection] = []
-
-    for raw_detection in frame.get("detections", []):
-        if not isinstance(raw_detection, dict):
-            continue
-        bbox = _parse_bbox(raw_detection.get("bbox"))
-        if bbox is None and isinstance(raw_detection.get("centroid"), list):
-            centroid_raw = raw_detection.get("centroid")
-            if len(centroid_raw) == 2:
-                try:
-                    centroid = (float(centroid_raw[0]), float(centroid_raw[1]))
-                except (TypeError, ValueError):
-                    centroid = None
-                if centroid:
-                    bbox = _build_bbox_from_centroid(centroid, 40.0, 40.0)
-
-        if bbox is None:
-            continue
-
-        conf_raw = raw_detection.get("confidence", 0.5)
-        try:
-            confidence = min(1.0, max(0.0, float(conf_raw)))
-        except (TypeError, ValueError):
-            confidence = 0.5
-
-        signature = str(raw_detection.get("target_signature", frame.get("target_signature", "default_target")))
-        detections.append(Detection(bbox=bbox, confidence=confidence, target_signature=signature))
+    raw_detections = frame.get("detections", [])
+    if raw_detections and all(isinstance(detection, Detection) for detection in raw_detections):
+        # Already typed by decode_tracker_frame.
+        return raw_detections
+    detections = parse_detections(raw_detections, frame.get("target_signature", "default_target"))
 
     # Fallback for frame-level bbox and confidence.
     if not detections:
-        bbox = _parse_bbox(frame.get("bbox"))
+        bbox = parse_bbox(frame.get("bbox"))
         if bbox is not None:
             conf_raw = frame.get("confidence", 0.5)
             try:
@@ -255,46 +586,54 @@ def _frame_to_detections(frame: dict[str, Any]) -> list[Detection]:
     return detections
 
 
-def _iter_logged_frames(path: Path) -> Iterable[dict[str, Any]]:
-    with path.open("r", encoding="utf-8") as handle:
-        for line_number, raw_line in enumerate(handle, start=1):
-            line = raw_line.strip()
-            if not line:
-                continue
-            try:
-                frame = json.loads(line)
-            except json.JSONDecodeError as exc:
-                raise SystemExit(f"Invalid JSON in {path} line {line_number}: {exc}") from exc
-            if not isinstance(frame, dict):
-                raise SystemExit(f"Expected object JSON in {path} line {line_number}")
-            normalized = normalize_adapter_frame(frame, source_name=str(path), line_number=line_number)
-            if normalized is None:
-                continue
-            yield normalized
-
-
-def _iter_stdin_frames() -> Iterable[dict[str, Any]]:
-    for line_number, raw_line in enumerate(sys.stdin, start=1):
+def _iter_decoded_lines(
+    lines: Iterable[str], source_name: str, label: str, diagnostics: Diagnostics | None
+) -> Iterable[dict[str, Any]]:
+    codec = get_codec()
+    for line_number, raw_line in enumerate(lines, start=1):
         line = raw_line.strip()
         if not line:
             continue
         try:
-            frame = json.loads(line)
-        except json.JSONDecodeError as exc:
-            raise SystemExit(f"Invalid JSON in stdin line {line_number}: {exc}") from exc
-        if not isinstance(frame, dict):
-            raise SystemExit(f"Expected object JSON in stdin line {line_number}")
-        normalized = normalize_adapter_frame(frame, source_name="stdin", line_number=line_number)
+            normalized = decode_tracker_frame(
+                line, codec=codec, drops=diagnostics, source_name=source_name, line_number=line_number
+            )
+        except (TypeError, ValueError) as exc:
+            raise _input_line_error(exc, label, line_number) from exc
         if normalized is None:
             continue
         yield normalized
 
 
-def _iter_simulated_frames(cameras: list[str], duration_s: float, fps: float) -> Iterable[dict[str, Any]]:
-    now = time.time()
+def _input_line_error(exc: Exception, label: str, line_number: int) -> SystemExit:
+    """The CLI error for an input line ``decode_tracker_frame`` raised ``exc`` on."""
+    if isinstance(exc, TypeError):
+        return SystemExit(f"Expected object JSON in {label} line {line_number}")
+    return SystemExit(f"Invalid JSON in {label} line {line_number}: {exc}")
+
+
+def _iter_file_lines(path: Path) -> Iterable[str]:
+    with path.open("r", encoding="utf-8") as handle:
+        yield from handle
+
+
+def _iter_logged_frames(path: Path, diagnostics: Diagnostics | None = None) -> Iterable[dict[str, Any]]:
+    yield from _iter_decoded_lines(_iter_file_lines(path), str(path), str(path), diagnostics)
+
+
+def _iter_stdin_frames(diagnostics: Diagnostics | None = None) -> Iterable[dict[str, Any]]:
+    yield from _iter_decoded_lines(sys.stdin, "stdin", "stdin", diagnostics)
+
+
+def _iter_simulated_frames(
+    cameras: list[str], duration_s: float, fps: float, clock: Clock | None = None
+) -> Iterable[dict[str, Any]]:
+    clock = clock or WallClock()
+    now = clock.now()
     frame_count = max(1, int(duration_s * fps))
     for step in range(frame_count):
         timestamp = now + step / fps
+        clock.observe(timestamp)
         active_camera = cameras[0] if step < frame_count // 2 else cameras[-1]
         for index, camera_id in enumerate(cameras):
             if camera_id != active_camera:
@@ -308,7 +647,7 @@ def _iter_simulated_frames(cameras: list[str], duration_s: float, fps: float) ->
             cx = 320 + 36 * math.sin(phase)
             cy = 240 + 24 * math.cos(phase)
             confidence = 0.55 + 0.4 * (0.5 + 0.5 * math.sin(phase * 0.7))
-            bbox = _build_bbox_from_centroid((cx, cy), 46, 46)
+            bbox = bbox_from_centroid((cx, cy), 46, 46)
             yield {
                 "timestamp": timestamp,
                 "camera_id": camera_id,
@@ -322,11 +661,6 @@ def _iter_simulated_frames(cameras: list[str], duration_s: float, fps: float) ->
             }
 
 
-def _write_jsonl(path: Path, record: dict[str, Any]) -> None:
-    with path.open("a", encoding="utf-8") as handle:
-        handle.write(json.dumps(record, separators=(",", ":")) + "\n")
-
-
 def parse_args(argv: list[str]) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description=__doc__)
     source = parser.add_mutually_exclusive_group(required=True)
@@ -393,75 +727,361 @@ def parse_args(argv: list[str]) -> argparse.Namespace:
         default=3,
         help="Minimum associated detections before entering LOCKED state.",
     )
+    parser.add_argument(
+        "--multi-target",
+        action="store_true",
+        help="Associate every detection per frame and emit one track record per target "
+        "(default keeps only the most confident detection).",
+    )
+    parser.add_argument(
+        "--track-ttl-s",
+        type=float,
+        default=5.0,
+        help="Expire tracks not updated for this many seconds (0 disables).",
+    )
+    parser.add_argument(
+        "--max-tracks-per-camera",
+        type=int,
+        default=64,
+        help="Cap tracks per camera: a new track evicts the least-recently-updated one not seen this frame (0 disables).",
+    )
+    parser.add_argument(
+        "--grid-cell-px",
+        type=float,
+        default=64.0,
+        help="Spatial grid cell size for track candidate lookup (0 falls back to a linear scan).",
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=0,
+        help="Track in this many per-camera worker processes (0: serial, in this process). See sharded_tracker.py.",
+    )
+    parser.add_argument(
+        "--shard-batch-frames",
+        type=int,
+        default=64,
+        help="Frames sent to a shard per message; also bounds how far merged output lags input (use 1 for live streams).",
+    )
+    parser.add_argument(
+        "--idle-flush-s",
+        type=float,
+        default=0.05,
+        help="With --input-stdin-jsonl, flush buffered output (and partial shard batches) after input is idle this long "
+        "(0 disables).",
+    )
+    parser.add_argument(
+        "--output-format",
+        choices=OUTPUT_FORMATS,
+        default="auto",
+        help="Track/event file encoding: jsonl, bin (track_binary.py), or auto (bin for a .bin suffix).",
+    )
     parser.add_argument(
         "--clear-output",
         action="store_true",
         help="Truncate output JSONL files before writing.",
     )
+    parser.add_argument(
+        "--publish-shm",
+        default=None,
+        metavar="NAME",
+        help="Also publish track records to a shared-memory ring with this name (see track_ring.py).",
+    )
+    parser.add_argument(
+        "--shm-capacity",
+        type=int,
+        default=4096,
+        help="Record slots in the --publish-shm ring.",
+    )
+    parser.add_argument(
+        "--shm-unlink",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Remove the --publish-shm ring on exit (disable when an orchestrator owns its lifetime).",
+    )
+    parser.add_argument(
+        "--record-tracks-jsonl",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Write the track stream to --output-jsonl (disable to use the shm ring only).",
+    )
+    parser.add_argument(
+        "--flush-rows",
+        type=int,
+        default=1,
+        help="Flush output JSONL after this many buffered rows (1 keeps tailers row-prompt).",
+    )
+    parser.add_argument(
+        "--flush-interval-s",
+        type=float,
+        default=0.0,
+        help="Also flush output JSONL when this many seconds passed since the last flush (0 disables).",
+    )
+    parser.add_argument(
+        "--fsync",
+        action="store_true",
+        help="fsync output JSONL files on every flush.",
+    )
+    add_clock_arguments(parser)
+    add_diagnostics_arguments(parser)
     return parser.parse_args(argv)
 
 
+def _iter_tracking_outputs(
+    tracker: InterceptTracker,
+    frame_iter: Iterable[dict[str, Any]],
+    diagnostics: Diagnostics | None = None,
+    clock: Clock | None = None,
+) -> Iterable[tuple[list[dict[str, Any]], list[dict[str, Any]]]]:
+    """Run ``tracker`` over normalized frames, yielding ``(track_records, events)`` per frame.
+
+    Events include the tracker's own handoff/expiry events plus
+    ``lock_state_transition`` events derived from consecutive track records.
+    Frames with unusable timestamps are counted in ``diagnostics`` (printed
+    one by one without it); frames without one are stamped with ``clock``.
+    """
+    last_lock_state_by_track: dict[str, str] = {}
+
+    for timestamp, camera_id, detections in _iter_tracker_inputs(frame_iter, diagnostics, clock):
+        if tracker.multi_target:
+            outputs, events = tracker.update_multi(timestamp, camera_id, detections)
+        else:
+            output, events = tracker.update(timestamp, camera_id, detections)
+            outputs = [output]
+        _append_lock_transitions(outputs, events, timestamp, last_lock_state_by_track)
+        yield outputs, events
+
+
+def _iter_tracker_inputs(
+    frame_iter: Iterable[dict[str, Any]],
+    diagnostics: Diagnostics | None,
+    clock: Clock | None = None,
+) -> Iterable[tuple[float, str, list[Detection]]]:
+    for timestamp, camera_id, frame in _iter_frame_keys(frame_iter, diagnostics, clock):
+        yield timestamp, camera_id, _frame_to_detections(frame)
+
+
+def _iter_frame_keys(
+    frame_iter: Iterable[dict[str, Any]],
+    diagnostics: Diagnostics | None,
+    clock: Clock | None = None,
+) -> Iterable[tuple[float, str, dict[str, Any]]]:
+    """Yield ``(timestamp, camera_id, frame)`` per usable frame, leaving its detections unparsed."""
+    clock = clock or WallClock()
+    for frame in frame_iter:
+        timestamp_raw = frame["timestamp"] if "timestamp" in frame else clock.now()
+        try:
+            timestamp = float(timestamp_raw)
+        except (TypeError, ValueError):
+            if diagnostics is not None:
+                diagnostics.count("invalid_timestamp", timestamp_raw, "normalized_stream")
+            else:
+                print("[tracker] dropping frame with invalid timestamp from normalized stream", file=sys.stderr)
+            continue
+        yield timestamp, str(frame.get("camera_id", "unknown_camera")), frame
+
+
+def _iter_with_idle_marks(items: Iterable[Any], idle_s: float) -> Iterator[Any]:
+    """Yield ``items`` from a reader thread, plus ``None`` whenever none arrived for ``idle_s``."""
+    buffered: queue.Queue[Any] = queue.Queue(maxsize=_MAX_QUEUED_INPUTS)
+    done = object()
+    failures: list[BaseException] = []
+
+    def _read() -> None:
+        try:
+            for item in items:
+                buffered.put(item)
+        except BaseException as exc:  # noqa: BLE001 - re-raised by the consumer
+            failures.append(exc)
+        buffered.put(done)
+
+    threading.Thread(target=_read, name="tracker-input", daemon=True).start()
+    while True:
+        try:
+            item = buffered.get(timeout=idle_s)
+        except queue.Empty:
+            yield None
+            continue
+        if item is done:
+            if failures:
+                # As if read inline: bad input lines keep their SystemExit message.
+                raise failures[0]
+            return
+        yield item
+
+
+def _frames_flushing_on_idle(
+    frame_iter: Iterable[dict[str, Any]], idle_s: float, on_idle: Callable[[], None]
+) -> Iterator[dict[str, Any]]:
+    """Pass ``frame_iter`` through, calling ``on_idle`` whenever no frame arrived for ``idle_s``."""
+    for frame in _iter_with_idle_marks(frame_iter, idle_s):
+        if frame is None:
+            on_idle()
+            continue
+        yield frame
+
+
+def _append_lock_transitions(
+    outputs: list[dict[str, Any]],
+    events: list[dict[str, Any]],
+    timestamp: float,
+    last_lock_state_by_track: dict[str, str],
+) -> None:
+    for output in outputs:
+        track_id = output.get("track_id")
+        if not track_id:
+            continue
+        previous_state = last_lock_state_by_track.get(track_id)
+        if previous_state and previous_state != output["lock_state"]:
+            events.append(
+                {
+                    "timestamp": timestamp,
+                    "event": "lock_state_transition",
+                    "track_id": track_id,
+                    "from": previous_state,
+                    "to": output["lock_state"],
+                    "lock_quality": output["lock_quality"],
+                }
+            )
+        last_lock_state_by_track[track_id] = output["lock_state"]
+
+    for event in events:
+        if event["event"] == "track_expired":
+            last_lock_state_by_track.pop(event["track_id"], None)
+
+
+def _run_tracking_loop(
+    results: Iterable[tuple[list[dict[str, Any]], list[dict[str, Any]]]],
+    tracks_writer: BufferedJsonlWriter | BinaryTrackWriter | None,
+    events_writer: BufferedJsonlWriter | BinaryTrackWriter,
+    ring: TrackRingWriter | None = None,
+) -> None:
+    for outputs, events in results:
+        for output in outputs:
+            # Publish to shared memory first so readers never wait on disk I/O.
+            if ring is not None:
+                ring.publish(output)
+            if tracks_writer is not None:
+                tracks_writer.write(output)
+        for event in events:
+            events_writer.write(event)
+
+
+def tracker_options(args: argparse.Namespace) -> dict[str, Any]:
+    """``InterceptTracker`` keyword arguments from parsed ``parse_args`` options."""
+    return {
+        "lock_threshold": args.lock_threshold,
+        "iou_match_threshold": args.iou_threshold,
+        "min_hits_for_lock": args.min_hits,
+        "multi_target": args.multi_target,
+        "track_ttl_s": args.track_ttl_s if args.track_ttl_s > 0 else None,
+        "max_tracks_per_camera": args.max_tracks_per_camera if args.max_tracks_per_camera > 0 else None,
+        "grid_cell_size": args.grid_cell_px if args.grid_cell_px > 0 else None,
+    }
+
+
+def build_tracker(args: argparse.Namespace) -> InterceptTracker:
+    """Construct an ``InterceptTracker`` from parsed ``parse_args`` options."""
+    return InterceptTracker(**tracker_options(args))
+
+
 def main(argv: list[str] | None = None) -> int:
     args = parse_args(argv or sys.argv[1:])
 
-    args.output_jsonl.parent.mkdir(parents=True, exist_ok=True)
-    args.events_jsonl.parent.mkdir(parents=True, exist_ok=True)
-    if args.clear_output:
-        args.output_jsonl.write_text("", encoding="utf-8")
-        args.events_jsonl.write_text("", encoding="utf-8")
-
-    tracker = InterceptTracker(
-        lock_threshold=args.lock_threshold,
-        iou_match_threshold=args.iou_threshold,
-        min_hits_for_lock=args.min_hits,
-    )
+    if args.shards < 0:
+        raise SystemExit("--shards must be >= 0")
+    diagnostics = build_diagnostics(args, "intercept_tracker")
+    # Stamps simulated frames, and any input frame that arrives without a timestamp.
+    clock = build_clock(args)
 
     if args.simulate_stream:
         cameras = [cam.strip() for cam in args.cameras.split(",") if cam.strip()]
         if not cameras:
             raise SystemExit("At least one camera id is required for --simulate-stream")
-        frame_iter = _iter_simulated_frames(cameras, args.duration_s, args.fps)
+        frame_iter = _iter_simulated_frames(cameras, args.duration_s, args.fps, clock)
     elif args.input_stdin_jsonl:
-        frame_iter = _iter_stdin_frames()
+        frame_iter = _iter_stdin_frames(diagnostics)
     else:
-        frame_iter = _iter_logged_frames(args.input_jsonl)
+        frame_iter = _iter_logged_frames(args.input_jsonl, diagnostics)
+
+    writer_options = {
+        "flush_rows": args.flush_rows,
+        "flush_interval_s": args.flush_interval_s,
+        "fsync": args.fsync,
+        "truncate": args.clear_output,
+    }
+    tracks_writer = (
+        open_record_writer(args.output_jsonl, args.output_format, **writer_options) if args.record_tracks_jsonl else None
+    )
+    events_writer = open_record_writer(args.events_jsonl, args.output_format, **writer_options)
+    ring = TrackRingWriter(args.publish_shm, capacity=args.shm_capacity) if args.publish_shm else None
 
-    last_lock_state_by_track: dict[str, str] = {}
+    def _handle_sigterm(signum: int, _frame: object) -> None:
+        # Unwind through the finally block below so buffered rows are flushed.
+        raise SystemExit(128 + signum)
 
-    for frame in frame_iter:
-        timestamp_raw = frame.get("timestamp", time.time())
-        try:
-            timestamp = float(timestamp_raw)
-        except (TypeError, ValueError):
-            print("[tracker] dropping frame with invalid timestamp from normalized stream", file=sys.stderr)
-            continue
+    signal.signal(signal.SIGTERM, _handle_sigterm)
 
-        camera_id = str(frame.get("camera_id", "unknown_camera"))
-        detections = _frame_to_detections(frame)
-        output, events = tracker.update(timestamp, camera_id, detections)
-        _write_jsonl(args.output_jsonl, output)
+    def _flush_idle() -> None:
+        # Input stalled: hand buffered rows to tailers instead of waiting for the next write.
+        for writer in (tracks_writer, events_writer):
+            if writer is not None and writer.pending_rows:
+                writer.flush()
 
-        track_id = output.get("track_id")
-        if track_id:
-            previous_state = last_lock_state_by_track.get(track_id)
-            if previous_state and previous_state != output["lock_state"]:
-                events.append(
-                    {
-                        "timestamp": timestamp,
-                        "event": "lock_state_transition",
-                        "track_id": track_id,
-                        "from": previous_state,
-                        "to": output["lock_state"],
-                        "lock_quality": output["lock_quality"],
-                    }
-                )
-            last_lock_state_by_track[track_id] = output["lock_state"]
+    idle_flush_s = args.idle_flush_s if args.input_stdin_jsonl and args.idle_flush_s > 0 else None
+    if args.shards:
+        from sharded_tracker import ShardedTracking
 
-        for event in events:
-            _write_jsonl(args.events_jsonl, event)
+        tracker: InterceptTracker | ShardedTracking = ShardedTracking(
+            tracker_options(args), args.shards, batch_frames=args.shard_batch_frames
+        )
+        if args.simulate_stream:
+            results = tracker.run(frame_iter, diagnostics, idle_flush_s=idle_flush_s, on_idle=_flush_idle, clock=clock)
+        else:
+            # Hand the raw adapter lines over: the shard workers decode and validate them.
+            source = "stdin" if args.input_stdin_jsonl else str(args.input_jsonl)
+            lines = sys.stdin if args.input_stdin_jsonl else _iter_file_lines(args.input_jsonl)
+            results = tracker.run_lines(
+                lines, diagnostics, source_name=source, idle_flush_s=idle_flush_s, on_idle=_flush_idle
+            )
+    else:
+        tracker = build_tracker(args)
+        if idle_flush_s is not None:
+            frame_iter = _frames_flushing_on_idle(frame_iter, idle_flush_s, _flush_idle)
+        results = _iter_tracking_outputs(tracker, frame_iter, diagnostics, clock)
 
-    print(f"Tracking output written to {args.output_jsonl}")
+    try:
+        _run_tracking_loop(results, tracks_writer, events_writer, ring)
+    finally:
+        results.close()
+        diagnostics.close(args.diagnostics_json)
+        if hasattr(clock, "close"):
+            clock.close()
+        if ring is not None:
+            ring.close(unlink=args.shm_unlink)
+        if tracks_writer is not None:
+            tracks_writer.close()
+        events_writer.close()
+
+    if tracks_writer is not None:
+        print(f"Tracking output written to {args.output_jsonl}")
     print(f"Event log written to {args.events_jsonl}")
+    if tracks_writer is not None:
+        print(tracks_writer.stats_line("[tracker] tracks writer"))
+    print(events_writer.stats_line("[tracker] events writer"))
+    if ring is not None:
+        print(
+            f"[tracker] shm ring {ring.name}: published={ring.published} rejected={ring.rejected} capacity={ring.capacity}"
+        )
+    if args.shards:
+        print(
+            f"[tracker] shards={args.shards} frames_per_shard={tracker.frames_by_shard} "
+            f"expiry_ticks={tracker.expiry_ticks}"
+        )
+    print(
+        f"[tracker] live_tracks={tracker.live_track_count} expired_tracks={tracker.expired_track_count} "
+        f"refused_tracks={tracker.refused_track_count}"
+    )
     return 0
 
 
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""Long-lived buffered JSONL writer shared by the vision tools.
+
+The writer keeps one append handle open for the lifetime of a run and only
+ever hands complete lines to the OS, so tailers (for example
+``guidance_advisory.py`` following the tracker stream) never observe a
+partially written row.
+
+Rows are flushed when either bound is reached:
+- ``flush_rows`` pending rows (``1`` flushes every row, the default), or
+- ``flush_interval_s`` seconds since the last flush (checked on each write).
+
+The interval is only checked when a row arrives, so callers whose input can
+stall should call ``flush()`` while idle (``intercept_tracker.py`` and
+``guidance_advisory.py`` do this when their input runs dry).
+
+``fsync=True`` additionally forces flushed rows to stable storage.
+
+``BufferedRecordWriter`` holds the buffering, flush and stats logic;
+``track_binary.BinaryTrackWriter`` reuses it for the binary track format.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import IO, Any
+
+from intercept_adapter_contract import get_codec
+
+
+class BufferedRecordWriter(ABC):
+    """Buffer encoded records and hand them to one long-lived handle in whole batches.
+
+    Subclasses open ``self._handle`` and implement ``_encode`` and ``_join``.
+    """
+
+    kind = "record"
+
+    def __init__(self, path: Path, *, flush_rows: int = 1, flush_interval_s: float = 0.0, fsync: bool = False) -> None:
+        self.path = path
+        self.flush_rows = max(1, int(flush_rows))
+        self.flush_interval_s = max(0.0, float(flush_interval_s))
+        self.fsync = fsync
+        self.rows_written = 0
+        self.bytes_written = 0
+        self.flush_count = 0
+        self._pending: list[Any] = []
+        self._started_at = time.monotonic()
+        self._last_flush_at = self._started_at
+        self._handle: IO[Any] | None = None
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+    @abstractmethod
+    def _encode(self, record: dict[str, Any]) -> Any:
+        """One record as a pending chunk (``str`` or ``bytes``, matching the handle)."""
+
+    @abstractmethod
+    def _join(self, pending: list[Any]) -> tuple[Any, int]:
+        """The chunk to write for ``pending`` and its size in bytes."""
+
+    def write(self, record: dict[str, Any]) -> None:
+        self._check_open()
+        self._append(self._encode(record))
+
+    def _check_open(self) -> None:
+        if self._handle is None:
+            raise ValueError(f"write to closed {self.kind} writer: {self.path}")
+
+    def _append(self, item: Any) -> None:
+        self._pending.append(item)
+        if len(self._pending) >= self.flush_rows:
+            self.flush()
+        elif self.flush_interval_s > 0 and time.monotonic() - self._last_flush_at >= self.flush_interval_s:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._handle is None:
+            return
+        if self._pending:
+            # Detach the batch before writing: if the write is interrupted (e.g. SIGTERM
+            # raising SystemExit), close() must not hand the same rows to the OS again.
+            pending, self._pending = self._pending, []
+            chunk, size = self._join(pending)
+            self._handle.write(chunk)
+            self.rows_written += len(pending)
+            self.bytes_written += size
+            self.flush_count += 1
+        self._handle.flush()
+        if self.fsync:
+            os.fsync(self._handle.fileno())
+        self._last_flush_at = time.monotonic()
+
+    def close(self) -> None:
+        if self._handle is None:
+            return
+        try:
+            self.flush()
+        finally:
+            self._handle.close()
+            self._handle = None
+
+    @property
+    def pending_rows(self) -> int:
+        return len(self._pending)
+
+    @property
+    def closed(self) -> bool:
+        return self._handle is None
+
+    def stats(self) -> dict[str, Any]:
+        elapsed_s = max(1e-9, time.monotonic() - self._started_at)
+        return {
+            "path": str(self.path),
+            "rows": self.rows_written,
+            "bytes": self.bytes_written,
+            "flushes": self.flush_count,
+            "elapsed_s": round(elapsed_s, 6),
+            "rows_per_s": round(self.rows_written / elapsed_s, 2),
+            "bytes_per_s": round(self.bytes_written / elapsed_s, 2),
+        }
+
+    def stats_line(self, label: str) -> str:
+        s = self.stats()
+        return (
+            f"{label}: rows={s['rows']} bytes={s['bytes']} flushes={s['flushes']} "
+            f"rows_per_s={s['rows_per_s']:.1f} bytes_per_s={s['bytes_per_s']:.1f}"
+        )
+
+    def __enter__(self) -> BufferedRecordWriter:
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.close()
+
+
+class BufferedJsonlWriter(BufferedRecordWriter):
+    kind = "JSONL"
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        flush_rows: int = 1,
+        flush_interval_s: float = 0.0,
+        fsync: bool = False,
+        truncate: bool = False,
+    ) -> None:
+        super().__init__(path, flush_rows=flush_rows, flush_interval_s=flush_interval_s, fsync=fsync)
+        self._handle = path.open("w" if truncate else "a", encoding="utf-8")
+        self._dumps = get_codec().dumps
+
+    def _encode(self, record: dict[str, Any]) -> str:
+        return self._dumps(record) + "\n"
+
+    def _join(self, pending: list[str]) -> tuple[str, int]:
+        chunk = "".join(pending)
+        return chunk, len(chunk.encode("utf-8"))
+
+    def write_line(self, line: str) -> None:
+        """Queue one already-encoded JSON line (without trailing newline)."""
+        self._check_open()
+        self._append(line + "\n")
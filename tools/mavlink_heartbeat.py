@@ -9,11 +9,11 @@ import time
 
 from pymavlink import mavutil
 
+from periodic_scheduler import PeriodicScheduler, PeriodicStream, heartbeat_stream, system_time_stream
 
-MAV_TYPE_GCS = mavutil.mavlink.MAV_TYPE_GCS
-MAV_AUTOPILOT_INVALID = mavutil.mavlink.MAV_AUTOPILOT_INVALID
-MAV_STATE_ACTIVE = mavutil.mavlink.MAV_STATE_ACTIVE
 MAV_PARAM_TYPE_INT32 = mavutil.mavlink.MAV_PARAM_TYPE_INT32
+PARAM_PHASE_S = 2.0
+PARAM_RATE_HZ = 5.0
 
 
 def main(argv: list[str] | None = None) -> int:
@@ -27,15 +27,22 @@ def main(argv: list[str] | None = None) -> int:
         help="Local UDP port to mimic a GCS",
     )
     parser.add_argument("--rate", type=float, default=1.0, help="Heartbeat frequency (Hz)")
+    parser.add_argument(
+        "--system-time-rate",
+        type=float,
+        default=0.0,
+        help="Also stream SYSTEM_TIME at this rate in Hz (0 disables)",
+    )
+    parser.add_argument("--stats", action="store_true", help="Print per-stream timing jitter at exit")
     parser.add_argument("--duration", type=float, default=30.0, help="Total runtime (seconds)")
     parser.add_argument("--sysid", type=int, default=255, help="MAVLink system id")
     parser.add_argument("--compid", type=int, default=190, help="MAVLink component id")
 
     args = parser.parse_args(argv)
 
-    interval = 1.0 / max(args.rate, 0.1)
-    end_time = time.monotonic() + max(args.duration, interval)
-    param_stop = time.monotonic() + 2.0
+    rate = max(args.rate, 0.1)
+    duration = max(args.duration, 1.0 / rate)
+    started = time.monotonic()
 
     link = mavutil.mavlink_connection(
         f"udpout:{args.target_host}:{args.target_port}",
@@ -44,29 +51,18 @@ def main(argv: list[str] | None = None) -> int:
         udp_bind_port=args.source_port,
     )
 
-    try:
-        while time.monotonic() < end_time:
-            now = time.monotonic()
+    def send_nav_dll_act() -> None:
+        link.mav.param_set_send(1, 1, b"NAV_DLL_ACT", float(0), MAV_PARAM_TYPE_INT32)
 
-            if now < param_stop:
-                link.mav.param_set_send(
-                    1,
-                    1,
-                    b"NAV_DLL_ACT",
-                    float(0),
-                    MAV_PARAM_TYPE_INT32,
-                )
-                time.sleep(0.2)
-                continue
-
-            link.mav.heartbeat_send(
-                MAV_TYPE_GCS,
-                MAV_AUTOPILOT_INVALID,
-                0,
-                0,
-                MAV_STATE_ACTIVE,
-            )
-            time.sleep(interval)
+    try:
+        # NAV_DLL_ACT=0 first so PX4 does not fail-safe before the heartbeat settles.
+        with PeriodicScheduler([PeriodicStream("nav_dll_act", PARAM_RATE_HZ, send_nav_dll_act)]):
+            time.sleep(min(PARAM_PHASE_S, duration))
+        scheduler = PeriodicScheduler([heartbeat_stream(link, rate), system_time_stream(link, args.system_time_rate)])
+        with scheduler:
+            time.sleep(max(0.0, started + duration - time.monotonic()))
+        if args.stats:
+            print(f"[heartbeat] {scheduler.format_stats()}")
     finally:
         link.close()
 
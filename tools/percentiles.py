@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+"""Percentile helper shared by the vision checkers, pipeline reports and MAVLink jitter stats."""
+
+from __future__ import annotations
+
+import math
+from typing import Sequence
+
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float | None:
+    """Linearly interpolated ``fraction`` (0..1) quantile of ascending ``sorted_values``; ``None`` if empty."""
+    if not sorted_values:
+        return None
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    rank = (len(sorted_values) - 1) * fraction
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    weight = rank - low
+    return sorted_values[low] * (1.0 - weight) + sorted_values[high] * weight
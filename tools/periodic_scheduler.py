@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""Drift-free periodic senders for MAVLink streams.
+
+``PeriodicScheduler`` runs any number of ``PeriodicStream`` callbacks
+(heartbeat, ``SYSTEM_TIME``, vision position, ...) at fixed rates, on a
+background thread (``start``/``stop``), as an asyncio task (``run_async``),
+or from a caller's own event loop (``begin`` once, then ``run_pending``,
+which returns the next deadline to wait for).
+
+- Deadlines are absolute on a monotonic clock: send ``k`` of a stream is due
+  at ``start + k / rate_hz``, so lateness never accumulates into drift.
+- A stream that falls a whole period behind (e.g. the host stalled) skips
+  the missed sends and counts them in ``missed`` instead of bursting.
+- Each stream keeps jitter statistics: lateness of every send against its
+  deadline (mean / p50 / p99 / max) and the achieved rate.
+
+The scheduler itself needs nothing beyond the stdlib; ``heartbeat_stream``,
+``system_time_stream`` and ``vision_position_stream`` build the common
+MAVLink streams for a ``pymavlink`` connection.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Optional
+
+from percentiles import percentile
+
+try:
+    from pymavlink import mavutil
+except ImportError:  # pragma: no cover - optional dependency
+    mavutil = None
+
+JITTER_SAMPLES = 4096
+
+
+@dataclass
+class PeriodicStream:
+    name: str
+    rate_hz: float
+    send: Callable[[], None]
+
+
+class JitterStats:
+    """Lateness of each send against its deadline; percentiles over the last ``JITTER_SAMPLES`` sends."""
+
+    def __init__(self, rate_hz: float) -> None:
+        self.rate_hz = rate_hz
+        self.sent = 0
+        self.missed = 0
+        self.late_sum_s = 0.0
+        self.late_max_s = 0.0
+        self.first_sent_at: Optional[float] = None
+        self.last_sent_at: Optional[float] = None
+        self._samples: deque[float] = deque(maxlen=JITTER_SAMPLES)
+
+    def record(self, sent_at: float, lateness_s: float) -> None:
+        self.sent += 1
+        self.late_sum_s += lateness_s
+        self.late_max_s = max(self.late_max_s, lateness_s)
+        self._samples.append(lateness_s)
+        if self.first_sent_at is None:
+            self.first_sent_at = sent_at
+        self.last_sent_at = sent_at
+
+    def _percentile(self, fraction: float) -> float:
+        if not self._samples:
+            return 0.0
+        return percentile(sorted(self._samples), fraction)
+
+    def as_dict(self) -> dict[str, Any]:
+        achieved_hz = 0.0
+        if self.sent > 1 and self.first_sent_at is not None and self.last_sent_at is not None:
+            achieved_hz = (self.sent - 1) / max(self.last_sent_at - self.first_sent_at, 1e-9)
+        return {
+            "rate_hz": self.rate_hz,
+            "achieved_hz": round(achieved_hz, 3),
+            "sent": self.sent,
+            "missed": self.missed,
+            "late_mean_ms": round(1000.0 * self.late_sum_s / self.sent, 3) if self.sent else 0.0,
+            "late_p50_ms": round(1000.0 * self._percentile(0.50), 3),
+            "late_p99_ms": round(1000.0 * self._percentile(0.99), 3),
+            "late_max_ms": round(1000.0 * self.late_max_s, 3),
+        }
+
+
+class _Schedule:
+    def __init__(self, stream: PeriodicStream, start: float) -> None:
+        self.stream = stream
+        self.period = 1.0 / stream.rate_hz
+        self.start = start
+        self.index = 0
+        self.due = start
+        self.stats = JitterStats(stream.rate_hz)
+
+    def fire(self, now: float) -> None:
+        self.stream.send()
+        self.stats.record(now, now - self.due)
+        self.index += 1
+        self.due = self.start + self.index * self.period
+        if self.due <= now:
+            # Whole periods were lost: skip them rather than sending a burst.
+            behind = int((now - self.start) / self.period) + 1
+            self.stats.missed += behind - self.index
+            self.index = behind
+            self.due = self.start + self.index * self.period
+
+
+class PeriodicScheduler:
+    def __init__(self, streams: Iterable[PeriodicStream], *, monotonic: Callable[[], float] = time.monotonic) -> None:
+        self.streams = [stream for stream in streams if stream.rate_hz > 0]
+        self._monotonic = monotonic
+        self._schedules: list[_Schedule] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def begin(self) -> None:
+        """Anchor every stream's first deadline at now (``start``/``run_async`` call this)."""
+        now = self._monotonic()
+        self._schedules = [_Schedule(stream, now) for stream in self.streams]
+
+    def run_pending(self) -> Optional[float]:
+        """Send every stream that is due; return the next deadline (``None`` without streams)."""
+        now = self._monotonic()
+        for schedule in self._schedules:
+            if schedule.due <= now:
+                schedule.fire(now)
+        return min((schedule.due for schedule in self._schedules), default=None)
+
+    # -- background thread --------------------------------------------------
+
+    def start(self) -> "PeriodicScheduler":
+        self.begin()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._thread_loop, name="periodic-scheduler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def __enter__(self) -> "PeriodicScheduler":
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    def _thread_loop(self) -> None:
+        while not self._stop.is_set():
+            deadline = self.run_pending()
+            if deadline is None:
+                return
+            self._stop.wait(max(0.0, deadline - self._monotonic()))
+
+    # -- asyncio --------------------------------------------------------------
+
+    async def run_async(self) -> None:
+        """Run until cancelled, on the running event loop."""
+        self.begin()
+        while True:
+            deadline = self.run_pending()
+            if deadline is None:
+                return
+            await asyncio.sleep(max(0.0, deadline - self._monotonic()))
+
+    # -- reporting --------------------------------------------------------------
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        return {schedule.stream.name: schedule.stats.as_dict() for schedule in self._schedules}
+
+    def format_stats(self) -> str:
+        return "; ".join(
+            f"{name}: sent={entry['sent']} missed={entry['missed']} achieved={entry['achieved_hz']:.2f}Hz "
+            f"late p50={entry['late_p50_ms']:.2f}ms p99={entry['late_p99_ms']:.2f}ms max={entry['late_max_ms']:.2f}ms"
+            for name, entry in self.stats().items()
+        )
+
+
+def _require_pymavlink() -> None:
+    if mavutil is None:
+        raise RuntimeError("pymavlink is required for MAVLink streams")
+
+
+def heartbeat_stream(master: Any, rate_hz: float) -> PeriodicStream:
+    """GCS heartbeat."""
+    _require_pymavlink()
+    mavlink = mavutil.mavlink
+
+    def send() -> None:
+        master.mav.heartbeat_send(mavlink.MAV_TYPE_GCS, mavlink.MAV_AUTOPILOT_INVALID, 0, 0, mavlink.MAV_STATE_ACTIVE)
+
+    return PeriodicStream("heartbeat", rate_hz, send)
+
+
+def system_time_stream(master: Any, rate_hz: float) -> PeriodicStream:
+    """``SYSTEM_TIME`` with the host's Unix time and milliseconds since the stream was built."""
+    _require_pymavlink()
+    started = time.monotonic()
+
+    def send() -> None:
+        master.mav.system_time_send(int(time.time() * 1e6), int((time.monotonic() - started) * 1000) & 0xFFFFFFFF)
+
+    return PeriodicStream("system_time", rate_hz, send)
+
+
+def vision_position_stream(
+    master: Any, rate_hz: float, pose: Callable[[], tuple[float, float, float, float, float, float]]
+) -> PeriodicStream:
+    """``VISION_POSITION_ESTIMATE`` from ``pose() -> (x, y, z, roll, pitch, yaw)`` (local NED, m / rad)."""
+    _require_pymavlink()
+
+    def send() -> None:
+        master.mav.vision_position_estimate_send(int(time.time() * 1e6), *pose())
+
+    return PeriodicStream("vision_position", rate_hz, send)
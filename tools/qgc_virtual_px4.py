@@ -1,17 +1,59 @@
 #!/usr/bin/env python3
-"""Minimal PX4-like MAVLink stub to exercise QGC handshakes."""
+"""Minimal PX4-like MAVLink stub to exercise QGC handshakes.
+
+The stub waits on its socket with ``select`` and drains every pending message
+per wakeup, so a QGC burst (parameter list, command retries, ...) is answered
+immediately instead of one message per poll. Parameters come from a
+``ParameterTable``: the three built-in defaults, a PX4/QGC parameter dump
+(``--param-file``) or ``--synthetic-params N`` generated entries.
+``PARAM_REQUEST_READ`` answers just the requested entry (by index, or by name
+when the index is ``-1``), ``PARAM_SET`` updates and echoes it, and
+``PARAM_REQUEST_LIST`` streams the whole table paced to ``--link-kbps`` so a
+1000+ parameter load behaves like a real vehicle link. Each full list served
+is logged with its duration and throughput.
+
+Each vehicle also streams synthetic ATTITUDE, GLOBAL_POSITION_INT and
+SYS_STATUS telemetry at ``--attitude-rate`` / ``--position-rate`` /
+``--sys-status-rate``. ``--vehicles N`` runs a fleet: N stubs with
+consecutive sysids and bind ports in one process. ``VirtualFleet`` drives
+them all from one selector loop, servicing each vehicle only when one of
+its deadlines is due. At exit it reports each vehicle's achieved rate per
+stream and the loop's wakeup lateness and busy fraction, so a saturated
+stub shows up as ``missed`` periods and late wakeups rather than as a
+slow QGC. ``--report-json`` writes the same report to a file.
+
+The mission micro-protocol (plan upload, download and clear) is served by
+``virtual_mission.MissionServer`` with per-vehicle storage.
+``--mission-item-latency-ms`` delays each mission response, and
+``--mission-loss`` drops that fraction of mission messages in both
+directions. Every transfer is logged with its duration, items/s,
+re-requests and drops, and is included in the ``--report-json`` report, so
+1000+ waypoint plans can be benchmarked without a PX4 build.
+``tools/bench_virtual_px4.py mission`` drives it the way QGC does.
+"""
 
 from __future__ import annotations
 
 import argparse
+import heapq
+import json
 import logging
+import math
+import select
+import selectors
+import signal
 import sys
 import time
-from dataclasses import dataclass
-from typing import Tuple
+from collections import deque
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Iterable, Optional, Tuple
 
 from pymavlink import mavutil
 
+from periodic_scheduler import JitterStats, PeriodicScheduler, PeriodicStream
+from virtual_mission import MissionServer
+
 
 @dataclass(frozen=True)
 class Parameter:
@@ -28,14 +70,106 @@ PARAMETERS: Tuple[Parameter, ...] = (
 
 HEARTBEAT_INTERVAL = 0.5
 STATUS_INTERVAL = 2.5
+PARAM_ID_MAX_LEN = 16
+# Upper bound on messages handled per wakeup, so timers still fire under a flood.
+MAX_DRAIN_PER_WAKE = 512
+# Token-bucket burst allowance for the parameter stream, in seconds of link time.
+PARAM_STREAM_BURST_S = 0.02
+
+
+class ParameterTable:
+    """Ordered parameters with name -> index lookup (MAVLink parameter indices are positions)."""
+
+    def __init__(self, parameters: Iterable[Parameter]) -> None:
+        self._params = list(parameters)
+        self._index_by_name = {param.name: index for index, param in enumerate(self._params)}
+        if len(self._index_by_name) != len(self._params):
+            raise ValueError("duplicate parameter names")
+
+    def __len__(self) -> int:
+        return len(self._params)
+
+    def __getitem__(self, index: int) -> Parameter:
+        return self._params[index]
+
+    def lookup(self, name: str, index: int) -> Optional[int]:
+        """Index of the requested parameter: ``index`` when >= 0, else by ``name``; ``None`` if unknown."""
+        if index >= 0:
+            return index if index < len(self._params) else None
+        return self._index_by_name.get(name)
+
+    def set_value(self, name: str, value: float) -> Optional[int]:
+        index = self._index_by_name.get(name)
+        if index is not None:
+            self._params[index] = replace(self._params[index], value=value)
+        return index
+
+
+def _param_type_for(raw_value: str) -> int:
+    try:
+        int(raw_value)
+    except ValueError:
+        return mavutil.mavlink.MAV_PARAM_TYPE_REAL32
+    return mavutil.mavlink.MAV_PARAM_TYPE_INT32
+
+
+def load_parameter_file(path: Path) -> list[Parameter]:
+    """Parse a parameter dump.
+
+    Accepts QGC/PX4 ``.params`` lines (``vehicle component NAME value type``,
+    tab separated) and plain ``NAME value`` or ``NAME,value`` lines, whose type
+    is INT32 for integer literals and REAL32 otherwise. ``#`` starts a comment.
+    """
+    parameters = []
+    for line_number, line in enumerate(path.read_text(encoding="utf-8").splitlines(), start=1):
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        fields = line.replace(",", " ").split()
+        if len(fields) == 5:
+            _, _, name, raw_value, raw_type = fields
+            param_type = int(raw_type)
+        elif len(fields) == 2:
+            name, raw_value = fields
+            param_type = _param_type_for(raw_value)
+        else:
+            raise ValueError(f"{path}:{line_number}: expected 'NAME value' or 'vehicle component NAME value type'")
+        if len(name) > PARAM_ID_MAX_LEN:
+            raise ValueError(f"{path}:{line_number}: parameter name {name!r} longer than {PARAM_ID_MAX_LEN} characters")
+        parameters.append(Parameter(name, float(raw_value), param_type))
+    return parameters
+
+
+def synthetic_parameters(count: int) -> list[Parameter]:
+    """``count`` parameters: the built-in defaults followed by generated ``SYN_Pnnnnn`` entries."""
+    generated = (
+        Parameter(f"SYN_P{index:05d}", float(index), mavutil.mavlink.MAV_PARAM_TYPE_REAL32)
+        for index in range(max(0, count - len(PARAMETERS)))
+    )
+    return [*PARAMETERS[:count], *generated]
+
+
+def _param_id(raw: bytes | str) -> str:
+    if isinstance(raw, bytes):
+        raw = raw.decode("ascii", errors="replace")
+    return raw.rstrip("\x00")
+
+
+class _VehicleLog(logging.LoggerAdapter):
+    """Prefixes a fleet vehicle's log lines with its sysid."""
+
+    def process(self, msg: Any, kwargs: Any) -> tuple[Any, Any]:
+        return f"[sysid {self.extra['sysid']}] {msg}", kwargs
 
 
 class VirtualPX4:
-    def __init__(self, args: argparse.Namespace) -> None:
+    def __init__(self, args: argparse.Namespace, index: int = 0) -> None:
         self._args = args
+        self.sysid = args.sysid + index
+        self.bind_port = args.bind_port + index
         self._link = mavutil.mavlink_connection(
-            f"udp:{args.bind_host}:{args.bind_port}",
-            source_system=args.sysid,
+            f"udp:{args.bind_host}:{self.bind_port}",
+            source_system=self.sysid,
             source_component=args.compid,
         )
         # Prime the UDP server socket with QGC as a known client so heartbeats
@@ -45,34 +179,97 @@ class VirtualPX4:
         self._link.clients_last_alive[target] = time.time()
         self._gcs_heartbeat_seen = False
         self._param_request_seen = False
-        self._logger = logging.getLogger("virtual_px4")
-
-    def run(self) -> None:
-        end_time = time.monotonic() + max(self._args.duration, HEARTBEAT_INTERVAL)
-        next_heartbeat = time.monotonic()
-        next_status = time.monotonic() + STATUS_INTERVAL
-
-        self._logger.info(
-            "virtual PX4 listening for QGC (sysid=%s, compid=%s)",
-            self._args.sysid,
-            self._args.compid,
+        self._logger: logging.Logger | _VehicleLog = logging.getLogger("virtual_px4")
+        if args.vehicles > 1:
+            self._logger = _VehicleLog(self._logger, {"sysid": self.sysid})
+        self._boot = time.monotonic()
+        self._params = build_parameter_table(args)
+        # Parameter stream state: indices still to send, token bucket in bytes.
+        self._link_bytes_per_s = max(0.0, args.link_kbps) * 1000.0 / 8.0
+        self._param_queue: deque[int] = deque()
+        self._param_tokens = 0.0
+        self._param_refilled_at = 0.0
+        self._param_list_started: Optional[float] = None
+        self._param_list_bytes = 0
+        self.messages_handled = 0
+        self._missions = MissionServer(
+            self._link.mav,
+            item_latency_s=args.mission_item_latency_ms / 1000.0,
+            loss=args.mission_loss,
+            seed=args.mission_seed + index,
+            logger=self._logger,
+        )
+        self._stopped = False
+        self._scheduler = PeriodicScheduler(
+            [
+                PeriodicStream("heartbeat", min(max(args.rate, 0.1), 1.0 / HEARTBEAT_INTERVAL), self._send_heartbeat),
+                PeriodicStream("status", 1.0 / STATUS_INTERVAL, self._send_status),
+                PeriodicStream("attitude", args.attitude_rate, self._send_attitude),
+                PeriodicStream("global_position_int", args.position_rate, self._send_global_position),
+                PeriodicStream("sys_status", args.sys_status_rate, self._send_sys_status),
+            ]
         )
 
-        while time.monotonic() < end_time:
+    def run(self) -> None:
+        started = time.monotonic()
+        end_time = started + max(self._args.duration, HEARTBEAT_INTERVAL)
+        self.begin()
+        while not self._stopped:
             now = time.monotonic()
+            if now >= end_time:
+                break
+            deadline = min(self.service(now), end_time)
+            self._wait_readable(deadline - time.monotonic())
+            self.on_readable()
+
+        if self._args.report_json:
+            report = json.dumps(self.report(time.monotonic() - started), indent=2)
+            Path(self._args.report_json).write_text(report + "\n", encoding="utf-8")
+        self._validate()
 
-            if now >= next_heartbeat:
-                self._send_heartbeat()
-                next_heartbeat = now + max(1.0 / max(self._args.rate, 0.1), HEARTBEAT_INTERVAL)
-
-            if now >= next_status:
-                self._send_status()
-                next_status = now + STATUS_INTERVAL
+    def stop(self) -> None:
+        """End ``run`` at its next wakeup (used for SIGTERM)."""
+        self._stopped = True
 
-            self._poll_messages()
-            time.sleep(0.05)
+    # -- loop hooks: ``run`` and ``VirtualFleet`` drive a vehicle through these --
 
-        self._validate()
+    def begin(self) -> None:
+        self._logger.info(
+            "virtual PX4 listening for QGC (sysid=%s, compid=%s, port=%s, %d parameters)",
+            self.sysid,
+            self._args.compid,
+            self.bind_port,
+            len(self._params),
+        )
+        self._boot = time.monotonic()
+        self._scheduler.begin()
+
+    def service(self, now: float) -> float:
+        """Send whatever is due at ``now``; returns this vehicle's next deadline."""
+        deadline = self._scheduler.run_pending() or math.inf
+        for ready in (self._stream_params(now), self._missions.service(now)):
+            if ready is not None:
+                deadline = min(deadline, ready)
+        return deadline
+
+    def fileno(self) -> int:
+        return self._link.fd
+
+    def on_readable(self) -> None:
+        self._poll_messages()
+
+    def report(self, elapsed_s: float) -> dict[str, object]:
+        streams = self._scheduler.stats()
+        sent = sum(entry["sent"] for entry in streams.values())
+        return {
+            "sysid": self.sysid,
+            "bind_port": self.bind_port,
+            "tx_msgs_per_s": round(sent / max(elapsed_s, 1e-9), 2),
+            "rx_messages": self.messages_handled,
+            "missed_periods": sum(entry["missed"] for entry in streams.values()),
+            "streams": streams,
+            "missions": self._missions.stats(),
+        }
 
     def close(self) -> None:
         self._link.close()
@@ -92,6 +289,34 @@ class VirtualPX4:
             b"simulated PX4 ready",
         )
 
+    def _boot_ms(self) -> int:
+        return int((time.monotonic() - self._boot) * 1000) & 0xFFFFFFFF
+
+    def _send_attitude(self) -> None:
+        t = time.monotonic() - self._boot
+        self._link.mav.attitude_send(self._boot_ms(), 0.05 * math.sin(t), 0.05 * math.cos(t), (0.1 * t) % (2 * math.pi) - math.pi, 0.0, 0.0, 0.1)
+
+    def _send_global_position(self) -> None:
+        # Each vehicle circles its own point, 20 m apart per sysid.
+        t = time.monotonic() - self._boot
+        north_m = 10.0 * math.cos(0.1 * t) + 20.0 * self.sysid
+        east_m = 10.0 * math.sin(0.1 * t)
+        self._link.mav.global_position_int_send(
+            self._boot_ms(),
+            int((47.397742 + north_m / 111_320.0) * 1e7),
+            int((8.545594 + east_m / 75_500.0) * 1e7),
+            (488 + 10) * 1000,
+            10_000,
+            int(-100 * math.sin(0.1 * t)),
+            int(100 * math.cos(0.1 * t)),
+            0,
+            int(math.degrees(0.1 * t) * 100) % 36000,
+        )
+
+    def _send_sys_status(self) -> None:
+        sensors = mavutil.mavlink.MAV_SYS_STATUS_SENSOR_3D_GYRO | mavutil.mavlink.MAV_SYS_STATUS_SENSOR_GPS
+        self._link.mav.sys_status_send(sensors, sensors, sensors, 250, 16_200, 1_000, 87, 0, 0, 0, 0, 0, 0)
+
     def _send_autopilot_version(self) -> None:
         version = mavutil.mavlink.mavlink_version_to_int(1, 14, 0)
         self._link.mav.autopilot_version_send(
@@ -106,37 +331,95 @@ class VirtualPX4:
             bytes(8),
         )
 
-    def _send_params(self) -> None:
-        total = len(PARAMETERS)
-        for index, param in enumerate(PARAMETERS):
-            name_bytes = param.name.encode("ascii")
-            self._link.mav.param_value_send(
-                name_bytes,
-                float(param.value),
-                param.param_type,
-                total,
-                index,
+    def _send_param(self, index: int) -> int:
+        """Send PARAM_VALUE for ``index``; returns the bytes put on the wire."""
+        param = self._params[index]
+        message = self._link.mav.param_value_encode(
+            param.name.encode("ascii"),
+            float(param.value),
+            param.param_type,
+            len(self._params),
+            index,
+        )
+        self._link.mav.send(message)
+        return len(message.get_msgbuf())
+
+    def _start_param_list(self) -> None:
+        self._param_queue = deque(range(len(self._params)))
+        self._param_list_started = time.monotonic()
+        self._param_list_bytes = 0
+        self._param_refilled_at = self._param_list_started
+        self._param_tokens = self._link_bytes_per_s * PARAM_STREAM_BURST_S
+
+    def _stream_params(self, now: float) -> Optional[float]:
+        """Send queued parameters the link budget allows; returns when the next one may go (``None`` if idle)."""
+        if not self._param_queue:
+            return None
+        if self._link_bytes_per_s > 0:
+            burst = max(self._link_bytes_per_s * PARAM_STREAM_BURST_S, 64.0)
+            self._param_tokens = min(burst, self._param_tokens + (now - self._param_refilled_at) * self._link_bytes_per_s)
+            self._param_refilled_at = now
+        while self._param_queue and (self._link_bytes_per_s <= 0 or self._param_tokens > 0):
+            sent = self._send_param(self._param_queue.popleft())
+            self._param_list_bytes += sent
+            self._param_tokens -= sent
+        if self._param_queue:
+            return now + -self._param_tokens / self._link_bytes_per_s
+        if self._param_list_started is not None:
+            elapsed = max(time.monotonic() - self._param_list_started, 1e-9)
+            self._logger.info(
+                "served parameter list: %d params, %d bytes in %.3fs (%.0f params/s, %.1f kB/s)",
+                len(self._params),
+                self._param_list_bytes,
+                elapsed,
+                len(self._params) / elapsed,
+                self._param_list_bytes / elapsed / 1000.0,
             )
+            self._param_list_started = None
+        return None
 
-    def _poll_messages(self) -> None:
-        message = self._link.recv_match(blocking=False, timeout=0)
-        if not message:
+    def _wait_readable(self, timeout: float) -> None:
+        if timeout <= 0:
             return
+        select.select([self._link.fd], [], [], timeout)
 
+    def _poll_messages(self) -> None:
+        for _ in range(MAX_DRAIN_PER_WAKE):
+            message = self._link.recv_msg()
+            if message is None:
+                return
+            self._handle_message(message)
+
+    def _handle_message(self, message: Any) -> None:
         msg_type = message.get_type()
+        if msg_type == "BAD_DATA":
+            return
+        self.messages_handled += 1
         self._logger.debug("received %s", msg_type)
+        if self._missions.handle(message):
+            return
 
         if msg_type == "HEARTBEAT" and getattr(message, "type", None) == mavutil.mavlink.MAV_TYPE_GCS:
             self._gcs_heartbeat_seen = True
         elif msg_type == "PARAM_REQUEST_LIST":
             self._param_request_seen = True
-            self._logger.info("QGC requested full parameter list")
-            self._send_params()
+            self._logger.info("QGC requested full parameter list (%d params)", len(self._params))
+            self._start_param_list()
         elif msg_type == "PARAM_REQUEST_READ":
             self._param_request_seen = True
-            requested = getattr(message, "param_id", b"")
-            self._logger.info("QGC requested parameter %s", requested)
-            self._send_params()
+            name = _param_id(message.param_id)
+            index = self._params.lookup(name, message.param_index)
+            if index is None:
+                self._logger.debug("QGC requested unknown parameter %r (index %d)", name, message.param_index)
+            else:
+                self._logger.debug("QGC requested parameter %s", self._params[index].name)
+                self._send_param(index)
+        elif msg_type == "PARAM_SET":
+            name = _param_id(message.param_id)
+            index = self._params.set_value(name, message.param_value)
+            if index is not None:
+                self._logger.info("QGC set %s = %s", name, message.param_value)
+                self._send_param(index)
         elif msg_type == "COMMAND_LONG" and getattr(message, "command", None) == mavutil.mavlink.MAV_CMD_REQUEST_AUTOPILOT_CAPABILITIES:
             self._logger.info("QGC requested autopilot capabilities")
             self._send_autopilot_version()
@@ -151,6 +434,130 @@ class VirtualPX4:
             raise RuntimeError("handshake incomplete: " + ", ".join(missing))
 
 
+class VirtualFleet:
+    """``args.vehicles`` VirtualPX4 instances multiplexed over one selector loop."""
+
+    def __init__(self, args: argparse.Namespace) -> None:
+        self._args = args
+        self.vehicles: list[VirtualPX4] = []
+        try:
+            for index in range(args.vehicles):
+                self.vehicles.append(VirtualPX4(args, index))
+        except Exception:
+            self.close()
+            raise
+        self.wake_stats = JitterStats(0.0)
+        self.busy_s = 0.0
+        self.elapsed_s = 0.0
+        self._stopped = False
+        self._logger = logging.getLogger("virtual_px4")
+
+    def run(self) -> None:
+        selector = selectors.DefaultSelector()
+        for index, vehicle in enumerate(self.vehicles):
+            selector.register(vehicle.fileno(), selectors.EVENT_READ, index)
+        started = time.monotonic()
+        end_time = started + max(self._args.duration, HEARTBEAT_INTERVAL)
+        # Heap of (deadline, vehicle index); next_due drops superseded entries.
+        next_due: list[float] = []
+        heap: list[tuple[float, int]] = []
+        for index, vehicle in enumerate(self.vehicles):
+            vehicle.begin()
+            next_due.append(vehicle.service(time.monotonic()))
+            heap.append((next_due[index], index))
+        heapq.heapify(heap)
+        try:
+            while True:
+                work_started = time.monotonic()
+                if work_started >= end_time or self._stopped:
+                    break
+                while heap and heap[0][0] <= work_started:
+                    due, index = heapq.heappop(heap)
+                    if due != next_due[index]:
+                        continue
+                    next_due[index] = self.vehicles[index].service(work_started)
+                    heapq.heappush(heap, (next_due[index], index))
+                deadline = min(heap[0][0] if heap else end_time, end_time)
+                woke = time.monotonic()
+                self.busy_s += woke - work_started
+                events = selector.select(max(0.0, deadline - woke))
+                woke = time.monotonic()
+                if not events and deadline < end_time:
+                    self.wake_stats.record(woke, max(0.0, woke - deadline))
+                for key, _ in events:
+                    index = key.data
+                    vehicle = self.vehicles[index]
+                    vehicle.on_readable()
+                    # A request (e.g. PARAM_REQUEST_LIST) may have pulled its next deadline in.
+                    next_due[index] = vehicle.service(time.monotonic())
+                    heapq.heappush(heap, (next_due[index], index))
+                self.busy_s += time.monotonic() - woke
+        finally:
+            selector.close()
+            self.elapsed_s = time.monotonic() - started
+        self._log_report()
+        failures = []
+        for vehicle in self.vehicles:
+            try:
+                vehicle._validate()
+            except RuntimeError as exc:
+                failures.append(f"sysid {vehicle.sysid}: {exc}")
+        if failures:
+            raise RuntimeError("; ".join(failures))
+
+    def stop(self) -> None:
+        self._stopped = True
+
+    def report(self) -> dict[str, object]:
+        vehicles = [vehicle.report(self.elapsed_s) for vehicle in self.vehicles]
+        return {
+            "vehicles": len(vehicles),
+            "elapsed_s": round(self.elapsed_s, 3),
+            "tx_msgs_per_s": round(sum(entry["tx_msgs_per_s"] for entry in vehicles), 1),
+            "missed_periods": sum(entry["missed_periods"] for entry in vehicles),
+            "loop": {
+                "busy_fraction": round(self.busy_s / max(self.elapsed_s, 1e-9), 4),
+                "timer_wakeups": self.wake_stats.sent,
+                "wake_late_p50_ms": self.wake_stats.as_dict()["late_p50_ms"],
+                "wake_late_p99_ms": self.wake_stats.as_dict()["late_p99_ms"],
+                "wake_late_max_ms": self.wake_stats.as_dict()["late_max_ms"],
+            },
+            "per_vehicle": vehicles,
+        }
+
+    def _log_report(self) -> None:
+        report = self.report()
+        loop = report["loop"]
+        self._logger.info(
+            "fleet: %d vehicles, %.1f msgs/s total, %d missed periods; loop busy %.1f%%, wake late p99 %.2f ms max %.2f ms",
+            report["vehicles"],
+            report["tx_msgs_per_s"],
+            report["missed_periods"],
+            100.0 * loop["busy_fraction"],
+            loop["wake_late_p99_ms"],
+            loop["wake_late_max_ms"],
+        )
+        for entry in report["per_vehicle"]:
+            rates = ", ".join(
+                f"{name}={stream['achieved_hz']:.1f}/{stream['rate_hz']:g}Hz" for name, stream in entry["streams"].items()
+            )
+            self._logger.info("sysid %s: %.1f msgs/s (%s)", entry["sysid"], entry["tx_msgs_per_s"], rates)
+        if self._args.report_json:
+            Path(self._args.report_json).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+    def close(self) -> None:
+        for vehicle in self.vehicles:
+            vehicle.close()
+
+
+def build_parameter_table(args: argparse.Namespace) -> ParameterTable:
+    if args.param_file:
+        return ParameterTable(load_parameter_file(Path(args.param_file)))
+    if args.synthetic_params:
+        return ParameterTable(synthetic_parameters(args.synthetic_params))
+    return ParameterTable(PARAMETERS)
+
+
 def parse_args(argv: list[str]) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description=__doc__)
     parser.add_argument("--target-host", default="127.0.0.1", help="QGC UDP host")
@@ -161,6 +568,42 @@ def parse_args(argv: list[str]) -> argparse.Namespace:
     parser.add_argument("--compid", type=int, default=1, help="autopilot component id")
     parser.add_argument("--rate", type=float, default=2.0, help="heartbeat rate in Hz")
     parser.add_argument("--duration", type=float, default=25.0, help="runtime duration in seconds")
+    parser.add_argument("--param-file", help="PX4/QGC parameter dump to serve instead of the built-in defaults")
+    parser.add_argument(
+        "--synthetic-params",
+        type=int,
+        default=0,
+        help="serve this many generated parameters (ignored with --param-file)",
+    )
+    parser.add_argument(
+        "--link-kbps",
+        type=float,
+        default=1000.0,
+        help="bandwidth budget for streaming the parameter list in kbit/s (0: unpaced)",
+    )
+    parser.add_argument("--attitude-rate", type=float, default=20.0, help="ATTITUDE rate in Hz (0 disables)")
+    parser.add_argument("--position-rate", type=float, default=5.0, help="GLOBAL_POSITION_INT rate in Hz (0 disables)")
+    parser.add_argument("--sys-status-rate", type=float, default=1.0, help="SYS_STATUS rate in Hz (0 disables)")
+    parser.add_argument(
+        "--vehicles",
+        type=int,
+        default=1,
+        help="emulate this many vehicles (sysid and bind port increase by one per vehicle)",
+    )
+    parser.add_argument(
+        "--mission-item-latency-ms",
+        type=float,
+        default=0.0,
+        help="delay every mission protocol response by this long",
+    )
+    parser.add_argument(
+        "--mission-loss",
+        type=float,
+        default=0.0,
+        help="fraction of mission protocol messages to drop, inbound and outbound",
+    )
+    parser.add_argument("--mission-seed", type=int, default=0, help="random seed for --mission-loss")
+    parser.add_argument("--report-json", help="write the stream rate, loop and mission transfer report to this file at exit")
     parser.add_argument("--log-file", help="optional path to append log output")
     parser.add_argument(
         "--log-level",
@@ -177,7 +620,16 @@ def parse_args(argv: list[str]) -> argparse.Namespace:
         action="store_true",
         help="do not fail if QGC heartbeat is not observed",
     )
-    return parser.parse_args(argv)
+    args = parser.parse_args(argv)
+    if not 0.0 <= args.mission_loss < 1.0:
+        raise SystemExit("--mission-loss must be in [0, 1)")
+    if args.vehicles < 1:
+        raise SystemExit("--vehicles must be at least 1")
+    if args.sysid + args.vehicles - 1 > 255:
+        raise SystemExit(f"--vehicles {args.vehicles} from --sysid {args.sysid} runs past sysid 255")
+    if args.bind_port <= args.target_port < args.bind_port + args.vehicles:
+        raise SystemExit(f"bind ports {args.bind_port}..{args.bind_port + args.vehicles - 1} include the QGC port {args.target_port}")
+    return args
 
 
 def configure_logging(path: str | None, level: str) -> None:
@@ -205,7 +657,9 @@ def main(argv: list[str] | None = None) -> int:
     args = parse_args(list(argv or sys.argv[1:]))
     configure_logging(args.log_file, args.log_level)
 
-    stub = VirtualPX4(args)
+    stub = VirtualFleet(args) if args.vehicles > 1 else VirtualPX4(args)
+    # Harnesses stop the stub with SIGTERM; finish the loop so the report is still written.
+    signal.signal(signal.SIGTERM, lambda signum, frame: stub.stop())
     try:
         stub.run()
     except Exception as exc:  # noqa: BLE001
@@ -214,7 +668,7 @@ def main(argv: list[str] | None = None) -> int:
     finally:
         stub.close()
 
-    logging.getLogger("virtual_px4").info("handshake complete")
+    logging.getLogger("virtual_px4").info("handshake complete" if args.vehicles == 1 else "handshake complete on all vehicles")
     return 0
 
 
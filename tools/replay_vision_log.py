@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""Replay recorded adapter frame JSONL through the tracker and guidance on a virtual clock.
+
+Frames are released at ``--speed`` times their recorded rate (``0.5``,
+``1``, ``10x`` ... or ``max``) and chained in-process through the tracker
+and guidance advisory logic. Guidance ``now_ts`` comes from the replay clock
+rather than ``time.time()``, so latency and stale-frame gating are measured
+on the recorded timeline: host processing delay counts scaled by ``--speed``,
+and recorded timestamps are never compared with today's wall clock.
+
+Outputs (in ``--artifact-dir``) use the same names and contracts as the live
+pipeline, plus ``replay_summary.json``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import shlex
+import sys
+import time
+from pathlib import Path
+from typing import Any, Iterator
+
+from guidance_advisory import _advisory_from_track
+from guidance_advisory import parse_args as parse_guidance_args
+from intercept_adapter_contract import decode_tracker_frame, get_codec
+from intercept_tracker import _iter_tracking_outputs, build_tracker
+from intercept_tracker import parse_args as parse_tracker_args
+from jsonl_writer import BufferedJsonlWriter
+from percentiles import percentile
+from track_binary import open_record_writer
+from vision_clock import ReplayClock, parse_speed
+from vision_diagnostics import Diagnostics, add_diagnostics_arguments, build_diagnostics
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input-jsonl", type=Path, required=True, help="Recorded adapter-format frame JSONL.")
+    parser.add_argument(
+        "--speed",
+        default="max",
+        help="Replay time scale relative to the recording: e.g. 0.5, 1, 10x, or max (no pacing).",
+    )
+    parser.add_argument("--artifact-dir", type=Path, default=Path("artifacts/replay"), help="Output directory.")
+    parser.add_argument(
+        "--tracks-format",
+        choices=["jsonl", "bin"],
+        default="jsonl",
+        help="Encoding for the track/event outputs (see track_binary.py).",
+    )
+    parser.add_argument(
+        "--tracker-args",
+        default="",
+        help='Extra intercept_tracker.py options, e.g. "--lock-threshold 0.7 --multi-target".',
+    )
+    parser.add_argument(
+        "--guidance-args",
+        default="",
+        help='Extra guidance_advisory.py options, e.g. "--stale-after-s 0.3".',
+    )
+    parser.add_argument("--max-frames", type=int, default=None, help="Stop after this many replayed frames.")
+    add_diagnostics_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def _iter_recorded_frames(path: Path, diagnostics: Diagnostics) -> Iterator[dict[str, Any]]:
+    codec = get_codec()
+    with path.open("r", encoding="utf-8") as handle:
+        for line_number, raw_line in enumerate(handle, start=1):
+            line = raw_line.strip()
+            if not line:
+                continue
+            try:
+                frame = decode_tracker_frame(
+                    line, codec=codec, drops=diagnostics, source_name=str(path), line_number=line_number
+                )
+            except TypeError as exc:
+                raise SystemExit(f"Expected object JSON in {path} line {line_number}") from exc
+            except ValueError as exc:
+                raise SystemExit(f"Invalid JSON in {path} line {line_number}: {exc}") from exc
+            if frame is not None:
+                yield frame
+
+
+def _paced_frames(frames: Iterator[dict[str, Any]], clock: ReplayClock, max_frames: int | None) -> Iterator[dict[str, Any]]:
+    for count, frame in enumerate(frames):
+        if max_frames is not None and count >= max_frames:
+            return
+        clock.wait_until(float(frame["timestamp"]))
+        yield frame
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv or sys.argv[1:])
+    try:
+        speed = parse_speed(args.speed)
+    except ValueError as error:
+        raise SystemExit(str(error)) from error
+    if not args.input_jsonl.exists():
+        raise SystemExit(f"Missing recorded frame log: {args.input_jsonl}")
+    if args.max_frames is not None and args.max_frames <= 0:
+        raise SystemExit("--max-frames must be > 0 when provided")
+
+    tracker = build_tracker(parse_tracker_args(["--input-stdin-jsonl", *shlex.split(args.tracker_args)]))
+    guidance_args = parse_guidance_args(shlex.split(args.guidance_args))
+    clock = ReplayClock(speed)
+    diagnostics = build_diagnostics(args, "replay")
+
+    artifact_dir = args.artifact_dir
+    suffix = ".bin" if args.tracks_format == "bin" else ".jsonl"
+    tracks_path = artifact_dir / f"intercept_tracker_tracks{suffix}"
+    events_path = artifact_dir / f"intercept_tracker_events{suffix}"
+    advisory_path = artifact_dir / "guidance_advisory.jsonl"
+    summary_path = artifact_dir / "replay_summary.json"
+    diagnostics_path = args.diagnostics_json or artifact_dir / "vision_diagnostics.json"
+    options = {"flush_rows": 256, "truncate": True}
+    tracks_writer = open_record_writer(tracks_path, args.tracks_format, **options)
+    events_writer = open_record_writer(events_path, args.tracks_format, **options)
+    advisory_writer = BufferedJsonlWriter(advisory_path, **options)
+
+    frames = 0
+    latencies: list[float] = []
+    gating: dict[str, int] = {}
+    wall_started = time.monotonic()
+    try:
+        paced = _paced_frames(_iter_recorded_frames(args.input_jsonl, diagnostics), clock, args.max_frames)
+        for outputs, events in _iter_tracking_outputs(tracker, paced, diagnostics):
+            frames += 1
+            for output in outputs:
+                tracks_writer.write(output)
+                advisory = _advisory_from_track(output, guidance_args, now_ts=clock.now())
+                advisory_writer.write(advisory)
+                if advisory["latency_s"] is not None:
+                    latencies.append(advisory["latency_s"])
+                gating[advisory["gating_reason"]] = gating.get(advisory["gating_reason"], 0) + 1
+            for event in events:
+                events_writer.write(event)
+    except KeyboardInterrupt:
+        print("[replay] interrupted, writing partial results", file=sys.stderr)
+    finally:
+        tracks_writer.close()
+        events_writer.close()
+        advisory_writer.close()
+        diagnostics.close(diagnostics_path)
+
+    wall_s = time.monotonic() - wall_started
+    virtual_s = clock.elapsed_virtual_s()
+    latencies.sort()
+    summary = {
+        "input": str(args.input_jsonl),
+        "speed": "max" if speed is None else speed,
+        "frames": frames,
+        "track_rows": tracks_writer.rows_written,
+        "advisory_rows": advisory_writer.rows_written,
+        "virtual_duration_s": round(virtual_s, 6),
+        "wall_duration_s": round(wall_s, 6),
+        "effective_speedup": None if wall_s <= 0 else round(virtual_s / wall_s, 3),
+        "latency_p50_s": percentile(latencies, 0.50),
+        "latency_p95_s": percentile(latencies, 0.95),
+        "latency_max_s": latencies[-1] if latencies else None,
+        "gating_reasons": dict(sorted(gating.items())),
+        "rejected_records": diagnostics.total,
+    }
+    summary_path.write_text(json.dumps(summary, indent=2) + "\n", encoding="utf-8")
+
+    print(
+        f"[replay] frames={frames} virtual={virtual_s:.3f}s wall={wall_s:.3f}s "
+        f"speedup={summary['effective_speedup']} latency_p95_s={summary['latency_p95_s']}"
+    )
+    print(f"[replay] gating: {summary['gating_reasons']}")
+    print(f"[replay] outputs: {tracks_path}, {events_path}, {advisory_path}, {summary_path}, {diagnostics_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""Run one MAVLink scenario against several PX4 SITL instances at once.
+
+Each vehicle is a PX4 SITL instance ``i`` (``px4 -i i``), which uses
+``MAV_SYS_ID = i + 1`` and sends its API/offboard MAVLink stream to UDP port
+``14540 + i``. The orchestrator:
+
+- allocates instance ids, sysids and link ports for ``--vehicles`` vehicles,
+  skipping instances whose port would collide with a reserved port (the GCS
+  port ``14550`` by default, which instance 10 would otherwise land on)
+- optionally launches the PX4 instances (``--launch-px4``; the first one
+  starts Gazebo, the others join it standalone)
+- runs the scenario's ``fly(runtime, args)`` coroutine for every vehicle in
+  one asyncio event loop (one ``ScenarioRuntime`` per link), all started
+  together, and checks each link is answered by the expected sysid
+- writes every vehicle's summary to ``<artifact-dir>/vehicle_<i>/<scenario>_summary.json``
+  (as ``SIMTEST_SCENARIO_RESULT`` would) and aggregates them with a
+  per-vehicle, per-phase timing breakdown into ``multi_vehicle_report.json``
+
+Arguments not recognised here are passed to the scenario's ``parse_args``,
+e.g.::
+
+    python3 tools/run_multi_vehicle.py --vehicles 8 --launch-px4 --altitude 5 --hold 2
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+TOOLS_DIR = Path(__file__).resolve().parent
+REPO_ROOT = TOOLS_DIR.parent
+SCENARIOS_DIR = REPO_ROOT / "tests" / "scenarios"
+for path in (TOOLS_DIR, SCENARIOS_DIR):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+PX4_DIR = REPO_ROOT / "px4"
+PX4_BINARY = PX4_DIR / "build" / "px4_sitl_default" / "bin" / "px4"
+REPORT_NAME = "multi_vehicle_report.json"
+
+
+@dataclass(frozen=True)
+class VehicleSlot:
+    instance: int
+    sysid: int
+    port: int
+
+    @property
+    def name(self) -> str:
+        return f"vehicle_{self.instance}"
+
+
+def allocate_vehicles(
+    count: int, *, base_instance: int = 0, port_base: int = 14540, sysid_base: int = 1, reserved_ports: frozenset[int] = frozenset()
+) -> list[VehicleSlot]:
+    """PX4 SITL ids for ``count`` vehicles, skipping instances whose link port is reserved."""
+    slots: list[VehicleSlot] = []
+    instance = base_instance
+    while len(slots) < count:
+        port = port_base + instance
+        sysid = sysid_base + instance
+        if sysid > 254:
+            raise SystemExit(f"cannot allocate {count} vehicles: MAVLink sysids run out at instance {instance}")
+        if port not in reserved_ports:
+            slots.append(VehicleSlot(instance, sysid, port))
+        instance += 1
+    return slots
+
+
+def parse_args(argv: list[str]) -> tuple[argparse.Namespace, list[str]]:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vehicles", type=int, default=4, help="Number of vehicles (PX4 SITL instances)")
+    parser.add_argument("--scenario", default="takeoff_land", help="Scenario module under tests/scenarios/ exposing fly()")
+    parser.add_argument("--base-instance", type=int, default=0, help="First PX4 SITL instance id")
+    parser.add_argument("--port-base", type=int, default=14540, help="Link port of instance 0 (PX4 API link: 14540 + i)")
+    parser.add_argument("--sysid-base", type=int, default=1, help="MAV_SYS_ID of instance 0 (PX4: i + 1)")
+    parser.add_argument(
+        "--reserved-ports",
+        default="14550",
+        help="Comma-separated UDP ports never allocated to a vehicle link (default: the GCS port)",
+    )
+    parser.add_argument("--link-host", default="127.0.0.1", help="Address the vehicle links are bound on")
+    parser.add_argument("--no-sysid-check", action="store_true", help="Accept a link answered by an unexpected sysid")
+    parser.add_argument("--artifact-dir", type=Path, default=Path("artifacts/multi_vehicle"), help="Per-vehicle summaries and report")
+    parser.add_argument("--launch-px4", action="store_true", help="Start the PX4 SITL instances (headless Gazebo)")
+    parser.add_argument("--px4-model", default=os.getenv("PX4_SIM_MODEL", "x500"), help="PX4 SITL model when launching")
+    parser.add_argument("--spacing-m", type=float, default=2.0, help="Spawn spacing between launched vehicles")
+    return parser.parse_known_args(argv)
+
+
+def _load_scenario(name: str) -> Any:
+    try:
+        module = importlib.import_module(name)
+    except ModuleNotFoundError as error:
+        raise SystemExit(f"scenario {name!r} not found under {SCENARIOS_DIR}") from error
+    if not hasattr(module, "fly") or not hasattr(module, "parse_args"):
+        raise SystemExit(f"scenario {name!r} has no fly(runtime, args) coroutine; it cannot run multi-vehicle")
+    return module
+
+
+def _launch_px4(slots: list[VehicleSlot], args: argparse.Namespace) -> list[subprocess.Popen[bytes]]:
+    if not PX4_BINARY.exists():
+        raise SystemExit(f"PX4 SITL build not found at {PX4_BINARY}; run tools/simtest build first")
+    model = args.px4_model if args.px4_model.startswith("gz_") else f"gz_{args.px4_model}"
+    processes = []
+    for index, slot in enumerate(slots):
+        env = dict(os.environ, HEADLESS="1", PX4_SIM_MODEL=model, PX4_GZ_MODEL_POSE=f"0,{index * args.spacing_m:g}")
+        if index > 0:
+            env["PX4_GZ_STANDALONE"] = "1"
+        log_path = args.artifact_dir / slot.name / "px4.log"
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        with log_path.open("wb") as log:
+            processes.append(
+                subprocess.Popen([str(PX4_BINARY), "-i", str(slot.instance)], cwd=PX4_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+            )
+        print(f"[multi] launched PX4 instance {slot.instance} (sysid {slot.sysid}, link {slot.port}) log={log_path}")
+    return processes
+
+
+def _stop_px4(processes: list[subprocess.Popen[bytes]]) -> None:
+    for process in processes:
+        if process.poll() is None:
+            process.terminate()
+    for process in processes:
+        try:
+            process.wait(timeout=10.0)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+async def _run_vehicle(
+    scenario: Any, slot: VehicleSlot, scenario_args: argparse.Namespace, args: argparse.Namespace, fleet_started: float
+) -> dict[str, Any]:
+    from mavlink_runtime import ScenarioRuntime, connect
+
+    def log(message: str) -> None:
+        print(f"[{slot.name} sysid={slot.sysid}] {message}", flush=True)
+
+    link = f"udp:{args.link_host}:{slot.port}"
+    result: dict[str, Any] = {**asdict(slot), "link": link, "started_at_s": round(time.monotonic() - fleet_started, 3)}
+    master = None
+    try:
+        # Inside the try: a port that is already bound becomes this vehicle's failure, not the fleet's.
+        connect_started = time.monotonic()
+        master = connect(link, sysid=scenario_args.sysid, compid=scenario_args.compid)
+        async with ScenarioRuntime(master, heartbeat_rate=scenario_args.heartbeat_rate) as runtime:
+            system_id, _ = await runtime.wait_heartbeat(timeout=min(30.0, scenario_args.timeout))
+            connect_s = time.monotonic() - connect_started
+            if system_id != slot.sysid and not args.no_sysid_check:
+                raise RuntimeError(f"link {link} is answered by sysid {system_id}, expected {slot.sysid}")
+            summary = {"status": "success", **await scenario.fly(runtime, scenario_args, log)}
+            # The scenario's own connect phase sees the heartbeat already cached; report the real wait.
+            if "connect" in summary.get("phase_s", {}):
+                summary["phase_s"]["connect"] = round(connect_s, 3)
+            post_land = getattr(scenario_args, "post_land", 0.0)
+            if post_land > 0:
+                await runtime.hold(post_land)
+    except TimeoutError as error:
+        summary = {"status": "timeout", "error": str(error)}
+    except RuntimeError as error:
+        summary = {"status": "failure", "error": str(error)}
+    except OSError as error:
+        summary = {"status": "failure", "error": f"cannot open {link}: {error}"}
+    except Exception as error:  # pylint: disable=broad-except
+        summary = {"status": "unexpected", "error": str(error)}
+    finally:
+        if master is not None:
+            master.close()
+    if summary["status"] != "success":
+        log(f"{summary['status']}: {summary['error']}")
+    result["finished_at_s"] = round(time.monotonic() - fleet_started, 3)
+
+    summary_path = args.artifact_dir / slot.name / f"{args.scenario}_summary.json"
+    summary_path.parent.mkdir(parents=True, exist_ok=True)
+    summary_path.write_text(json.dumps(summary, separators=(",", ":")), encoding="utf-8")
+    return {**result, "summary_path": str(summary_path), **summary}
+
+
+def _spread(values: list[float]) -> Optional[dict[str, float]]:
+    if not values:
+        return None
+    return {"min": round(min(values), 3), "mean": round(sum(values) / len(values), 3), "max": round(max(values), 3)}
+
+
+def build_report(scenario: str, vehicles: list[dict[str, Any]], wall_s: float) -> dict[str, Any]:
+    succeeded = [vehicle for vehicle in vehicles if vehicle["status"] == "success"]
+    started = [vehicle["started_at_s"] for vehicle in vehicles if "started_at_s" in vehicle]
+    phases: dict[str, list[float]] = {}
+    for vehicle in succeeded:
+        for phase, seconds in vehicle.get("phase_s", {}).items():
+            phases.setdefault(phase, []).append(seconds)
+    return {
+        "scenario": scenario,
+        "vehicles_total": len(vehicles),
+        "vehicles_succeeded": len(succeeded),
+        "wall_s": round(wall_s, 3),
+        "start_spread_s": round(max(started) - min(started), 3) if started else 0.0,
+        "elapsed_s": _spread([vehicle["elapsed_s"] for vehicle in succeeded]),
+        "phase_s": {phase: _spread(values) for phase, values in phases.items()},
+        "vehicles": vehicles,
+    }
+
+
+def _print_table(report: dict[str, Any]) -> None:
+    phases = list(report["phase_s"])
+    header = f"{'vehicle':>11} {'sysid':>5} {'port':>6} {'status':>10} {'elapsed_s':>9} " + " ".join(f"{p:>8}" for p in phases)
+    print(header)
+    for vehicle in report["vehicles"]:
+        phase_s = vehicle.get("phase_s", {})
+        elapsed = f"{vehicle['elapsed_s']:.2f}" if "elapsed_s" in vehicle else "-"
+        print(
+            f"{vehicle['instance']:>11} {vehicle['sysid']:>5} {vehicle['port']:>6} {vehicle['status']:>10} {elapsed:>9} "
+            + " ".join(f"{phase_s[p]:>8.2f}" if p in phase_s else f"{'-':>8}" for p in phases)
+        )
+    print(
+        f"[multi] {report['vehicles_succeeded']}/{report['vehicles_total']} vehicles succeeded; "
+        f"wall {report['wall_s']:.1f}s, start spread {report['start_spread_s'] * 1000:.1f}ms"
+    )
+
+
+async def run_fleet(scenario: Any, slots: list[VehicleSlot], scenario_args: argparse.Namespace, args: argparse.Namespace) -> dict[str, Any]:
+    fleet_started = time.monotonic()
+    outcomes = await asyncio.gather(
+        *(_run_vehicle(scenario, slot, scenario_args, args, fleet_started) for slot in slots), return_exceptions=True
+    )
+    vehicles = []
+    for slot, outcome in zip(slots, outcomes):
+        if isinstance(outcome, BaseException):
+            # Anything that escapes the per-vehicle handler (e.g. an unwritable summary) still lands in the report.
+            outcome = {**asdict(slot), "link": f"udp:{args.link_host}:{slot.port}", "status": "unexpected", "error": repr(outcome)}
+        vehicles.append(outcome)
+    return build_report(args.scenario, vehicles, time.monotonic() - fleet_started)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args, passthrough = parse_args(list(argv or sys.argv[1:]))
+    if args.vehicles < 1:
+        raise SystemExit("--vehicles must be >= 1")
+    reserved = frozenset(int(port) for port in args.reserved_ports.split(",") if port.strip())
+    slots = allocate_vehicles(
+        args.vehicles, base_instance=args.base_instance, port_base=args.port_base, sysid_base=args.sysid_base, reserved_ports=reserved
+    )
+    scenario = _load_scenario(args.scenario)
+    scenario_args = scenario.parse_args(passthrough)
+    args.artifact_dir.mkdir(parents=True, exist_ok=True)
+    print(
+        f"[multi] {args.scenario} on {len(slots)} vehicles: "
+        + ", ".join(f"{slot.name}(sysid={slot.sysid}, port={slot.port})" for slot in slots)
+    )
+
+    processes = _launch_px4(slots, args) if args.launch_px4 else []
+    try:
+        report = asyncio.run(run_fleet(scenario, slots, scenario_args, args))
+    finally:
+        _stop_px4(processes)
+
+    report_path = args.artifact_dir / REPORT_NAME
+    report_path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    _print_table(report)
+    print(f"[multi] report={report_path}")
+    return 0 if report["vehicles_succeeded"] == report["vehicles_total"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -4,13 +4,30 @@
 from __future__ import annotations
 
 import argparse
+import json
 import os
+import queue
 import signal
 import subprocess
 import sys
+import threading
 import time
 from pathlib import Path
-from typing import TextIO
+from typing import Any, Callable, TextIO
+
+TOOLS_DIR = Path(__file__).resolve().parent
+if str(TOOLS_DIR) not in sys.path:
+    sys.path.insert(0, str(TOOLS_DIR))
+from camera_ingest_adapter import _iter_simulated_camera_frames  # noqa: E402
+from check_vision_lock_metrics import EXIT_LIVE_FAIL  # noqa: E402
+from guidance_advisory import _advisory_from_track  # noqa: E402
+from guidance_advisory import parse_args as parse_guidance_args  # noqa: E402
+from intercept_adapter_contract import FrameValidator  # noqa: E402
+from jsonl_writer import BufferedJsonlWriter  # noqa: E402
+from percentiles import percentile  # noqa: E402
+from track_ring import unlink_ring  # noqa: E402
+from vision_clock import add_clock_arguments, build_clock, clock_cli_args  # noqa: E402
+from vision_diagnostics import Diagnostics, merge_stats_files  # noqa: E402
 
 
 def parse_args(argv: list[str]) -> argparse.Namespace:
@@ -26,12 +43,34 @@ def parse_args(argv: list[str]) -> argparse.Namespace:
     parser.add_argument("--guidance-exit-on-idle-seconds", type=float, default=2.0, help="Idle bound for guidance")
     parser.add_argument("--pipeline-timeout-s", type=float, default=60.0, help="Hard timeout for orchestration")
     parser.add_argument("--realtime", type=int, choices=[0,1], default=0, help="Pace camera/scenario to wall-clock when 1")
+    parser.add_argument("--lock-threshold", type=float, default=0.72, help="Tracker confidence EMA lock threshold")
+    parser.add_argument("--min-hits", type=int, default=3, help="Tracker detections required before LOCKED")
+    parser.add_argument("--iou-threshold", type=float, default=0.25, help="Tracker IOU association threshold")
     parser.add_argument(
         "--checker-mode",
         choices=["scenario-only", "full-pipeline"],
         default="full-pipeline",
         help="Mode used by tools/check_vision_lock_metrics.py",
     )
+    parser.add_argument(
+        "--tracks-transport",
+        choices=["jsonl", "shm"],
+        default="jsonl",
+        help="Tracker-to-guidance handoff: tail the tracks JSONL or read a shared-memory ring "
+        "(the tracks JSONL is still recorded for the checker)",
+    )
+    parser.add_argument(
+        "--early-abort",
+        action="store_true",
+        help="Run check_vision_lock_metrics.py --follow alongside the subprocess pipeline and stop the run "
+        "as soon as it reports a threshold that can no longer be met",
+    )
+    parser.add_argument(
+        "--in-process",
+        action="store_true",
+        help="Chain camera adapter, tracker and guidance in this process instead of subprocesses + file tailing",
+    )
+    add_clock_arguments(parser)
     return parser.parse_args(argv)
 
 
@@ -58,16 +97,241 @@ def _terminate_processes(processes: list[subprocess.Popen[bytes]]) -> None:
             pass
 
 
-def _run_checker(
+class _ArtifactSink:
+    """Background thread that owns the artifact JSONL writers for in-process mode.
+
+    The hot path only enqueues records; JSON encoding and file I/O happen on
+    the sink thread. A writer error stops the thread and is re-raised from the
+    next ``put`` or from ``close``.
+    """
+
+    _PUT_POLL_S = 0.5
+
+    def __init__(self, paths: dict[str, Path], *, flush_rows: int = 64, max_pending: int = 65536) -> None:
+        self.writers = {name: BufferedJsonlWriter(path, flush_rows=flush_rows, truncate=True) for name, path in paths.items()}
+        self._queue: queue.Queue[tuple[str, dict[str, Any]] | None] = queue.Queue(maxsize=max_pending)
+        self._error: BaseException | None = None
+        self._thread = threading.Thread(target=self._drain, name="vision-artifact-sink", daemon=True)
+        self._thread.start()
+
+    def put(self, name: str, record: dict[str, Any]) -> None:
+        self._enqueue((name, record))
+
+    def _enqueue(self, item: tuple[str, dict[str, Any]] | None) -> None:
+        # A dead sink never drains the bounded queue, so never block on it unconditionally.
+        while True:
+            self._raise_if_failed()
+            try:
+                self._queue.put(item, timeout=self._PUT_POLL_S)
+                return
+            except queue.Full:
+                continue
+
+    def _raise_if_failed(self) -> None:
+        if self._error is not None:
+            raise RuntimeError(f"artifact sink failed: {self._error!r}") from self._error
+
+    def _drain(self) -> None:
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    break
+                name, record = item
+                self.writers[name].write(record)
+        except BaseException as error:  # pylint: disable=broad-except
+            self._error = error
+
+    def close(self) -> None:
+        try:
+            if self._thread.is_alive():
+                self._enqueue(None)
+                self._thread.join()
+        finally:
+            for writer in self.writers.values():
+                try:
+                    writer.close()
+                except OSError as error:
+                    if self._error is None:
+                        self._error = error
+        self._raise_if_failed()
+
+
+def _run_in_process_pipeline(
+    args: argparse.Namespace,
+    *,
+    tracks_jsonl: Path,
+    events_jsonl: Path,
+    advisory_jsonl: Path,
+    latency_json: Path,
+    diagnostics_json: dict[str, Path],
+    logs: dict[str, TextIO],
+    should_stop: Callable[[], bool],
+) -> dict[str, Any]:
+    """Run adapter -> tracker -> guidance as chained generators in this process.
+
+    Records are handed to a background ``_ArtifactSink`` so disk I/O stays off
+    the hot path. End-to-end latency is measured per frame from the moment the
+    adapter yields it to the moment its last advisory row is computed.
+    """
+    # Deliberately lazy: the tracker pulls in numpy, which the subprocess pipeline never needs here.
+    from intercept_tracker import _iter_tracking_outputs, build_tracker
+    from intercept_tracker import parse_args as parse_tracker_args
+
+    clock = build_clock(args)
+    tracker = build_tracker(parse_tracker_args(["--input-stdin-jsonl", *_tracker_tuning_args(args)]))
+    guidance_args = parse_guidance_args(["--max-rows", str(args.guidance_max_rows)])
+    realtime = int(args.realtime) == 1
+    print(
+        f"[camera-ingest-adapter] synthetic mode={'realtime' if realtime else 'fast'} "
+        f"duration_s={args.camera_duration_s:.2f} fps={args.camera_fps:.2f} (in-process)",
+        file=logs["camera"],
+        flush=True,
+    )
+
+    frame_started_at = 0.0
+    validator = FrameValidator()
+    camera_diagnostics = Diagnostics("camera_ingest_adapter", stream=logs["camera"])
+    tracker_diagnostics = Diagnostics("intercept_tracker", stream=logs["tracker"])
+
+    def _frames():
+        nonlocal frame_started_at
+        raw_frames = _iter_simulated_camera_frames(
+            args.camera_id, args.camera_duration_s, args.camera_fps, realtime, clock
+        )
+        for raw in raw_frames:
+            frame, reason = validator(raw)
+            if frame is None:
+                camera_diagnostics.count(reason, raw.get("timestamp"), "camera_ingest_adapter")
+                continue
+            frame_started_at = time.perf_counter()
+            yield frame
+
+    sink = _ArtifactSink({"tracks": tracks_jsonl, "events": events_jsonl, "advisory": advisory_jsonl})
+    deadline = time.monotonic() + max(1.0, args.pipeline_timeout_s)
+    latencies: list[float] = []
+    track_rows = 0
+    advisory_rows = 0
+    try:
+        for outputs, events in _iter_tracking_outputs(tracker, _frames(), tracker_diagnostics, clock):
+            for output in outputs:
+                sink.put("tracks", output)
+                track_rows += 1
+                if advisory_rows < guidance_args.max_rows:
+                    sink.put("advisory", _advisory_from_track(output, guidance_args, now_ts=clock.now()))
+                    advisory_rows += 1
+            for event in events:
+                sink.put("events", event)
+            latencies.append(time.perf_counter() - frame_started_at)
+            if should_stop():
+                break
+            if time.monotonic() >= deadline:
+                raise subprocess.TimeoutExpired("in-process vision pipeline", args.pipeline_timeout_s)
+    finally:
+        sink.close()
+        camera_diagnostics.close(diagnostics_json["camera_ingest_adapter"])
+        tracker_diagnostics.close(diagnostics_json["intercept_tracker"])
+        if hasattr(clock, "close"):
+            clock.close()
+
+    print(sink.writers["tracks"].stats_line("[tracker] tracks writer"), file=logs["tracker"], flush=True)
+    print(sink.writers["events"].stats_line("[tracker] events writer"), file=logs["tracker"], flush=True)
+    print(f"Guidance advisory output written to {advisory_jsonl} ({advisory_rows} rows)", file=logs["guidance"], flush=True)
+
+    ordered = sorted(latencies)
+    stats: dict[str, Any] = {
+        "mode": "in-process",
+        "frames": len(latencies),
+        "track_rows": track_rows,
+        "advisory_rows": advisory_rows,
+    }
+    for label, value in (
+        ("min", ordered[0] if ordered else None),
+        ("p50", percentile(ordered, 0.50)),
+        ("p95", percentile(ordered, 0.95)),
+        ("max", ordered[-1] if ordered else None),
+    ):
+        stats[f"frame_to_advisory_{label}_ms"] = None if value is None else round(value * 1000.0, 4)
+    latency_json.write_text(json.dumps(stats, separators=(",", ":")) + "\n", encoding="utf-8")
+    return stats
+
+
+def _collect_diagnostics(diagnostics_json: Path, component_diagnostics: dict[str, Path]) -> None:
+    merged = merge_stats_files(component_diagnostics)
+    diagnostics_json.write_text(json.dumps(merged, indent=2) + "\n", encoding="utf-8")
+    if merged["total_rejected"]:
+        reasons = ", ".join(f"{reason}={count}" for reason, count in merged["totals"].items())
+        print(f"[vision-orchestrator] rejected records: {merged['total_rejected']} ({reasons})", file=sys.stderr)
+
+
+def _tracker_tuning_args(args: argparse.Namespace) -> list[str]:
+    return [
+        "--lock-threshold",
+        str(args.lock_threshold),
+        "--min-hits",
+        str(args.min_hits),
+        "--iou-threshold",
+        str(args.iou_threshold),
+    ]
+
+
+def _child_clock_args(args: argparse.Namespace) -> list[str]:
+    # A PX4 SYSTEM_TIME listener binds the MAVLink port, so only the in-process
+    # pipeline uses it; the scenario keeps wall time (its timestamps are relative).
+    return [] if args.clock == "px4" else clock_cli_args(args)
+
+
+def _start_scenario(
+    args: argparse.Namespace,
+    scenario_script: Path,
+    summary_json: Path,
+    log: TextIO,
+) -> subprocess.Popen[bytes]:
+    scenario_cmd = [
+        sys.executable,
+        str(scenario_script),
+        "--duration-s",
+        str(args.scenario_duration_s),
+        "--fps",
+        str(max(1.0, args.camera_fps)),
+    ]
+    if int(args.realtime) == 1:
+        scenario_cmd.append("--realtime")
+    scenario_cmd.extend(_child_clock_args(args))
+    scenario_env = os.environ.copy()
+    scenario_env["SIMTEST_SCENARIO_RESULT"] = str(summary_json)
+    return subprocess.Popen(scenario_cmd, stdout=log, stderr=subprocess.STDOUT, env=scenario_env)
+
+
+class _LiveCheckFailed(Exception):
+    """Raised while waiting on the pipeline once the live lock-metrics checker has reported FAIL."""
+
+
+def _wait_for(proc: subprocess.Popen[bytes], timeout_s: float, live_checker: subprocess.Popen[bytes] | None) -> int:
+    """``proc.wait(timeout_s)`` that also gives up early when ``live_checker`` exits with FAIL."""
+    if live_checker is None:
+        return proc.wait(timeout=timeout_s)
+    deadline = time.monotonic() + timeout_s
+    while True:
+        rc = proc.poll()
+        if rc is not None:
+            return rc
+        if live_checker.poll() == EXIT_LIVE_FAIL:
+            raise _LiveCheckFailed()
+        if time.monotonic() >= deadline:
+            raise subprocess.TimeoutExpired(proc.args, timeout_s)
+        time.sleep(0.05)
+
+
+def _checker_cmd(
     repo_root: Path,
     *,
     mode: str,
     tracks_jsonl: Path,
     events_jsonl: Path,
     summary_json: Path,
-    checker_log: Path,
-) -> int:
-    cmd = [
+) -> list[str]:
+    return [
         sys.executable,
         str(repo_root / "tools/check_vision_lock_metrics.py"),
         "--mode",
@@ -79,6 +343,26 @@ def _run_checker(
         "--scenario-summary-json",
         str(summary_json),
     ]
+
+
+def _run_checker(
+    repo_root: Path,
+    *,
+    mode: str,
+    tracks_jsonl: Path,
+    events_jsonl: Path,
+    summary_json: Path,
+    checker_log: Path,
+    metrics_json: Path,
+) -> int:
+    cmd = _checker_cmd(
+        repo_root,
+        mode=mode,
+        tracks_jsonl=tracks_jsonl,
+        events_jsonl=events_jsonl,
+        summary_json=summary_json,
+    )
+    cmd.extend(["--metrics-json", str(metrics_json)])
     with checker_log.open("w", encoding="utf-8") as handle:
         proc = subprocess.run(cmd, stdout=handle, stderr=subprocess.STDOUT, check=False)
     return proc.returncode
@@ -90,6 +374,17 @@ def main(argv: list[str] | None = None) -> int:
     artifact_dir = args.artifact_dir.resolve()
     artifact_dir.mkdir(parents=True, exist_ok=True)
 
+    if args.clock == "px4" and not args.in_process:
+        print("[vision-orchestrator] --clock px4 requires --in-process (one SYSTEM_TIME listener)", file=sys.stderr)
+        return 2
+
+    if args.in_process and (args.tracks_transport != "jsonl" or args.early_abort):
+        print(
+            "[vision-orchestrator] --tracks-transport shm and --early-abort need the subprocess pipeline; drop --in-process",
+            file=sys.stderr,
+        )
+        return 2
+
     scenario_script = repo_root / "tests" / "scenarios" / f"{args.scenario}.py"
     if not scenario_script.exists():
         print(f"[vision-orchestrator] missing scenario script: {scenario_script}", file=sys.stderr)
@@ -100,6 +395,15 @@ def main(argv: list[str] | None = None) -> int:
     advisory_jsonl = artifact_dir / "guidance_advisory.jsonl"
     summary_json = artifact_dir / f"{args.scenario}_summary.json"
     checker_log = artifact_dir / "check_vision_lock_metrics.log"
+    live_checker_log = artifact_dir / "check_vision_lock_metrics_live.log"
+    metrics_json = artifact_dir / "vision_lock_metrics.json"
+    latency_json = artifact_dir / "vision_pipeline_latency.json"
+    diagnostics_json = artifact_dir / "vision_diagnostics.json"
+    component_diagnostics = {
+        name: artifact_dir / f"{name}_diagnostics.json"
+        for name in ("camera_ingest_adapter", "intercept_tracker", "guidance_advisory")
+    }
+    shm_name = f"vision_tracks_{os.getpid()}"
 
     log_paths = {
         "camera": artifact_dir / "camera_ingest_adapter.log",
@@ -110,9 +414,16 @@ def main(argv: list[str] | None = None) -> int:
 
     for path in (tracks_jsonl, events_jsonl, advisory_jsonl, summary_json):
         path.write_text("", encoding="utf-8")
+    for path in (metrics_json, diagnostics_json, *component_diagnostics.values()):
+        path.unlink(missing_ok=True)
+
+    early_abort = args.early_abort and args.checker_mode == "full-pipeline"
+    if early_abort:
+        log_paths["live_checker"] = live_checker_log
 
     logs = {name: _open_log(path) for name, path in log_paths.items()}
     processes: list[subprocess.Popen[bytes]] = []
+    live_checker: subprocess.Popen[bytes] | None = None
     interrupted = False
 
     def _signal_handler(signum: int, _frame: object) -> None:
@@ -126,107 +437,158 @@ def main(argv: list[str] | None = None) -> int:
 
     start = time.time()
     try:
-        tracker_cmd = [
-            sys.executable,
-            str(repo_root / "tools/intercept_tracker.py"),
-            "--input-stdin-jsonl",
-            "--clear-output",
-            "--output-jsonl",
-            str(tracks_jsonl),
-            "--events-jsonl",
-            str(events_jsonl),
-        ]
-        tracker_proc = subprocess.Popen(
-            tracker_cmd,
-            stdin=subprocess.PIPE,
-            stdout=logs["tracker"],
-            stderr=subprocess.STDOUT,
-        )
-        processes.append(tracker_proc)
-
-        guidance_cmd = [
-            sys.executable,
-            str(repo_root / "tools/guidance_advisory.py"),
-            "--tracks-jsonl",
-            str(tracks_jsonl),
-            "--output-jsonl",
-            str(advisory_jsonl),
-            "--clear-output",
-            "--max-seconds",
-            str(args.guidance_max_seconds),
-            "--max-rows",
-            str(args.guidance_max_rows),
-            "--exit-on-idle-seconds",
-            str(args.guidance_exit_on_idle_seconds),
-        ]
-        guidance_proc = subprocess.Popen(guidance_cmd, stdout=logs["guidance"], stderr=subprocess.STDOUT)
-        processes.append(guidance_proc)
-
-        if tracker_proc.stdin is None:
-            raise RuntimeError("tracker stdin unavailable for pipeline wiring")
-        camera_cmd = [
-            sys.executable,
-            str(repo_root / "tools/camera_ingest_adapter.py"),
-            "--simulate-camera-stream",
-            "--camera-id",
-            args.camera_id,
-            "--duration-s",
-            str(args.camera_duration_s),
-            "--fps",
-            str(args.camera_fps),
-        ]
-        if int(args.realtime) == 1:
-            camera_cmd.append("--realtime")
-        camera_proc = subprocess.Popen(
-            camera_cmd,
-            stdout=tracker_proc.stdin,
-            stderr=logs["camera"],
-        )
-        processes.append(camera_proc)
-        tracker_proc.stdin.close()
-
-        scenario_cmd = [
-            sys.executable,
-            str(scenario_script),
-            "--duration-s",
-            str(args.scenario_duration_s),
-            "--fps",
-            str(max(1.0, args.camera_fps)),
-        ]
-        if int(args.realtime) == 1:
-            scenario_cmd.append("--realtime")
-        scenario_env = os.environ.copy()
-        scenario_env["SIMTEST_SCENARIO_RESULT"] = str(summary_json)
-        scenario_proc = subprocess.Popen(scenario_cmd, stdout=logs["scenario"], stderr=subprocess.STDOUT, env=scenario_env)
-        processes.append(scenario_proc)
-
-        camera_rc = camera_proc.wait(timeout=max(1.0, args.pipeline_timeout_s))
-        if camera_rc != 0:
-            print(f"[vision-orchestrator] camera ingest failed: exit={camera_rc}", file=sys.stderr)
-            return 1
-
-        tracker_rc = tracker_proc.wait(timeout=max(1.0, args.pipeline_timeout_s))
-        if tracker_rc != 0:
-            print(f"[vision-orchestrator] tracker failed: exit={tracker_rc}", file=sys.stderr)
-            return 1
-
-        scenario_rc = scenario_proc.wait(timeout=max(1.0, args.pipeline_timeout_s))
-        if scenario_rc != 0:
-            print(f"[vision-orchestrator] scenario failed: exit={scenario_rc}", file=sys.stderr)
-            return 1
-
-        guidance_budget = max(1.0, args.guidance_max_seconds + args.guidance_exit_on_idle_seconds + 2.0)
-        guidance_rc = guidance_proc.wait(timeout=guidance_budget)
-        if guidance_rc != 0:
-            print(f"[vision-orchestrator] guidance advisory failed: exit={guidance_rc}", file=sys.stderr)
-            return 1
+        if args.in_process:
+            scenario_proc = _start_scenario(args, scenario_script, summary_json, logs["scenario"])
+            processes.append(scenario_proc)
+            latency_stats = _run_in_process_pipeline(
+                args,
+                tracks_jsonl=tracks_jsonl,
+                events_jsonl=events_jsonl,
+                advisory_jsonl=advisory_jsonl,
+                latency_json=latency_json,
+                diagnostics_json=component_diagnostics,
+                logs=logs,
+                should_stop=lambda: interrupted,
+            )
+            print(
+                "[vision-orchestrator] in-process frame_to_advisory_ms "
+                f"min={latency_stats['frame_to_advisory_min_ms']} p50={latency_stats['frame_to_advisory_p50_ms']} "
+                f"p95={latency_stats['frame_to_advisory_p95_ms']} max={latency_stats['frame_to_advisory_max_ms']} "
+                f"frames={latency_stats['frames']}"
+            )
+
+            scenario_rc = scenario_proc.wait(timeout=max(1.0, args.pipeline_timeout_s))
+            if scenario_rc != 0:
+                print(f"[vision-orchestrator] scenario failed: exit={scenario_rc}", file=sys.stderr)
+                return 1
+        else:
+            tracker_cmd = [
+                sys.executable,
+                str(repo_root / "tools/intercept_tracker.py"),
+                "--input-stdin-jsonl",
+                "--clear-output",
+                "--output-jsonl",
+                str(tracks_jsonl),
+                "--events-jsonl",
+                str(events_jsonl),
+                *_tracker_tuning_args(args),
+                *_child_clock_args(args),
+                "--diagnostics-json",
+                str(component_diagnostics["intercept_tracker"]),
+            ]
+            if args.tracks_transport == "shm":
+                # Keep the ring after the tracker exits so a late guidance attach still drains it.
+                tracker_cmd.extend(["--publish-shm", shm_name, "--no-shm-unlink"])
+            tracker_proc = subprocess.Popen(
+                tracker_cmd,
+                stdin=subprocess.PIPE,
+                stdout=logs["tracker"],
+                stderr=subprocess.STDOUT,
+            )
+            processes.append(tracker_proc)
+
+            guidance_cmd = [
+                sys.executable,
+                str(repo_root / "tools/guidance_advisory.py"),
+                *(["--tracks-shm", shm_name] if args.tracks_transport == "shm" else ["--tracks-jsonl", str(tracks_jsonl)]),
+                "--output-jsonl",
+                str(advisory_jsonl),
+                "--clear-output",
+                "--max-seconds",
+                str(args.guidance_max_seconds),
+                "--max-rows",
+                str(args.guidance_max_rows),
+                "--exit-on-idle-seconds",
+                str(args.guidance_exit_on_idle_seconds),
+                *_child_clock_args(args),
+                "--diagnostics-json",
+                str(component_diagnostics["guidance_advisory"]),
+            ]
+            guidance_proc = subprocess.Popen(guidance_cmd, stdout=logs["guidance"], stderr=subprocess.STDOUT)
+            processes.append(guidance_proc)
+
+            if tracker_proc.stdin is None:
+                raise RuntimeError("tracker stdin unavailable for pipeline wiring")
+            camera_cmd = [
+                sys.executable,
+                str(repo_root / "tools/camera_ingest_adapter.py"),
+                "--simulate-camera-stream",
+                "--camera-id",
+                args.camera_id,
+                "--duration-s",
+                str(args.camera_duration_s),
+                "--fps",
+                str(args.camera_fps),
+            ]
+            if int(args.realtime) == 1:
+                camera_cmd.append("--realtime")
+            camera_cmd.extend(_child_clock_args(args))
+            camera_cmd.extend(["--diagnostics-json", str(component_diagnostics["camera_ingest_adapter"])])
+            camera_proc = subprocess.Popen(
+                camera_cmd,
+                stdout=tracker_proc.stdin,
+                stderr=logs["camera"],
+            )
+            processes.append(camera_proc)
+            tracker_proc.stdin.close()
+
+            scenario_proc = _start_scenario(args, scenario_script, summary_json, logs["scenario"])
+            processes.append(scenario_proc)
+
+            if early_abort:
+                live_cmd = _checker_cmd(
+                    repo_root,
+                    mode=args.checker_mode,
+                    tracks_jsonl=tracks_jsonl,
+                    events_jsonl=events_jsonl,
+                    summary_json=summary_json,
+                )
+                live_checker = subprocess.Popen(
+                    [*live_cmd, "--follow", "--follow-idle-s", str(max(1.0, args.pipeline_timeout_s))],
+                    stdout=logs["live_checker"],
+                    stderr=subprocess.STDOUT,
+                )
+                processes.append(live_checker)
+
+            camera_rc = _wait_for(camera_proc, max(1.0, args.pipeline_timeout_s), live_checker)
+            if camera_rc != 0:
+                print(f"[vision-orchestrator] camera ingest failed: exit={camera_rc}", file=sys.stderr)
+                return 1
+
+            tracker_rc = _wait_for(tracker_proc, max(1.0, args.pipeline_timeout_s), live_checker)
+            if tracker_rc != 0:
+                print(f"[vision-orchestrator] tracker failed: exit={tracker_rc}", file=sys.stderr)
+                return 1
+
+            scenario_rc = _wait_for(scenario_proc, max(1.0, args.pipeline_timeout_s), live_checker)
+            if scenario_rc != 0:
+                print(f"[vision-orchestrator] scenario failed: exit={scenario_rc}", file=sys.stderr)
+                return 1
+
+            guidance_budget = max(1.0, args.guidance_max_seconds + args.guidance_exit_on_idle_seconds + 2.0)
+            guidance_rc = _wait_for(guidance_proc, guidance_budget, live_checker)
+            if guidance_rc != 0:
+                print(f"[vision-orchestrator] guidance advisory failed: exit={guidance_rc}", file=sys.stderr)
+                return 1
     except subprocess.TimeoutExpired:
         print("[vision-orchestrator] timeout exceeded, terminating child processes", file=sys.stderr)
         return 124
+    except _LiveCheckFailed:
+        print(
+            f"[vision-orchestrator] live lock-metrics check failed after {time.time() - start:.2f}s, aborting run "
+            f"(see {live_checker_log})",
+            file=sys.stderr,
+        )
+        # The live verdict is the checker result for an aborted run.
+        checker_log.write_text(live_checker_log.read_text(encoding="utf-8"), encoding="utf-8")
+        return 1
     finally:
         _terminate_processes(processes)
         for handle in logs.values():
             handle.close()
+        _collect_diagnostics(diagnostics_json, component_diagnostics)
+        if args.tracks_transport == "shm":
+            unlink_ring(shm_name)
 
     if advisory_jsonl.exists() and advisory_jsonl.stat().st_size == 0:
         advisory_jsonl.write_text("{\"type\":\"no_advisory\",\"reason\":\"no_rows_generated\"}\n", encoding="utf-8")
@@ -238,6 +600,7 @@ def main(argv: list[str] | None = None) -> int:
         events_jsonl=events_jsonl,
         summary_json=summary_json,
         checker_log=checker_log,
+        metrics_json=metrics_json,
     )
     elapsed = time.time() - start
     print(f"[vision-orchestrator] completed in {elapsed:.2f}s")
@@ -246,6 +609,9 @@ def main(argv: list[str] | None = None) -> int:
     print(f"[vision-orchestrator] events: {events_jsonl}")
     print(f"[vision-orchestrator] advisory: {advisory_jsonl}")
     print(f"[vision-orchestrator] checker_log: {checker_log}")
+    print(f"[vision-orchestrator] diagnostics: {diagnostics_json}")
+    if args.in_process:
+        print(f"[vision-orchestrator] latency: {latency_json}")
 
     if interrupted:
         return 130
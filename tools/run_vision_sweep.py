@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""Run a parameter grid of non-realtime vision pipelines in parallel.
+
+Every combination of ``--param`` values becomes one ``run_vision_pre_task4.py``
+invocation with its own artifact directory (``<sweep-dir>/run_NNNN``). Up to
+``--jobs`` runs execute at once (default: one per CPU core). Each run is a
+separate orchestrator process tree, so the pool threads only wait on
+children. Checker verdicts and metrics (``vision_lock_metrics.json``) are
+collected with per-run wall time into ``sweep_results.csv`` and
+``sweep_results.json``.
+
+Arguments not recognised here are passed to every run unchanged, e.g.::
+
+    python3 tools/run_vision_sweep.py \\
+        --param lock_threshold=0.6,0.72,0.8 --param min_hits=2,3,4 \\
+        --param camera_fps=8,15 --in-process --camera-duration-s 30
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import itertools
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any
+
+TOOLS_DIR = Path(__file__).resolve().parent
+if str(TOOLS_DIR) not in sys.path:
+    sys.path.insert(0, str(TOOLS_DIR))
+
+# The orchestrator needs up to ~9 s to stop its own children after SIGTERM.
+TERMINATE_GRACE_S = 10.0
+METRIC_COLUMNS = (
+    "lock_acquisition_s",
+    "lock_hold_ratio",
+    "dropout_count",
+    "max_dropout_gap_s",
+    "lock_quality_percentile_value",
+    "lock_quality_samples",
+)
+
+
+def parse_args(argv: list[str]) -> tuple[argparse.Namespace, list[str]]:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--param",
+        action="append",
+        default=[],
+        metavar="NAME=V1,V2,...",
+        help="Sweep values for one run_vision_pre_task4.py option (underscores or dashes); repeat to build the grid",
+    )
+    parser.add_argument("--sweep-dir", type=Path, default=Path("artifacts/vision_sweep"), help="Parent of per-run artifact dirs")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Runs executed concurrently")
+    parser.add_argument("--run-timeout-s", type=float, default=600.0, help="Wall-clock bound for a single run")
+    return parser.parse_known_args(argv)
+
+
+def _parse_grid(specs: list[str]) -> dict[str, list[str]]:
+    grid: dict[str, list[str]] = {}
+    for spec in specs:
+        name, sep, raw_values = spec.partition("=")
+        name = name.strip().replace("-", "_")
+        values = [value.strip() for value in raw_values.split(",") if value.strip()]
+        if not sep or not name or not values:
+            raise SystemExit(f"--param expects NAME=V1,V2,... (got {spec!r})")
+        if name in ("artifact_dir", "realtime"):
+            raise SystemExit(f"--param {name} is managed by the sweep runner")
+        if name in grid:
+            raise SystemExit(f"--param {name} given more than once")
+        grid[name] = values
+    return grid
+
+
+def _run_args(params: dict[str, str], passthrough: list[str], artifact_dir: Path) -> list[str]:
+    args = list(passthrough)
+    for name, value in params.items():
+        args.extend([f"--{name.replace('_', '-')}", value])
+    # Sweeps are always non-realtime; the sweep owns artifact placement.
+    args.extend(["--realtime", "0", "--artifact-dir", str(artifact_dir)])
+    return args
+
+
+def _stop_process_group(proc: subprocess.Popen[bytes]) -> None:
+    """SIGTERM the run's process group, then SIGKILL whatever is left after the grace period."""
+    try:
+        os.killpg(proc.pid, signal.SIGTERM)
+    except ProcessLookupError:
+        pass
+    try:
+        proc.wait(timeout=TERMINATE_GRACE_S)
+    except subprocess.TimeoutExpired:
+        pass
+    try:
+        # Also catches children the orchestrator did not manage to stop itself.
+        os.killpg(proc.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    proc.wait()
+
+
+def _execute(index: int, params: dict[str, str], run_args: list[str], artifact_dir: Path, timeout_s: float) -> dict[str, Any]:
+    artifact_dir.mkdir(parents=True, exist_ok=True)
+    cmd = [sys.executable, str(TOOLS_DIR / "run_vision_pre_task4.py"), *run_args]
+    started = time.monotonic()
+    with (artifact_dir / "orchestrator.log").open("w", encoding="utf-8") as log:
+        # Own session per run, so a timeout can take down the whole orchestrator process tree.
+        proc = subprocess.Popen(cmd, stdout=log, stderr=subprocess.STDOUT, start_new_session=True)
+        try:
+            exit_code = proc.wait(timeout=timeout_s)
+        except subprocess.TimeoutExpired:
+            _stop_process_group(proc)
+            exit_code = 124
+        except BaseException:
+            _stop_process_group(proc)
+            raise
+    wall_time_s = time.monotonic() - started
+
+    row: dict[str, Any] = {"run": f"run_{index:04d}", **params, "exit_code": exit_code}
+    metrics_json = artifact_dir / "vision_lock_metrics.json"
+    if metrics_json.exists():
+        result = json.loads(metrics_json.read_text(encoding="utf-8"))
+        row["verdict"] = result["verdict"]
+        row.update({key: result["metrics"].get(key) for key in METRIC_COLUMNS})
+        row["failures"] = result["failures"]
+    else:
+        # The orchestrator stopped before the checker ran (stage failure, timeout or early abort).
+        row["verdict"] = "TIMEOUT" if exit_code == 124 else "ABORTED"
+        row.update({key: None for key in METRIC_COLUMNS})
+        row["failures"] = []
+    row["wall_time_s"] = round(wall_time_s, 3)
+    row["artifact_dir"] = str(artifact_dir)
+    return row
+
+
+def _write_tables(sweep_dir: Path, names: list[str], rows: list[dict[str, Any]], meta: dict[str, Any]) -> tuple[Path, Path]:
+    csv_path = sweep_dir / "sweep_results.csv"
+    json_path = sweep_dir / "sweep_results.json"
+    columns = ["run", *names, "verdict", "exit_code", *METRIC_COLUMNS, "wall_time_s", "failures", "artifact_dir"]
+    with csv_path.open("w", encoding="utf-8", newline="") as handle:
+        writer = csv.DictWriter(handle, fieldnames=columns)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({**row, "failures": "; ".join(row["failures"])})
+    json_path.write_text(json.dumps({**meta, "runs": rows}, indent=2) + "\n", encoding="utf-8")
+    return csv_path, json_path
+
+
+def main(argv: list[str] | None = None) -> int:
+    args, passthrough = parse_args(argv or sys.argv[1:])
+    if args.jobs <= 0:
+        raise SystemExit("--jobs must be > 0")
+    grid = _parse_grid(args.param)
+    if not grid:
+        raise SystemExit("at least one --param NAME=V1,V2,... is required")
+
+    from run_vision_pre_task4 import parse_args as parse_orchestrator_args
+
+    names = list(grid)
+    combos = [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+    sweep_dir = args.sweep_dir.resolve()
+    plans = []
+    for index, params in enumerate(combos, start=1):
+        artifact_dir = sweep_dir / f"run_{index:04d}"
+        run_args = _run_args(params, passthrough, artifact_dir)
+        try:
+            parse_orchestrator_args(run_args)
+        except SystemExit as error:
+            raise SystemExit(f"invalid run arguments for {params}: {' '.join(run_args)}") from error
+        plans.append((index, params, run_args, artifact_dir))
+
+    jobs = min(args.jobs, len(plans))
+    print(f"[vision-sweep] {len(plans)} runs over {', '.join(names)} with {jobs} parallel jobs -> {sweep_dir}")
+    started = time.monotonic()
+    rows: list[dict[str, Any]] = []
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(_execute, *plan, args.run_timeout_s) for plan in plans]
+        for future in as_completed(futures):
+            row = future.result()
+            rows.append(row)
+            settings = " ".join(f"{name}={row[name]}" for name in names)
+            print(f"[vision-sweep] {row['run']} {row['verdict']} {row['wall_time_s']:.2f}s {settings}", flush=True)
+    rows.sort(key=lambda row: row["run"])
+    elapsed_s = time.monotonic() - started
+
+    serial_s = sum(row["wall_time_s"] for row in rows)
+    meta = {
+        "grid": grid,
+        "passthrough_args": passthrough,
+        "jobs": jobs,
+        "elapsed_s": round(elapsed_s, 3),
+        "sum_run_wall_time_s": round(serial_s, 3),
+    }
+    csv_path, json_path = _write_tables(sweep_dir, names, rows, meta)
+    passed = sum(1 for row in rows if row["verdict"] == "PASS")
+    print(
+        f"[vision-sweep] completed {len(rows)} runs in {elapsed_s:.2f}s "
+        f"(sum of run wall times {serial_s:.2f}s, {passed} PASS)"
+    )
+    print(f"[vision-sweep] results: {csv_path}")
+    print(f"[vision-sweep] results: {json_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
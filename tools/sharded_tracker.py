@@ -0,0 +1,470 @@
+#!/usr/bin/env python3
+"""Shard ``InterceptTracker`` work across per-camera worker processes.
+
+Track state is per camera; the cross-camera state in the serial tracker is
+the track-id counter, the signature -> last camera map behind ``handoff``
+events, and the TTL sweep that expires tracks on every camera at each frame.
+Sharded mode therefore:
+
+- keeps the coordinator's per-frame work to routing: for adapter JSONL
+  (``run_lines``) it decodes only each line's ``timestamp`` and ``camera_id``
+  (``peek_frame_key``), counts drops in input order, and ships the raw line;
+  workers decode and validate the frame, build detections, track, and derive
+  ``lock_state_transition`` events
+- assigns each camera to one of ``shards`` worker processes (round-robin in
+  order of first appearance), each running its own ``InterceptTracker``
+- sends frames to workers in batches of up to ``batch_frames`` (all partial
+  batches are flushed every ``batch_frames`` dispatched frames, which bounds
+  how far the merge can lag the input; with ``idle_flush_s`` they are also
+  flushed, and the results emitted, whenever input stalls that long)
+- with a track TTL, tracks a watermark per shard: the oldest update time of
+  its live tracks (reported with every batch result) and of the frames still
+  in flight to it. Another shard gets an expiry tick at a frame only when that
+  watermark is older than the frame's TTL cutoff, i.e. when the serial sweep
+  could expire one of its tracks there; otherwise the sweep is a no-op
+- merges worker results back in input order, which is timestamp order for
+  the time-ordered streams the adapters produce, placing each frame's TTL
+  expiries from all shards in camera first-seen order
+- in the coordinator, renumbers track ids in order of first appearance and
+  recomputes ``handoff`` events from signature markers that workers leave at
+  the exact event position
+
+The merged ``(track_records, events)`` stream and the drop counts are
+identical to the serial tracker's, and an input line the serial tracker fails
+on fails the sharded run the same way once everything before it is emitted. A
+worker that raises or dies fails the run with a ``RuntimeError`` instead of
+leaving the coordinator waiting on it.
+
+The coordinator still touches every frame (key decode, pickling, id
+renumbering), so its per-frame cost bounds throughput whatever the shard
+count; ``bench_sharded_tracker.py`` reports that bound as ``coordinator_fps``.
+"""
+
+from __future__ import annotations
+
+import collections
+import math
+import multiprocessing
+import queue
+import traceback
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator
+
+from intercept_adapter_contract import FrameValidator, decode_tracker_frame, get_codec, peek_frame_key, record_drop
+from intercept_tracker import (
+    InterceptTracker,
+    TrackState,
+    SignatureHandoffs,
+    _append_lock_transitions,
+    _frame_to_detections,
+    _input_line_error,
+    _iter_frame_keys,
+    _iter_with_idle_marks,
+)
+from vision_clock import Clock
+from vision_diagnostics import Diagnostics
+
+_SIGNATURE_MARK = "_signature"
+_MAX_QUEUED_BATCHES = 4
+# How often a blocked coordinator checks that its workers are still alive.
+_WORKER_POLL_S = 0.5
+
+# ``payload`` is the normalized frame, ``(line_number, line)`` for
+# ``run_lines``, or ``None`` for an expiry tick: sweep TTLs at ``timestamp`` only.
+FrameInput = tuple[int, float, str, Any]
+
+
+class _ShardTracker(InterceptTracker):
+    """Worker-side tracker: leaves a signature marker where a handoff check belongs."""
+
+    def _note_signature(self, track: TrackState, camera_id: str, timestamp: float, events: list[dict[str, Any]]) -> None:
+        events.append({"event": _SIGNATURE_MARK, "track_id": track.track_id, "target_signature": track.target_signature})
+
+    def oldest_update(self) -> float:
+        """Earliest ``last_timestamp`` of any live track, ``inf`` without one."""
+        return min(
+            (track.last_timestamp for tracks in self._tracks_by_camera.values() for track in tracks.values()),
+            default=math.inf,
+        )
+
+
+@dataclass
+class _WorkerFailure:
+    traceback: str
+
+
+def _shard_worker(shard: int, options: dict[str, Any], lines: bool, inbox: Any, outbox: Any) -> None:
+    try:
+        tracker = _ShardTracker(**options)
+        codec = get_codec() if lines else None
+        last_lock_state_by_track: dict[str, str] = {}
+        while True:
+            batch: list[FrameInput] | None = inbox.get()
+            if batch is None:
+                break
+            results = []
+            for seq, timestamp, camera_id, payload in batch:
+                if payload is None:
+                    events = tracker.expire(timestamp)
+                    _append_lock_transitions([], events, timestamp, last_lock_state_by_track)
+                    results.append((seq, None, events))
+                    continue
+                if lines:
+                    line_number, line = payload
+                    payload = decode_tracker_frame(line, codec=codec, line_number=line_number)
+                    if payload is None:
+                        raise RuntimeError(f"input line {line_number} was routed to a shard but decodes to no frame")
+                detections = _frame_to_detections(payload)
+                if tracker.multi_target:
+                    outputs, events = tracker.update_multi(timestamp, camera_id, detections)
+                else:
+                    output, events = tracker.update(timestamp, camera_id, detections)
+                    outputs = [output]
+                _append_lock_transitions(outputs, events, timestamp, last_lock_state_by_track)
+                results.append((seq, outputs, events))
+            outbox.put((shard, results, tracker.oldest_update()))
+    except Exception:  # noqa: BLE001 - reported to the coordinator, which fails the run
+        outbox.put((shard, _WorkerFailure(traceback.format_exc()), None))
+        return
+    outbox.put(
+        (
+            shard,
+            {
+                "live_tracks": tracker.live_track_count,
+                "expired_tracks": tracker.expired_track_count,
+                "refused_tracks": tracker.refused_track_count,
+            },
+            None,
+        )
+    )
+
+
+def _iter_line_keys(
+    lines: Iterable[str], source_name: str, label: str, diagnostics: Diagnostics | None
+) -> Iterator[tuple[float, str, tuple[int, str]]]:
+    """Key adapter lines by ``(timestamp, camera_id)``, accepting, dropping and failing exactly like ``_iter_decoded_lines``."""
+    codec = get_codec()
+    validator = FrameValidator()
+    for line_number, raw_line in enumerate(lines, start=1):
+        line = raw_line.strip()
+        if not line:
+            continue
+        try:
+            raw = peek_frame_key(line, codec=codec)
+        except (TypeError, ValueError) as exc:
+            raise _input_line_error(exc, label, line_number) from exc
+        key, reason = validator.frame_key(raw)
+        if key is None:
+            record_drop(reason, raw, drops=diagnostics, source_name=source_name, line_number=line_number)
+            continue
+        yield key[0], key[1], (line_number, line)
+
+
+class ShardedTracking:
+    """Coordinator for ``shards`` tracker worker processes.
+
+    ``run(frames)`` and ``run_lines(lines)`` yield ``(track_records, events)``
+    per accepted frame, like ``intercept_tracker._iter_tracking_outputs`` over
+    normalized frames or over ``_iter_decoded_lines(lines)``.
+    ``live_track_count``, ``expired_track_count`` and ``refused_track_count``
+    are summed over workers once the run completes.
+    """
+
+    def __init__(self, options: dict[str, Any], shards: int, *, batch_frames: int = 64) -> None:
+        if shards < 1:
+            raise ValueError("shards must be >= 1")
+        self.options = options
+        self.shards = shards
+        self.batch_frames = max(1, batch_frames)
+        self.live_track_count = 0
+        self.expired_track_count = 0
+        self.refused_track_count = 0
+        self.frames_by_shard = [0] * shards
+        self.expiry_ticks = 0
+        self._shard_by_camera: dict[str, int] = {}
+        self._camera_rank: dict[str, int] = {}
+        # (shard, local id) -> global id for live tracks; pruned on track_expired.
+        self._track_ids: dict[tuple[int, str], str] = {}
+        self._next_track_index = 1
+        self._handoffs = SignatureHandoffs()
+
+    def _shard_for(self, camera_id: str) -> int:
+        shard = self._shard_by_camera.get(camera_id)
+        if shard is None:
+            self._camera_rank[camera_id] = len(self._shard_by_camera)
+            shard = self._shard_by_camera[camera_id] = len(self._shard_by_camera) % self.shards
+        return shard
+
+    def _global_id(self, shard: int, local_id: str) -> str:
+        key = (shard, local_id)
+        track_id = self._track_ids.get(key)
+        if track_id is None:
+            track_id = self._track_ids[key] = f"trk_{self._next_track_index:05d}"
+            self._next_track_index += 1
+        return track_id
+
+    def _place_expiries(
+        self, tagged: list[tuple[int, dict[str, Any]]], ticks: list[tuple[int, list[dict[str, Any]]]]
+    ) -> list[tuple[int, dict[str, Any]]]:
+        """Merge other shards' TTL expiries into the owner's leading sweep, in camera first-seen order."""
+        swept = 0
+        while swept < len(tagged) and tagged[swept][1]["event"] == "track_expired" and tagged[swept][1]["reason"] == "ttl":
+            swept += 1
+        expiries = tagged[:swept]
+        for shard, events in ticks:
+            expiries.extend((shard, event) for event in events)
+        rank = self._camera_rank
+        expiries.sort(key=lambda pair: rank[pair[1]["camera_id"]])
+        return expiries + tagged[swept:]
+
+    def _merge(
+        self,
+        shard: int,
+        timestamp: float,
+        camera_id: str,
+        outputs: list[dict[str, Any]],
+        events: list[dict[str, Any]],
+        ticks: list[tuple[int, list[dict[str, Any]]]],
+    ) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+        track_ids = self._track_ids
+        global_id = self._global_id
+        for output in outputs:
+            local_id = output["track_id"]
+            if local_id:
+                output["track_id"] = track_ids.get((shard, local_id)) or global_id(shard, local_id)
+        if not events and not ticks:
+            return outputs, events
+        tagged = [(shard, event) for event in events]
+        if ticks:
+            tagged = self._place_expiries(tagged, ticks)
+        merged_events: list[dict[str, Any]] = []
+        for source, event in tagged:
+            local_id = event["track_id"]
+            track_id = track_ids.get((source, local_id)) or global_id(source, local_id)
+            if event["event"] == _SIGNATURE_MARK:
+                handoff = self._handoffs.note(timestamp, track_id, event["target_signature"], camera_id)
+                if handoff is not None:
+                    merged_events.append(handoff)
+                continue
+            if event["event"] == "track_expired":
+                self._handoffs.forget(track_id)
+                del track_ids[(source, local_id)]
+            event["track_id"] = track_id
+            merged_events.append(event)
+        return outputs, merged_events
+
+    def run(
+        self,
+        frame_iter: Iterable[dict[str, Any]],
+        diagnostics: Diagnostics | None = None,
+        *,
+        idle_flush_s: float | None = None,
+        on_idle: Callable[[], None] | None = None,
+        clock: Clock | None = None,
+    ) -> Iterator[tuple[list[dict[str, Any]], list[dict[str, Any]]]]:
+        """Track normalized ``frame_iter``; workers parse the detections.
+
+        With ``idle_flush_s``, partial batches are flushed whenever input stalls
+        that long, and ``on_idle`` is called once everything received so far has
+        been yielded. ``clock`` stamps frames that arrive without a timestamp,
+        as in ``_iter_tracking_outputs``.
+        """
+        keyed = _iter_frame_keys(frame_iter, diagnostics, clock)
+        return self._run(keyed, False, idle_flush_s, on_idle)
+
+    def run_lines(
+        self,
+        lines: Iterable[str],
+        diagnostics: Diagnostics | None = None,
+        *,
+        source_name: str = "adapter_stream",
+        label: str | None = None,
+        idle_flush_s: float | None = None,
+        on_idle: Callable[[], None] | None = None,
+    ) -> Iterator[tuple[list[dict[str, Any]], list[dict[str, Any]]]]:
+        """Track adapter JSONL ``lines``, decoded and validated in the workers.
+
+        Drops are counted and bad lines fail exactly as in ``_iter_decoded_lines``;
+        ``idle_flush_s`` and ``on_idle`` work as in ``run``.
+        """
+        keyed = _iter_line_keys(lines, source_name, label or source_name, diagnostics)
+        return self._run(keyed, True, idle_flush_s, on_idle)
+
+    def _run(
+        self,
+        keyed: Iterable[tuple[float, str, Any]],
+        lines: bool,
+        idle_flush_s: float | None,
+        on_idle: Callable[[], None] | None,
+    ) -> Iterator[tuple[list[dict[str, Any]], list[dict[str, Any]]]]:
+        outbox: Any = multiprocessing.Queue()
+        inboxes = [multiprocessing.Queue(maxsize=_MAX_QUEUED_BATCHES) for _ in range(self.shards)]
+        workers = [
+            multiprocessing.Process(
+                target=_shard_worker,
+                args=(shard, self.options, lines, inboxes[shard], outbox),
+                name=f"tracker-shard-{shard}",
+                daemon=True,
+            )
+            for shard in range(self.shards)
+        ]
+        for worker in workers:
+            worker.start()
+
+        pending: list[list[FrameInput]] = [[] for _ in range(self.shards)]
+        frame_meta: dict[int, tuple[int, float, str]] = {}
+        # Per frame: the owner's (outputs, events), other shards' non-empty tick
+        # events, and how many shard results are still missing.
+        ready: dict[int, list[Any]] = {}
+        next_seq = 0
+        finished: set[int] = set()
+        ttl = self.options.get("track_ttl_s")
+        # Per shard: no live track is older than ``watermark``. It is the
+        # oldest update the shard reported with its last result, lowered by
+        # the (seq, timestamp) of frames sent to it since (``in_flight``).
+        watermark = [math.inf] * self.shards
+        in_flight: list[collections.deque[tuple[int, float]]] = [collections.deque() for _ in range(self.shards)]
+        # While timestamps never decrease, each camera's tracks stay ordered by
+        # update time, so a sweep leaves no track older than its cutoff; the
+        # last such cutoff per shard also bounds its watermark from below.
+        swept_to = [-math.inf] * self.shards
+        ordered = True
+        latest = -math.inf
+
+        def _check_workers() -> None:
+            for shard, worker in enumerate(workers):
+                if shard in finished or worker.is_alive():
+                    continue
+                # A worker that exited cleanly flushed its stats first; pick them up.
+                _collect(block=False)
+                if shard not in finished:
+                    raise RuntimeError(f"tracker shard {shard} exited unexpectedly (exit code {worker.exitcode})")
+
+        def _put(shard: int, item: list[FrameInput] | None) -> None:
+            while True:
+                try:
+                    inboxes[shard].put(item, timeout=_WORKER_POLL_S)
+                    return
+                except queue.Full:
+                    _check_workers()
+
+        def _send(shard: int) -> None:
+            if pending[shard]:
+                _put(shard, pending[shard])
+                pending[shard] = []
+
+        def _collect(block: bool) -> None:
+            while True:
+                try:
+                    shard, payload, oldest = outbox.get(block=block, timeout=_WORKER_POLL_S if block else None)
+                except queue.Empty:
+                    if not block:
+                        return
+                    _check_workers()
+                    continue
+                if isinstance(payload, _WorkerFailure):
+                    raise RuntimeError(f"tracker shard {shard} failed:\n{payload.traceback}")
+                if isinstance(payload, dict):
+                    finished.add(shard)
+                    self.live_track_count += payload["live_tracks"]
+                    self.expired_track_count += payload["expired_tracks"]
+                    self.refused_track_count += payload["refused_tracks"]
+                else:
+                    for seq, outputs, events in payload:
+                        entry = ready[seq]
+                        if outputs is not None:
+                            entry[0] = (outputs, events)
+                        elif events:
+                            entry[1].append((shard, events))
+                        entry[2] -= 1
+                    flight = in_flight[shard]
+                    while flight and flight[0][0] <= seq:
+                        flight.popleft()
+                    oldest = min(oldest, min((timestamp for _, timestamp in flight), default=math.inf))
+                    watermark[shard] = max(oldest, swept_to[shard])
+                if block:
+                    return
+
+        def _emit() -> Iterator[tuple[list[dict[str, Any]], list[dict[str, Any]]]]:
+            nonlocal next_seq
+            while next_seq in ready and ready[next_seq][2] == 0:
+                (outputs, events), ticks, _ = ready.pop(next_seq)
+                shard, timestamp, camera_id = frame_meta.pop(next_seq)
+                next_seq += 1
+                yield self._merge(shard, timestamp, camera_id, outputs, events, ticks)
+
+        def _drain(upto: int) -> Iterator[tuple[list[dict[str, Any]], list[dict[str, Any]]]]:
+            """Hand every partial batch over and yield all frames before ``upto``."""
+            for shard in range(self.shards):
+                _send(shard)
+            while next_seq < upto:
+                _collect(block=True)
+                yield from _emit()
+
+        items: Iterator[Any] = iter(keyed)
+        if idle_flush_s is not None:
+            items = _iter_with_idle_marks(items, idle_flush_s)
+        end = object()
+        try:
+            seq = 0
+            while True:
+                try:
+                    item = next(items, end)
+                except (Exception, SystemExit):
+                    # Bad input: emit what came before it, as the serial tracker would, then fail the same way.
+                    yield from _drain(seq)
+                    raise
+                if item is end:
+                    break
+                if item is None:
+                    # Input stalled: emit everything received so far.
+                    yield from _drain(seq)
+                    if on_idle is not None:
+                        on_idle()
+                    continue
+                timestamp, camera_id, payload = item
+                shard = self._shard_for(camera_id)
+                frame_meta[seq] = (shard, timestamp, camera_id)
+                pending[shard].append((seq, timestamp, camera_id, payload))
+                self.frames_by_shard[shard] += 1
+                entry = ready[seq] = [None, [], 1]
+                if ttl is not None:
+                    if ordered and timestamp < latest:
+                        ordered = False
+                        swept_to[:] = [-math.inf] * self.shards
+                    latest = timestamp
+                    in_flight[shard].append((seq, timestamp))
+                    if timestamp < watermark[shard]:
+                        watermark[shard] = timestamp
+                    cutoff = timestamp - ttl
+                    for other, oldest in enumerate(watermark):
+                        if other != shard:
+                            if oldest >= cutoff:
+                                continue
+                            # The serial sweep at this frame may expire one of its tracks.
+                            pending[other].append((seq, timestamp, camera_id, None))
+                            entry[2] += 1
+                            self.expiry_ticks += 1
+                        if ordered:
+                            swept_to[other] = cutoff
+                            watermark[other] = max(oldest, cutoff)
+                seq += 1
+                if len(pending[shard]) >= self.batch_frames:
+                    _send(shard)
+                if seq % self.batch_frames == 0:
+                    for other in range(self.shards):
+                        _send(other)
+                    _collect(block=False)
+                    yield from _emit()
+            for shard in range(self.shards):
+                _send(shard)
+                _put(shard, None)
+            while len(finished) < self.shards:
+                _collect(block=True)
+                yield from _emit()
+            yield from _emit()
+        finally:
+            for shard, worker in enumerate(workers):
+                if worker.is_alive() and shard not in finished:
+                    worker.terminate()
+                worker.join(timeout=5.0)
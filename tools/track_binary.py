@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""Compact binary encoding of the intercept tracker track/event contract.
+
+The binary format carries exactly the fields of the JSONL contract in
+``docs/intercept_tracker_contract.md`` using fixed-width little-endian
+records, so multi-hour recordings stay small and fast to re-parse.
+
+File layout:
+- header (8 bytes): magic ``b"TRKB"``, schema version (u16), reserved (u16)
+- a sequence of tagged frames:
+  - ``b"S"`` string dictionary entry: index (u32), length (u16), UTF-8 bytes.
+    Camera ids, track ids and target signatures are written once, the first
+    time they appear, and referenced by index afterwards. Entries are inline
+    rather than in the header so files stay appendable and tailable.
+  - ``b"R"`` track record (``TRACK`` struct)
+  - ``b"E"`` event record (``EVENT`` struct)
+
+Bboxes, centroids and timestamps are float64 (lossless for JSON floats);
+confidence and lock quality are float32, exact for the contract's 4-decimal
+values in ``[0, 1]``.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+from pathlib import Path
+from typing import Any, Iterator
+
+from jsonl_writer import BufferedJsonlWriter, BufferedRecordWriter
+
+MAGIC = b"TRKB"
+VERSION = 1
+HEADER = struct.Struct("<4sHH")
+STRING = struct.Struct("<IH")
+# timestamp, track id ref, camera ref, lock state, flags, bbox x4, centroid x2, confidence, lock quality
+TRACK = struct.Struct("<dIIBB4d2dff")
+# timestamp, event code, track ref, camera ref, other camera ref, signature ref,
+# from state, to state, reason, lock quality, last timestamp, seen count
+EVENT = struct.Struct("<dBIIIIBBBfdI")
+TAG_STRING = ord("S")
+TAG_TRACK = ord("R")
+TAG_EVENT = ord("E")
+NO_REF = 0xFFFFFFFF
+BINARY_SUFFIX = ".bin"
+OUTPUT_FORMATS = ("auto", "jsonl", "bin")
+
+LOCK_STATES = ("SEARCHING", "TRACKING", "LOCKED")
+EVENT_TYPES = ("handoff", "lock_state_transition", "track_expired")
+EXPIRY_REASONS = ("ttl", "capacity")
+FLAG_HAS_BBOX = 0x01
+
+
+def _code(table: tuple[str, ...], value: Any, field: str) -> int:
+    try:
+        return table.index(str(value))
+    except ValueError as exc:
+        raise ValueError(f"unsupported {field} {value!r} for binary track format") from exc
+
+
+def is_binary_path(path: Path) -> bool:
+    """True when ``path`` uses the binary suffix or already starts with the binary magic."""
+    if path.suffix == BINARY_SUFFIX:
+        return True
+    try:
+        with path.open("rb") as handle:
+            return handle.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+class BinaryTrackEncoder:
+    """Stateful encoder: turns contract dicts into binary frames, emitting dictionary entries on first use."""
+
+    def __init__(self) -> None:
+        self._refs: dict[str, int] = {}
+        # Strings first used by the record being encoded; kept only if it encodes.
+        self._new_refs: dict[str, int] = {}
+
+    def restore(self, strings: list[str]) -> None:
+        self._refs = {value: index for index, value in enumerate(strings)}
+        self._new_refs = {}
+
+    def _ref(self, value: Any, out: list[bytes]) -> int:
+        if value is None:
+            return NO_REF
+        text = str(value)
+        ref = self._refs.get(text)
+        if ref is None:
+            ref = self._new_refs.get(text)
+        if ref is None:
+            ref = len(self._refs) + len(self._new_refs)
+            encoded = text.encode("utf-8")
+            out.append(bytes((TAG_STRING,)) + STRING.pack(ref, len(encoded)) + encoded)
+            self._new_refs[text] = ref
+        return ref
+
+    def encode(self, record: dict[str, Any]) -> bytes:
+        """Encode one record; a record that raises leaves the string dictionary unchanged."""
+        out: list[bytes] = []
+        try:
+            if "event" in record:
+                out.append(bytes((TAG_EVENT,)) + self._encode_event(record, out))
+            else:
+                out.append(bytes((TAG_TRACK,)) + self._encode_track(record, out))
+        except BaseException:
+            self._new_refs.clear()
+            raise
+        self._refs.update(self._new_refs)
+        self._new_refs.clear()
+        return b"".join(out)
+
+    def _encode_track(self, record: dict[str, Any], out: list[bytes]) -> bytes:
+        track_ref = self._ref(record.get("track_id"), out)
+        camera_ref = self._ref(record.get("camera_id"), out)
+        bbox = record.get("bbox")
+        centroid = record.get("centroid")
+        flags = 0
+        if bbox is not None:
+            flags |= FLAG_HAS_BBOX
+        else:
+            bbox = (0.0, 0.0, 0.0, 0.0)
+        if centroid is None:
+            centroid = (0.0, 0.0)
+        return TRACK.pack(
+            float(record["timestamp"]),
+            track_ref,
+            camera_ref,
+            _code(LOCK_STATES, record.get("lock_state", "SEARCHING"), "lock_state"),
+            flags,
+            *(float(v) for v in bbox),
+            *(float(v) for v in centroid),
+            float(record.get("confidence", 0.0)),
+            float(record.get("lock_quality", 0.0)),
+        )
+
+    def _encode_event(self, record: dict[str, Any], out: list[bytes]) -> bytes:
+        kind = record["event"]
+        code = _code(EVENT_TYPES, kind, "event")
+        track_ref = self._ref(record.get("track_id"), out)
+        camera_ref = other_ref = signature_ref = NO_REF
+        from_state = to_state = reason = 0
+        lock_quality = 0.0
+        last_timestamp = 0.0
+        seen_count = 0
+        if kind == "handoff":
+            signature_ref = self._ref(record.get("target_signature"), out)
+            camera_ref = self._ref(record.get("from_camera"), out)
+            other_ref = self._ref(record.get("to_camera"), out)
+        elif kind == "lock_state_transition":
+            from_state = _code(LOCK_STATES, record.get("from"), "lock_state")
+            to_state = _code(LOCK_STATES, record.get("to"), "lock_state")
+            lock_quality = float(record.get("lock_quality", 0.0))
+        else:
+            camera_ref = self._ref(record.get("camera_id"), out)
+            signature_ref = self._ref(record.get("target_signature"), out)
+            last_timestamp = float(record.get("last_timestamp", 0.0))
+            seen_count = int(record.get("seen_count", 0))
+            reason = _code(EXPIRY_REASONS, record.get("reason"), "reason")
+        return EVENT.pack(
+            float(record["timestamp"]),
+            code,
+            track_ref,
+            camera_ref,
+            other_ref,
+            signature_ref,
+            from_state,
+            to_state,
+            reason,
+            lock_quality,
+            last_timestamp,
+            seen_count,
+        )
+
+
+class BinaryTrackDecoder:
+    """Incremental decoder: ``feed`` raw bytes, get back complete contract dicts.
+
+    Partial frames are kept until the rest arrives, so it can follow a file
+    that is still being written.
+    """
+
+    def __init__(self) -> None:
+        self.strings: list[str] = []
+        self._buffer = b""
+        self._header_seen = False
+
+    def feed(self, data: bytes) -> list[dict[str, Any]]:
+        buffer = self._buffer + data
+        offset = 0
+        records: list[dict[str, Any]] = []
+        if not self._header_seen:
+            if len(buffer) < HEADER.size:
+                self._buffer = buffer
+                return records
+            magic, version, _reserved = HEADER.unpack_from(buffer, 0)
+            if magic != MAGIC:
+                raise ValueError("not a binary track file (bad magic)")
+            if version != VERSION:
+                raise ValueError(f"unsupported binary track schema version {version}")
+            self._header_seen = True
+            offset = HEADER.size
+
+        size = len(buffer)
+        while offset < size:
+            tag = buffer[offset]
+            body = offset + 1
+            if tag == TAG_STRING:
+                if body + STRING.size > size:
+                    break
+                index, length = STRING.unpack_from(buffer, body)
+                end = body + STRING.size + length
+                if end > size:
+                    break
+                value = buffer[body + STRING.size : end].decode("utf-8")
+                if index != len(self.strings):
+                    raise ValueError(f"binary track dictionary out of order at entry {index}")
+                self.strings.append(value)
+            elif tag == TAG_TRACK:
+                end = body + TRACK.size
+                if end > size:
+                    break
+                records.append(self._decode_track(TRACK.unpack_from(buffer, body)))
+            elif tag == TAG_EVENT:
+                end = body + EVENT.size
+                if end > size:
+                    break
+                records.append(self._decode_event(EVENT.unpack_from(buffer, body)))
+            else:
+                raise ValueError(f"corrupt binary track stream: unknown tag {tag!r} at byte {offset}")
+            offset = end
+
+        self._buffer = buffer[offset:]
+        return records
+
+    @property
+    def pending_bytes(self) -> int:
+        return len(self._buffer)
+
+    def _string(self, ref: int) -> str | None:
+        return None if ref == NO_REF else self.strings[ref]
+
+    def _decode_track(self, fields: tuple[Any, ...]) -> dict[str, Any]:
+        (timestamp, track_ref, camera_ref, lock_state, flags, x1, y1, x2, y2, cx, cy, confidence, lock_quality) = fields
+        has_bbox = bool(flags & FLAG_HAS_BBOX)
+        return {
+            "timestamp": timestamp,
+            "camera_id": self._string(camera_ref),
+            "bbox": [x1, y1, x2, y2] if has_bbox else None,
+            "centroid": [cx, cy] if has_bbox else None,
+            "confidence": round(confidence, 4),
+            "track_id": self._string(track_ref),
+            "lock_state": LOCK_STATES[lock_state],
+            "lock_quality": round(lock_quality, 4),
+        }
+
+    def _decode_event(self, fields: tuple[Any, ...]) -> dict[str, Any]:
+        (
+            timestamp,
+            code,
+            track_ref,
+            camera_ref,
+            other_ref,
+            signature_ref,
+            from_state,
+            to_state,
+            reason,
+            lock_quality,
+            last_timestamp,
+            seen_count,
+        ) = fields
+        kind = EVENT_TYPES[code]
+        record: dict[str, Any] = {"timestamp": timestamp, "event": kind, "track_id": self._string(track_ref)}
+        if kind == "handoff":
+            record["target_signature"] = self._string(signature_ref)
+            record["from_camera"] = self._string(camera_ref)
+            record["to_camera"] = self._string(other_ref)
+        elif kind == "lock_state_transition":
+            record["from"] = LOCK_STATES[from_state]
+            record["to"] = LOCK_STATES[to_state]
+            record["lock_quality"] = round(lock_quality, 4)
+        else:
+            record["camera_id"] = self._string(camera_ref)
+            record["target_signature"] = self._string(signature_ref)
+            record["last_timestamp"] = last_timestamp
+            record["seen_count"] = seen_count
+            record["reason"] = EXPIRY_REASONS[reason]
+        return record
+
+
+def iter_binary_records(
+    path: Path, *, decoder: BinaryTrackDecoder | None = None, chunk_size: int = 1 << 16
+) -> Iterator[dict[str, Any]]:
+    """Decode a complete binary track file; a trailing partial frame is an error."""
+    decoder = decoder or BinaryTrackDecoder()
+    with path.open("rb") as handle:
+        while True:
+            chunk = handle.read(chunk_size)
+            if not chunk:
+                break
+            yield from decoder.feed(chunk)
+    if decoder.pending_bytes:
+        raise ValueError(f"truncated binary track file: {path} ({decoder.pending_bytes} trailing bytes)")
+
+
+class BinaryTrackWriter(BufferedRecordWriter):
+    """Binary counterpart of ``jsonl_writer.BufferedJsonlWriter`` with the same interface."""
+
+    kind = "binary track"
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        flush_rows: int = 1,
+        flush_interval_s: float = 0.0,
+        fsync: bool = False,
+        truncate: bool = False,
+    ) -> None:
+        super().__init__(path, flush_rows=flush_rows, flush_interval_s=flush_interval_s, fsync=fsync)
+        self._encoder = BinaryTrackEncoder()
+        if not truncate and path.exists() and path.stat().st_size > 0:
+            # Appending: rebuild the string dictionary written so far.
+            decoder = BinaryTrackDecoder()
+            for _ in iter_binary_records(path, decoder=decoder):
+                pass
+            self._encoder.restore(decoder.strings)
+            self._handle = path.open("ab")
+        else:
+            self._handle = path.open("wb")
+            self._handle.write(HEADER.pack(MAGIC, VERSION, 0))
+            self._handle.flush()
+
+    def _encode(self, record: dict[str, Any]) -> bytes:
+        return self._encoder.encode(record)
+
+    def _join(self, pending: list[bytes]) -> tuple[bytes, int]:
+        chunk = b"".join(pending)
+        return chunk, len(chunk)
+
+
+def open_record_writer(
+    path: Path, output_format: str = "auto", **options: Any
+) -> BufferedJsonlWriter | BinaryTrackWriter:
+    """Open a JSONL or binary writer for ``path``; ``auto`` picks binary for the ``.bin`` suffix."""
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"unknown track output format {output_format!r}")
+    if output_format == "bin" or (output_format == "auto" and path.suffix == BINARY_SUFFIX):
+        return BinaryTrackWriter(path, **options)
+    return BufferedJsonlWriter(path, **options)
+
+
+def iter_record_file(path: Path) -> Iterator[dict[str, Any]]:
+    """Iterate records of a finished JSONL or binary track/event file (blank JSONL lines skipped)."""
+    if is_binary_path(path):
+        yield from iter_binary_records(path)
+        return
+    with path.open("r", encoding="utf-8") as handle:
+        for line in handle:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
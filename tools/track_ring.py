@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""Shared-memory ring buffer transport for intercept tracker records.
+
+One writer (``intercept_tracker.py --publish-shm``) publishes fixed-size track
+records into a ``multiprocessing.shared_memory`` segment; any number of
+readers (``guidance_advisory.py --tracks-shm``) consume them without locks and
+without ever blocking the writer.
+
+Segment layout (little endian):
+- header (24 bytes): magic ``b"TRK1"``, version, record size, capacity,
+  camera slots, closed flag, write index (records published so far)
+- camera table: ``camera_slots`` x 32-byte UTF-8 camera ids, filled in order
+  of first appearance and referenced by index from each record. Records for
+  a longer id, or for a camera past the table's end, are skipped and counted
+  in ``rejected`` rather than truncated or failing the writer
+- ``capacity`` record slots of ``RECORD.size`` bytes
+
+Each slot starts with a sequence word used as a seqlock: record ``n`` is
+being written while the word is ``2n + 1`` and is complete once it is
+``2n + 2``. A reader that falls more than ``capacity`` records behind, or
+sees a slot change under it, skips ahead and counts the lost records in
+``overruns``.
+"""
+
+from __future__ import annotations
+
+import struct
+import sys
+import time
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any
+
+MAGIC = b"TRK1"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIH")
+CLOSED_OFFSET = 15
+WRITE_INDEX = struct.Struct("<Q")
+WRITE_INDEX_OFFSET = 16
+HEADER_SIZE = 24
+CAMERA_ID_BYTES = 32
+SEQ = struct.Struct("<Q")
+# seq, timestamp, track number, camera index, lock state, flags, bbox x4, confidence, lock quality
+RECORD = struct.Struct("<QdIHBB4fff")
+
+LOCK_STATES = ("SEARCHING", "TRACKING", "LOCKED")
+_LOCK_STATE_CODES = {name: code for code, name in enumerate(LOCK_STATES)}
+FLAG_HAS_BBOX = 0x01
+FLAG_HAS_TRACK = 0x02
+TRACK_ID_PREFIX = "trk_"
+
+
+def _segment_size(capacity: int, camera_slots: int) -> int:
+    return HEADER_SIZE + camera_slots * CAMERA_ID_BYTES + capacity * RECORD.size
+
+
+def _track_number(track_id: Any) -> int | None:
+    if not isinstance(track_id, str) or not track_id.startswith(TRACK_ID_PREFIX):
+        return None
+    try:
+        return int(track_id[len(TRACK_ID_PREFIX) :])
+    except ValueError:
+        return None
+
+
+class TrackRingWriter:
+    def __init__(self, name: str, *, capacity: int = 4096, camera_slots: int = 64) -> None:
+        if capacity <= 0 or camera_slots <= 0:
+            raise ValueError("capacity and camera_slots must be > 0")
+        self.name = name
+        self.capacity = capacity
+        self.camera_slots = camera_slots
+        size = _segment_size(capacity, camera_slots)
+        try:
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Stale segment from an earlier crashed run; replace it.
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self._buf = self._shm.buf
+        HEADER.pack_into(self._buf, 0, MAGIC, VERSION, RECORD.size, capacity, camera_slots)
+        self._buf[CLOSED_OFFSET] = 0
+        WRITE_INDEX.pack_into(self._buf, WRITE_INDEX_OFFSET, 0)
+        self._records_offset = HEADER_SIZE + camera_slots * CAMERA_ID_BYTES
+        self._camera_index: dict[str, int | None] = {}
+        self._cameras_placed = 0
+        self.published = 0
+        self.rejected = 0
+
+    def _camera(self, camera_id: str) -> int | None:
+        """Camera table index for ``camera_id``; ``None`` (warned about once) if it cannot get a slot."""
+        index = self._camera_index.get(camera_id, -1)
+        if index != -1:
+            return index
+        encoded = camera_id.encode("utf-8")
+        if len(encoded) > CAMERA_ID_BYTES:
+            # Truncating could map two cameras onto one id on the reader side.
+            problem = f"exceeds the {CAMERA_ID_BYTES}-byte camera slot"
+        elif self._cameras_placed >= self.camera_slots:
+            problem = f"does not fit the full camera table ({self.camera_slots} cameras)"
+        else:
+            problem = None
+        if problem is not None:
+            print(f"[track-ring] camera id {camera_id!r} {problem}; skipping its records", file=sys.stderr)
+            self._camera_index[camera_id] = None
+            return None
+        index = self._cameras_placed
+        self._cameras_placed += 1
+        offset = HEADER_SIZE + index * CAMERA_ID_BYTES
+        self._buf[offset : offset + CAMERA_ID_BYTES] = encoded.ljust(CAMERA_ID_BYTES, b"\0")
+        self._camera_index[camera_id] = index
+        return index
+
+    def publish(self, record: dict[str, Any]) -> bool:
+        """Publish one tracker output record (the JSONL track contract shape).
+
+        Returns ``False``, counting the record in ``rejected``, when its camera
+        cannot be placed in the camera table.
+        """
+        camera = self._camera(str(record.get("camera_id", "unknown_camera")))
+        if camera is None:
+            self.rejected += 1
+            return False
+        bbox = record.get("bbox")
+        track_number = _track_number(record.get("track_id"))
+        flags = 0
+        if bbox is not None:
+            flags |= FLAG_HAS_BBOX
+        else:
+            bbox = (0.0, 0.0, 0.0, 0.0)
+        if track_number is not None:
+            flags |= FLAG_HAS_TRACK
+        else:
+            track_number = 0
+
+        n = self.published
+        offset = self._records_offset + (n % self.capacity) * RECORD.size
+        SEQ.pack_into(self._buf, offset, 2 * n + 1)
+        RECORD.pack_into(
+            self._buf,
+            offset,
+            2 * n + 1,
+            float(record.get("timestamp", 0.0)),
+            track_number,
+            camera,
+            _LOCK_STATE_CODES.get(str(record.get("lock_state")), 0),
+            flags,
+            *(float(v) for v in bbox),
+            float(record.get("confidence", 0.0)),
+            float(record.get("lock_quality", 0.0)),
+        )
+        SEQ.pack_into(self._buf, offset, 2 * n + 2)
+        self.published = n + 1
+        WRITE_INDEX.pack_into(self._buf, WRITE_INDEX_OFFSET, self.published)
+        return True
+
+    def close(self, *, unlink: bool = True) -> None:
+        """Mark the stream finished; attached readers drain what is left.
+
+        With ``unlink=False`` the segment outlives this process so late readers
+        can still attach; the caller then owns removal via ``unlink_ring``.
+        """
+        if self._buf is None:
+            return
+        self._buf[CLOSED_OFFSET] = 1
+        self._buf = None
+        self._shm.close()
+        if unlink:
+            self._shm.unlink()
+        else:
+            resource_tracker.unregister(self._shm._name, "shared_memory")  # noqa: SLF001
+
+
+def unlink_ring(name: str) -> bool:
+    """Remove a ring segment left behind by ``TrackRingWriter.close(unlink=False)``."""
+    try:
+        shm = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return False
+    shm.close()
+    shm.unlink()
+    return True
+
+
+class TrackRingReader:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._shm = shared_memory.SharedMemory(name=name)
+        # Readers do not own the segment; keep the resource tracker from
+        # unlinking it when this process exits.
+        resource_tracker.unregister(self._shm._name, "shared_memory")  # noqa: SLF001
+        self._buf = self._shm.buf
+        magic, version, record_size, capacity, camera_slots = HEADER.unpack_from(self._buf, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            self._shm.close()
+            raise ValueError(f"shared memory {name!r} is not a v{VERSION} track ring")
+        self.capacity = capacity
+        self.camera_slots = camera_slots
+        self._records_offset = HEADER_SIZE + camera_slots * CAMERA_ID_BYTES
+        self._camera_names: dict[int, str] = {}
+        self.read_index = 0
+        self.overruns = 0
+
+    @classmethod
+    def attach(cls, name: str, *, timeout_s: float, poll_interval_s: float = 0.05) -> TrackRingReader:
+        """Attach to ``name``, waiting up to ``timeout_s`` for the writer to create it."""
+        deadline = time.monotonic() + max(0.0, timeout_s)
+        while True:
+            try:
+                return cls(name)
+            except FileNotFoundError:
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(poll_interval_s)
+
+    @property
+    def write_index(self) -> int:
+        return WRITE_INDEX.unpack_from(self._buf, WRITE_INDEX_OFFSET)[0]
+
+    @property
+    def writer_closed(self) -> bool:
+        return bool(self._buf[CLOSED_OFFSET])
+
+    def drained(self) -> bool:
+        return self.writer_closed and self.read_index >= self.write_index
+
+    def _camera_name(self, index: int) -> str:
+        name = self._camera_names.get(index)
+        if name is None:
+            offset = HEADER_SIZE + index * CAMERA_ID_BYTES
+            name = bytes(self._buf[offset : offset + CAMERA_ID_BYTES]).rstrip(b"\0").decode("utf-8", "replace")
+            self._camera_names[index] = name
+        return name
+
+    def read_available(self, max_rows: int | None = None) -> list[dict[str, Any]]:
+        """Return every complete record published since the last call (oldest first)."""
+        rows: list[dict[str, Any]] = []
+        write_index = self.write_index
+        if write_index - self.read_index > self.capacity:
+            lost = write_index - self.capacity - self.read_index
+            self.overruns += lost
+            self.read_index += lost
+        while self.read_index < write_index and (max_rows is None or len(rows) < max_rows):
+            n = self.read_index
+            offset = self._records_offset + (n % self.capacity) * RECORD.size
+            expected = 2 * n + 2
+            fields = RECORD.unpack_from(self._buf, offset)
+            if fields[0] != expected or SEQ.unpack_from(self._buf, offset)[0] != expected:
+                if fields[0] < expected:
+                    break  # not finished yet; try again on the next call
+                # Slot already reused by a newer record: we were lapped.
+                self.overruns += 1
+                self.read_index += 1
+                continue
+            rows.append(self._decode(fields))
+            self.read_index += 1
+        return rows
+
+    def _decode(self, fields: tuple[Any, ...]) -> dict[str, Any]:
+        _seq, timestamp, track_number, camera, lock_state, flags, x1, y1, x2, y2, confidence, lock_quality = fields
+        has_bbox = bool(flags & FLAG_HAS_BBOX)
+        return {
+            "timestamp": timestamp,
+            "camera_id": self._camera_name(camera),
+            "bbox": [round(x1, 4), round(y1, 4), round(x2, 4), round(y2, 4)] if has_bbox else None,
+            "centroid": [round((x1 + x2) / 2.0, 4), round((y1 + y2) / 2.0, 4)] if has_bbox else None,
+            "confidence": round(confidence, 4),
+            "track_id": f"{TRACK_ID_PREFIX}{track_number:05d}" if flags & FLAG_HAS_TRACK else None,
+            "lock_state": LOCK_STATES[lock_state] if lock_state < len(LOCK_STATES) else "SEARCHING",
+            "lock_quality": round(lock_quality, 4),
+        }
+
+    def close(self) -> None:
+        if self._buf is None:
+            return
+        self._buf = None
+        self._shm.close()
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""Vehicle side of the MAVLink mission micro-protocol for ``qgc_virtual_px4.py``.
+
+``MissionServer`` stores one item list per mission type (mission, fence,
+rally) and answers the GCS the way PX4 does:
+
+- upload: ``MISSION_COUNT`` -> ``MISSION_REQUEST_INT`` for each sequence
+  number -> ``MISSION_ACK``. The vehicle drives the transfer and re-requests
+  the item it is waiting for every ``MISSION_RETRY_S``; a transfer without
+  progress for ``MISSION_TIMEOUT_S`` is cancelled.
+- download: ``MISSION_REQUEST_LIST`` -> ``MISSION_COUNT``, then one
+  ``MISSION_ITEM_INT`` per ``MISSION_REQUEST_INT`` / ``MISSION_REQUEST``
+  until the GCS sends ``MISSION_ACK``.
+- ``MISSION_CLEAR_ALL`` empties a list, or every list for ``MAV_MISSION_TYPE_ALL``.
+
+Every response can be delayed by ``item_latency_s`` and every mission
+message, in either direction, dropped with probability ``loss``, so a GCS's
+retry logic is exercised without a radio. Each transfer is recorded as a
+``MissionTransfer`` with its duration, throughput, re-requests and drops.
+
+The server does not own the link: the stub feeds it messages with
+``handle`` and calls ``service`` from its loop, which flushes delayed
+responses and returns the next time it needs to run.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from pymavlink import mavutil
+
+MISSION_RETRY_S = 0.25
+MISSION_TIMEOUT_S = 5.0
+
+MISSION_MESSAGES = frozenset(
+    {
+        "MISSION_COUNT",
+        "MISSION_ITEM_INT",
+        "MISSION_REQUEST_LIST",
+        "MISSION_REQUEST_INT",
+        "MISSION_REQUEST",
+        "MISSION_ACK",
+        "MISSION_CLEAR_ALL",
+    }
+)
+
+
+@dataclass(frozen=True)
+class MissionItem:
+    frame: int
+    command: int
+    autocontinue: int
+    param1: float
+    param2: float
+    param3: float
+    param4: float
+    x: int
+    y: int
+    z: float
+
+    @classmethod
+    def from_message(cls, message: Any) -> "MissionItem":
+        return cls(
+            message.frame,
+            message.command,
+            message.autocontinue,
+            message.param1,
+            message.param2,
+            message.param3,
+            message.param4,
+            message.x,
+            message.y,
+            message.z,
+        )
+
+
+@dataclass
+class MissionTransfer:
+    direction: str  # "upload" (GCS -> vehicle) or "download"
+    mission_type: int
+    count: int
+    started: float
+    finished: Optional[float] = None
+    result: str = "in progress"
+    items_done: int = 0
+    rerequests: int = 0
+    dropped: int = 0
+
+    @property
+    def duration_s(self) -> float:
+        return (self.finished or time.monotonic()) - self.started
+
+    def as_dict(self) -> dict[str, Any]:
+        duration = self.duration_s
+        return {
+            "direction": self.direction,
+            "mission_type": self.mission_type,
+            "count": self.count,
+            "items_done": self.items_done,
+            "result": self.result,
+            "duration_s": round(duration, 4),
+            "items_per_s": round(self.items_done / duration, 1) if duration > 0 else 0.0,
+            "rerequests": self.rerequests,
+            "dropped": self.dropped,
+        }
+
+
+@dataclass
+class _Upload:
+    transfer: MissionTransfer
+    gcs: tuple[int, int]
+    items: list[MissionItem]
+    next_retry: float
+    last_progress: float
+
+
+@dataclass
+class _Download:
+    transfer: MissionTransfer
+    requested: set[int]
+    last_activity: float
+
+
+def _result_name(result: int) -> str:
+    entry = mavutil.mavlink.enums["MAV_MISSION_RESULT"].get(result)
+    return entry.name if entry is not None else str(result)
+
+
+class MissionServer:
+    def __init__(
+        self,
+        mav: Any,
+        *,
+        item_latency_s: float = 0.0,
+        loss: float = 0.0,
+        seed: int = 0,
+        logger: Any = None,
+        monotonic: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._mav = mav
+        self._latency_s = max(0.0, item_latency_s)
+        self._loss = min(max(loss, 0.0), 1.0)
+        self._rng = random.Random(seed)
+        self._logger = logger or logging.getLogger("virtual_px4")
+        self._monotonic = monotonic
+        self._stores: dict[int, list[MissionItem]] = {}
+        # Delayed responses: (due, tie-breaker, send function, args).
+        self._outbox: list[tuple[float, int, Callable[..., None], tuple[Any, ...]]] = []
+        self._outbox_order = itertools.count()
+        self._upload: Optional[_Upload] = None
+        self._download: Optional[_Download] = None
+        # Last accepted upload, so a GCS that missed the final ACK can get it again.
+        self._accepted_upload: Optional[tuple[int, int]] = None
+        self.transfers: list[MissionTransfer] = []
+        self.dropped_in = 0
+        self.dropped_out = 0
+
+    def items(self, mission_type: int = mavutil.mavlink.MAV_MISSION_TYPE_MISSION) -> list[MissionItem]:
+        return list(self._stores.get(mission_type, ()))
+
+    def handle(self, message: Any) -> bool:
+        """Process a mission-protocol message; returns ``False`` for any other message."""
+        msg_type = message.get_type()
+        if msg_type not in MISSION_MESSAGES:
+            return False
+        if self._drop():
+            self.dropped_in += 1
+            self._count_drop()
+            return True
+        gcs = (message.get_srcSystem(), message.get_srcComponent())
+        mission_type = getattr(message, "mission_type", mavutil.mavlink.MAV_MISSION_TYPE_MISSION)
+        now = self._monotonic()
+        if msg_type == "MISSION_COUNT":
+            self._on_count(gcs, message.count, mission_type, now)
+        elif msg_type == "MISSION_ITEM_INT":
+            self._on_item(gcs, message, now)
+        elif msg_type == "MISSION_REQUEST_LIST":
+            self._on_request_list(gcs, mission_type, now)
+        elif msg_type in ("MISSION_REQUEST_INT", "MISSION_REQUEST"):
+            self._on_request(gcs, message.seq, mission_type, now)
+        elif msg_type == "MISSION_ACK":
+            self._on_ack(message.type, mission_type, now)
+        elif msg_type == "MISSION_CLEAR_ALL":
+            self._on_clear_all(gcs, mission_type, now)
+        return True
+
+    def service(self, now: float) -> Optional[float]:
+        """Send due responses and run retry/timeout checks; returns the next time to call again."""
+        while self._outbox and self._outbox[0][0] <= now:
+            _, _, send, args = heapq.heappop(self._outbox)
+            if self._drop():
+                self.dropped_out += 1
+                self._count_drop()
+                continue
+            send(*args)
+        upload = self._upload
+        if upload is not None and now >= upload.next_retry:
+            if now - upload.last_progress >= MISSION_TIMEOUT_S:
+                self._send(now, self._mav.mission_ack_send, *upload.gcs, mavutil.mavlink.MAV_MISSION_OPERATION_CANCELLED, upload.transfer.mission_type)
+                self._finish(upload.transfer, "timeout", now)
+                self._upload = None
+            else:
+                upload.transfer.rerequests += 1
+                self._request_item(upload, now)
+        download = self._download
+        if download is not None and now - download.last_activity >= MISSION_TIMEOUT_S:
+            self._finish(download.transfer, "timeout", now)
+            self._download = None
+
+        deadlines = [self._outbox[0][0]] if self._outbox else []
+        if self._upload is not None:
+            deadlines.append(self._upload.next_retry)
+        if self._download is not None:
+            deadlines.append(self._download.last_activity + MISSION_TIMEOUT_S)
+        return min(deadlines, default=None)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "stored": {str(mission_type): len(items) for mission_type, items in self._stores.items()},
+            "dropped_in": self.dropped_in,
+            "dropped_out": self.dropped_out,
+            "transfers": [transfer.as_dict() for transfer in self.transfers],
+        }
+
+    # -- upload (GCS -> vehicle) ----------------------------------------------
+
+    def _on_count(self, gcs: tuple[int, int], count: int, mission_type: int, now: float) -> None:
+        upload = self._upload
+        if upload is not None and upload.transfer.count == count and not upload.items:
+            # The GCS missed our first request and sent the count again.
+            upload.transfer.rerequests += 1
+            self._request_item(upload, now)
+            return
+        if upload is not None:
+            self._finish(upload.transfer, "superseded", now)
+        transfer = MissionTransfer("upload", mission_type, count, now)
+        self.transfers.append(transfer)
+        self._accepted_upload = None
+        if count == 0:
+            self._upload = None
+            self._stores[mission_type] = []
+            self._send(now, self._mav.mission_ack_send, *gcs, mavutil.mavlink.MAV_MISSION_ACCEPTED, mission_type)
+            self._finish(transfer, _result_name(mavutil.mavlink.MAV_MISSION_ACCEPTED), now)
+            return
+        self._upload = _Upload(transfer, gcs, [], now, now)
+        self._request_item(self._upload, now)
+
+    def _on_item(self, gcs: tuple[int, int], message: Any, now: float) -> None:
+        upload = self._upload
+        if upload is None:
+            if self._accepted_upload is not None and self._accepted_upload[1] == message.seq + 1:
+                # Our final ACK was lost and the GCS resent the last item.
+                self._send(now, self._mav.mission_ack_send, *gcs, mavutil.mavlink.MAV_MISSION_ACCEPTED, self._accepted_upload[0])
+            else:
+                self._logger.debug("mission item %d outside an upload", message.seq)
+            return
+        expected = len(upload.items)
+        if message.seq < expected:
+            return  # duplicate of an item we already have
+        if message.seq > expected:
+            upload.transfer.rerequests += 1
+            self._request_item(upload, now)
+            return
+        upload.items.append(MissionItem.from_message(message))
+        upload.transfer.items_done = len(upload.items)
+        upload.last_progress = now
+        if len(upload.items) < upload.transfer.count:
+            self._request_item(upload, now)
+            return
+        mission_type = upload.transfer.mission_type
+        self._stores[mission_type] = upload.items
+        self._accepted_upload = (mission_type, upload.transfer.count)
+        self._send(now, self._mav.mission_ack_send, *upload.gcs, mavutil.mavlink.MAV_MISSION_ACCEPTED, mission_type)
+        self._finish(upload.transfer, _result_name(mavutil.mavlink.MAV_MISSION_ACCEPTED), now)
+        self._upload = None
+
+    def _request_item(self, upload: _Upload, now: float) -> None:
+        self._send(now, self._mav.mission_request_int_send, *upload.gcs, len(upload.items), upload.transfer.mission_type)
+        upload.next_retry = now + self._latency_s + MISSION_RETRY_S
+
+    # -- download (vehicle -> GCS) --------------------------------------------
+
+    def _on_request_list(self, gcs: tuple[int, int], mission_type: int, now: float) -> None:
+        count = len(self._stores.get(mission_type, ()))
+        download = self._download
+        if download is not None and download.transfer.mission_type == mission_type and not download.requested:
+            download.transfer.rerequests += 1  # the GCS missed our count
+            download.last_activity = now
+        else:
+            if download is not None:
+                self._finish(download.transfer, "superseded", now)
+            transfer = MissionTransfer("download", mission_type, count, now)
+            self.transfers.append(transfer)
+            self._download = _Download(transfer, set(), now) if count else None
+            if not count:
+                self._finish(transfer, _result_name(mavutil.mavlink.MAV_MISSION_ACCEPTED), now)
+        self._send(now, self._mav.mission_count_send, *gcs, count, mission_type)
+
+    def _on_request(self, gcs: tuple[int, int], seq: int, mission_type: int, now: float) -> None:
+        items = self._stores.get(mission_type, [])
+        if not 0 <= seq < len(items):
+            self._send(now, self._mav.mission_ack_send, *gcs, mavutil.mavlink.MAV_MISSION_INVALID_SEQUENCE, mission_type)
+            return
+        download = self._download
+        if download is not None and download.transfer.mission_type == mission_type:
+            if seq in download.requested:
+                download.transfer.rerequests += 1
+            download.requested.add(seq)
+            download.transfer.items_done = len(download.requested)
+            download.last_activity = now
+        item = items[seq]
+        self._send(
+            now,
+            self._mav.mission_item_int_send,
+            *gcs,
+            seq,
+            item.frame,
+            item.command,
+            0,
+            item.autocontinue,
+            item.param1,
+            item.param2,
+            item.param3,
+            item.param4,
+            item.x,
+            item.y,
+            item.z,
+            mission_type,
+        )
+
+    def _on_ack(self, result: int, mission_type: int, now: float) -> None:
+        if self._download is None or self._download.transfer.mission_type != mission_type:
+            return
+        self._finish(self._download.transfer, _result_name(result), now)
+        self._download = None
+
+    def _on_clear_all(self, gcs: tuple[int, int], mission_type: int, now: float) -> None:
+        if mission_type == mavutil.mavlink.MAV_MISSION_TYPE_ALL:
+            self._stores.clear()
+        else:
+            self._stores.pop(mission_type, None)
+        self._logger.info("GCS cleared mission type %d", mission_type)
+        self._send(now, self._mav.mission_ack_send, *gcs, mavutil.mavlink.MAV_MISSION_ACCEPTED, mission_type)
+
+    # -- plumbing ---------------------------------------------------------------
+
+    def _send(self, now: float, send: Callable[..., None], *args: Any) -> None:
+        heapq.heappush(self._outbox, (now + self._latency_s, next(self._outbox_order), send, args))
+
+    def _drop(self) -> bool:
+        return self._loss > 0 and self._rng.random() < self._loss
+
+    def _count_drop(self) -> None:
+        for active in (self._upload, self._download):
+            if active is not None:
+                active.transfer.dropped += 1
+
+    def _finish(self, transfer: MissionTransfer, result: str, now: float) -> None:
+        transfer.finished = now
+        transfer.result = result
+        report = transfer.as_dict()
+        self._logger.info(
+            "mission %s: %d/%d items in %.3fs (%.0f items/s), %d re-requests, %d dropped -> %s",
+            transfer.direction,
+            transfer.items_done,
+            transfer.count,
+            report["duration_s"],
+            report["items_per_s"],
+            transfer.rerequests,
+            transfer.dropped,
+            result,
+        )
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""Pluggable clocks for the vision tools.
+
+Every clock exposes ``now()`` (seconds) and ``observe(ts)``, a hint that data
+stamped ``ts`` has just been produced or received. Tools take their clock
+from ``--clock`` (see ``add_clock_arguments`` / ``build_clock``):
+
+- ``wall``: ``time.time()`` (default; the historical behaviour)
+- ``monotonic``: ``time.monotonic()``
+- ``stepped``: deterministic simulated time starting at ``--clock-epoch``. It
+  only moves through ``observe``/``advance``: producers advance it to each
+  frame timestamp, consumers see ``frame_ts + --clock-latency-s``. Fast-mode
+  output is then independent of host speed and reproducible run to run.
+- ``px4``: PX4 SITL time from MAVLink ``SYSTEM_TIME`` on ``--clock-mavlink``
+  (needs ``pymavlink``), interpolated between messages at the observed sim rate
+
+``ReplayClock`` drives recorded-stream replay: virtual time starts at the
+first recorded frame timestamp and advances at ``speed`` times wall-clock
+rate (``None`` means as fast as possible, in which case virtual time jumps
+straight to each released frame's timestamp). Latency measured against it
+is recorded-timeline latency: host processing delay scaled by ``speed``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import threading
+import time
+from typing import Protocol
+
+CLOCK_CHOICES = ("wall", "monotonic", "stepped", "px4")
+
+
+class Clock(Protocol):
+    """What the tools need from a clock: ``now()`` and the ``observe(ts)`` hint."""
+
+    def now(self) -> float: ...
+
+    def observe(self, ts: float) -> None: ...
+
+
+class WallClock:
+    name = "wall"
+
+    def now(self) -> float:
+        return time.time()
+
+    def observe(self, ts: float) -> None:
+        pass
+
+
+class MonotonicClock:
+    name = "monotonic"
+
+    def now(self) -> float:
+        return time.monotonic()
+
+    def observe(self, ts: float) -> None:
+        pass
+
+
+class SteppedClock:
+    name = "stepped"
+
+    def __init__(self, epoch: float = 0.0, latency_s: float = 0.0) -> None:
+        self.epoch = epoch
+        self.latency_s = max(0.0, latency_s)
+        self._now = epoch
+
+    def now(self) -> float:
+        return self._now
+
+    def advance(self, dt: float) -> None:
+        self._now += max(0.0, dt)
+
+    def observe(self, ts: float) -> None:
+        self._now = max(self._now, ts + self.latency_s)
+
+
+class Px4SystemTimeClock:
+    """PX4 time from MAVLink ``SYSTEM_TIME``, received on a background thread.
+
+    Uses ``time_unix_usec`` when PX4 reports it, else ``time_boot_ms``.
+    Between messages the clock is extrapolated with the monotonic clock scaled
+    by the sim/wall rate seen across the last two messages, so lockstep SITL
+    running faster or slower than real time stays consistent.
+    """
+
+    name = "px4"
+
+    def __init__(self, connection: str, *, timeout_s: float = 10.0) -> None:
+        try:
+            from pymavlink import mavutil
+        except ImportError as exc:
+            raise RuntimeError("--clock px4 requires pymavlink (pip install pymavlink)") from exc
+
+        self.connection = connection
+        self._link = mavutil.mavlink_connection(connection)
+        self._lock = threading.Lock()
+        self._sim_ts: float | None = None
+        self._received_at = 0.0
+        self._rate = 1.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._receive, name="px4-system-time", daemon=True)
+        self._thread.start()
+
+        deadline = time.monotonic() + max(0.0, timeout_s)
+        while self._sim_ts is None:
+            if time.monotonic() >= deadline:
+                self.close()
+                raise RuntimeError(f"no MAVLink SYSTEM_TIME received on {connection} within {timeout_s:.1f}s")
+            time.sleep(0.01)
+
+    def _receive(self) -> None:
+        while not self._stop.is_set():
+            msg = self._link.recv_match(type="SYSTEM_TIME", blocking=True, timeout=0.5)
+            if msg is None:
+                continue
+            sim_ts = msg.time_unix_usec / 1e6 if msg.time_unix_usec else msg.time_boot_ms / 1000.0
+            received_at = time.monotonic()
+            with self._lock:
+                if self._sim_ts is not None and received_at > self._received_at and sim_ts > self._sim_ts:
+                    self._rate = (sim_ts - self._sim_ts) / (received_at - self._received_at)
+                self._sim_ts = sim_ts
+                self._received_at = received_at
+
+    def now(self) -> float:
+        with self._lock:
+            if self._sim_ts is None:
+                raise RuntimeError("PX4 SYSTEM_TIME not received yet")
+            return self._sim_ts + (time.monotonic() - self._received_at) * self._rate
+
+    def observe(self, ts: float) -> None:
+        pass
+
+    def close(self) -> None:
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+        self._link.close()
+
+
+def add_clock_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--clock",
+        choices=CLOCK_CHOICES,
+        default="wall",
+        help="Time source for timestamps and latency (see vision_clock.py); stepped is deterministic.",
+    )
+    parser.add_argument(
+        "--clock-epoch",
+        type=float,
+        default=0.0,
+        help="Start time of the stepped clock.",
+    )
+    parser.add_argument(
+        "--clock-latency-s",
+        type=float,
+        default=0.0,
+        help="Stepped clock: modelled latency between a frame timestamp and its observation.",
+    )
+    parser.add_argument(
+        "--clock-mavlink",
+        default="udp:127.0.0.1:14540",
+        help="MAVLink connection carrying SYSTEM_TIME for --clock px4.",
+    )
+
+
+def clock_cli_args(args: argparse.Namespace) -> list[str]:
+    """Re-encode the parsed clock options for a child tool's command line."""
+    return [
+        "--clock",
+        args.clock,
+        "--clock-epoch",
+        str(args.clock_epoch),
+        "--clock-latency-s",
+        str(args.clock_latency_s),
+        "--clock-mavlink",
+        args.clock_mavlink,
+    ]
+
+
+def build_clock(args: argparse.Namespace) -> WallClock | MonotonicClock | SteppedClock | Px4SystemTimeClock:
+    if args.clock == "monotonic":
+        return MonotonicClock()
+    if args.clock == "stepped":
+        return SteppedClock(args.clock_epoch, args.clock_latency_s)
+    if args.clock == "px4":
+        try:
+            return Px4SystemTimeClock(args.clock_mavlink)
+        except RuntimeError as error:
+            raise SystemExit(str(error)) from error
+    return WallClock()
+
+
+def parse_speed(raw: str) -> float | None:
+    """Parse a replay speed such as ``0.5``, ``10x`` or ``max`` (returned as ``None``)."""
+    text = raw.strip().lower()
+    if text in ("max", "inf"):
+        return None
+    if text.endswith("x"):
+        text = text[:-1]
+    try:
+        speed = float(text)
+    except ValueError as exc:
+        raise ValueError(f"invalid replay speed {raw!r} (expected e.g. 0.5, 1, 10x or max)") from exc
+    if not speed > 0:
+        raise ValueError(f"replay speed must be > 0 (got {raw!r})")
+    return speed
+
+
+class ReplayClock:
+    name = "replay"
+
+    def __init__(self, speed: float | None) -> None:
+        self.speed = speed
+        self._virtual_origin: float | None = None
+        self._wall_origin = 0.0
+        self._virtual_now = 0.0
+
+    @property
+    def started(self) -> bool:
+        return self._virtual_origin is not None
+
+    def start(self, virtual_ts: float) -> None:
+        self._virtual_origin = virtual_ts
+        self._virtual_now = virtual_ts
+        self._wall_origin = time.monotonic()
+
+    def now(self) -> float:
+        """Current virtual time (seconds on the recorded timeline)."""
+        if self._virtual_origin is None:
+            raise RuntimeError("ReplayClock.now() before start()")
+        if self.speed is None:
+            return self._virtual_now
+        return self._virtual_origin + (time.monotonic() - self._wall_origin) * self.speed
+
+    def observe(self, ts: float) -> None:
+        pass
+
+    def wait_until(self, virtual_ts: float) -> float:
+        """Block until virtual time reaches ``virtual_ts``; returns the wall seconds slept.
+
+        Frames already in the past (out of order or behind schedule) are released immediately.
+        """
+        if self._virtual_origin is None:
+            self.start(virtual_ts)
+            return 0.0
+        if self.speed is None:
+            self._virtual_now = max(self._virtual_now, virtual_ts)
+            return 0.0
+        remaining = (virtual_ts - self.now()) / self.speed
+        if remaining <= 0:
+            return 0.0
+        time.sleep(remaining)
+        return remaining
+
+    def elapsed_virtual_s(self) -> float:
+        return 0.0 if self._virtual_origin is None else self.now() - self._virtual_origin
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""Aggregated, rate-limited diagnostics for the vision tools.
+
+Rejected records (bad timestamps, malformed JSON, ...) are counted per reason
+instead of being printed one line each, so a camera emitting garbage at
+60 fps costs a counter increment rather than a log write. A ``Diagnostics``
+keeps:
+
+- a counter per rejection reason
+- up to ``--diagnostics-exemplars`` sampled exemplars per reason (reservoir
+  sampling, so late bursts are represented as well as the first ones)
+- a periodic stderr summary, at most one per ``--diagnostics-interval-s`` and
+  only when something new was counted, plus a final summary at exit
+- an optional JSON stats file (``--diagnostics-json``), which
+  ``run_vision_pre_task4.py`` merges into ``vision_diagnostics.json``
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, TextIO
+
+EXEMPLAR_REPR_CHARS = 200
+
+
+class Diagnostics:
+    def __init__(
+        self,
+        component: str,
+        *,
+        summary_interval_s: float = 10.0,
+        max_exemplars: int = 3,
+        stream: TextIO | None = None,
+        monotonic: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.component = component
+        self.summary_interval_s = max(0.0, summary_interval_s)
+        self.max_exemplars = max(0, max_exemplars)
+        self.stream = stream
+        self.counts: dict[str, int] = {}
+        self.exemplars: dict[str, list[dict[str, Any]]] = {}
+        self.summaries_emitted = 0
+        self._monotonic = monotonic
+        self._started_at = monotonic()
+        self._last_summary_at = self._started_at
+        self._total_at_last_summary = 0
+        self._rng = random.Random(0)
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def count(self, reason: str, value: Any = None, location: str | None = None) -> None:
+        """Record one rejection of ``reason``; ``value``/``location`` describe a possible exemplar."""
+        seen = self.counts.get(reason, 0) + 1
+        self.counts[reason] = seen
+        if self.max_exemplars:
+            samples = self.exemplars.setdefault(reason, [])
+            if len(samples) < self.max_exemplars:
+                samples.append(self._exemplar(seen, value, location))
+            else:
+                slot = self._rng.randrange(seen)
+                if slot < self.max_exemplars:
+                    samples[slot] = self._exemplar(seen, value, location)
+        if self.summary_interval_s > 0 and self._monotonic() - self._last_summary_at >= self.summary_interval_s:
+            self.emit_summary()
+
+    def merge_counts(self, counts: dict[str, int]) -> None:
+        """Add externally tallied per-reason counts (e.g. ``AdapterBatch.drops``), without exemplars."""
+        for reason, seen in counts.items():
+            self.counts[reason] = self.counts.get(reason, 0) + seen
+
+    @staticmethod
+    def _exemplar(occurrence: int, value: Any, location: str | None) -> dict[str, Any]:
+        return {"occurrence": occurrence, "location": location, "value": repr(value)[:EXEMPLAR_REPR_CHARS]}
+
+    def _reasons_text(self) -> str:
+        return ", ".join(f"{reason}={count}" for reason, count in sorted(self.counts.items()))
+
+    def emit_summary(self) -> None:
+        now = self._monotonic()
+        total = self.total
+        window_s = now - self._last_summary_at
+        new = total - self._total_at_last_summary
+        self._last_summary_at = now
+        self._total_at_last_summary = total
+        if not new:
+            return
+        self.summaries_emitted += 1
+        print(
+            f"[diagnostics] {self.component}: {new} rejected in last {window_s:.1f}s (total {total}: {self._reasons_text()})",
+            file=self.stream or sys.stderr,
+            flush=True,
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "component": self.component,
+            "elapsed_s": round(self._monotonic() - self._started_at, 3),
+            "total_rejected": self.total,
+            "reasons": {
+                reason: {"count": count, "exemplars": sorted(self.exemplars.get(reason, []), key=lambda e: e["occurrence"])}
+                for reason, count in sorted(self.counts.items())
+            },
+            "summary_interval_s": self.summary_interval_s,
+            "summaries_emitted": self.summaries_emitted,
+        }
+
+    def close(self, stats_json: Path | None = None) -> None:
+        """Print the final summary (if anything was rejected) and write ``stats_json``."""
+        if self.total:
+            earliest = {reason: min(samples, key=lambda e: e["occurrence"]) for reason, samples in self.exemplars.items() if samples}
+            exemplars = "; ".join(
+                f"{reason}@{exemplar['location'] or '?'}={exemplar['value']}" for reason, exemplar in sorted(earliest.items())
+            )
+            print(
+                f"[diagnostics] {self.component} final: rejected {self.total} records ({self._reasons_text()})"
+                + (f"; e.g. {exemplars}" if exemplars else ""),
+                file=self.stream or sys.stderr,
+                flush=True,
+            )
+        if stats_json is not None:
+            stats_json.parent.mkdir(parents=True, exist_ok=True)
+            stats_json.write_text(json.dumps(self.as_dict(), indent=2) + "\n", encoding="utf-8")
+
+
+def add_diagnostics_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--diagnostics-json",
+        type=Path,
+        default=None,
+        help="Write rejection counters and sampled exemplars to this JSON file at exit.",
+    )
+    parser.add_argument(
+        "--diagnostics-interval-s",
+        type=float,
+        default=10.0,
+        help="Minimum seconds between periodic rejection summaries on stderr (0 disables them).",
+    )
+    parser.add_argument(
+        "--diagnostics-exemplars",
+        type=int,
+        default=3,
+        help="Sampled exemplars kept per rejection reason.",
+    )
+
+
+def build_diagnostics(args: argparse.Namespace, component: str) -> Diagnostics:
+    return Diagnostics(component, summary_interval_s=args.diagnostics_interval_s, max_exemplars=args.diagnostics_exemplars)
+
+
+def merge_stats_files(paths: dict[str, Path]) -> dict[str, Any]:
+    """Combine per-component stats files (missing ones are skipped) with per-reason totals."""
+    components: dict[str, Any] = {}
+    totals: dict[str, int] = {}
+    for name, path in paths.items():
+        if not path.exists():
+            continue
+        stats = json.loads(path.read_text(encoding="utf-8"))
+        components[name] = stats
+        for reason, entry in stats["reasons"].items():
+            totals[reason] = totals.get(reason, 0) + entry["count"]
+    return {"total_rejected": sum(totals.values()), "totals": dict(sorted(totals.items())), "components": components}